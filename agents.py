@@ -1,46 +1,146 @@
-from typing import Dict, List, Optional, TypedDict
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Type, TypedDict
 from langchain.schema import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
-from datetime import datetime, timedelta
-import json
+from pydantic import BaseModel
+from datetime import datetime, timedelta, timezone
+import asyncio
+import functools
+import hashlib
+import orjson
 import re
 from config import Config
-from scraper import TenderScraper
+from content_store import ContentStore
 import logging
 
+if TYPE_CHECKING:
+    # Heavy imports (crawl4ai, langchain_openai) are deferred to first use
+    from scraper import TenderScraper
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class AgentState(TypedDict):
-    page_url: str
-    page_content: str
-    raw_tenders: List[Dict]
-    categorized_tenders: List[Dict]
-    detailed_tenders: List[Dict]
-    keywords_esg: List[str]
-    keywords_credit: List[str]
-    error: Optional[str]
+# All date formats recognised by the fallback extractor, fused into one pattern.
+# The outer named group tells which format matched (see ``match.lastgroup``).
+_DATE_RE = re.compile(
+    r'(?P<ru>(?P<ru_day>\d{1,2})[^\S\n]+'
+    r'(?P<ru_month>января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)[^\S\n]+'
+    r'(?P<ru_year>\d{4}))'
+    r'|(?P<dot>(?P<dot_day>\d{1,2})\.(?P<dot_month>\d{1,2})\.(?P<dot_year>\d{4}))'
+    r'|(?P<iso>(?P<iso_year>\d{4})-(?P<iso_month>\d{1,2})-(?P<iso_day>\d{1,2}))'
+    r'|(?P<sl>(?P<sl_day>\d{1,2})/(?P<sl_month>\d{1,2})/(?P<sl_year>\d{4}))',
+    re.IGNORECASE
+)
 
-class TenderAgent:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0,
-            api_key=Config.OPENAI_API_KEY
-        )
+_MONTHS_RU = {
+    'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4,
+    'мая': 5, 'июня': 6, 'июля': 7, 'августа': 8,
+    'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12
+}
+
+_TENDER_KEYWORDS_RE = re.compile(
+    r'тендер|конкурс|закупка|tender|procurement|bid|rfp|'
+    r'внутренние тендеры|международные тендеры|ознакомиться',
+    re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=8)
+def _compile_kw_re(keywords: tuple) -> re.Pattern:
+    """Compile a keyword tuple into one case-insensitive alternation"""
+    alternatives = sorted({k for k in keywords if k}, key=len, reverse=True)
+    if not alternatives:
+        return re.compile(r'(?!)')  # Never matches
+    return re.compile('|'.join(map(re.escape, alternatives)), re.IGNORECASE)
+
+def _keyword_windows(content: str, keywords_re: re.Pattern,
+                     radius: int = 500, max_chars: int = 8000) -> str:
+    """Cut content down to merged windows of +/- radius chars around keyword hits"""
+    spans = []
+    for m in keywords_re.finditer(content):
+        start, end = max(0, m.start() - radius), min(len(content), m.end() + radius)
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
     
-    async def extract_tenders_node(self, state: AgentState) -> AgentState:
-        """Agent 1: Extract tenders from page content and categorize them"""
-        try:
-            logger.info("Agent 1: Extracting and categorizing tenders")
-            
-            # Debug: Log a sample of the page content
-            content_sample = state['page_content'].replace('\n', ' ')
-            #logger.info(f"Page content sample: {content_sample}")
-            logger.info(f"Total page content length: {len(state['page_content'])} characters")
-            
-            system_prompt = """You are a tender extraction specialist. Your task is to:
+    windows = []
+    total = 0
+    for start, end in spans:
+        window = content[start:end][:max_chars - total]
+        windows.append(window)
+        total += len(window)
+        if total >= max_chars:
+            break
+    return '\n...\n'.join(windows)
+
+_LATIN_LETTER_RE = re.compile(r'[a-zA-Z]')
+_LETTER_RE = re.compile(r'[^\W\d_]')
+
+def _is_mostly_latin(text: str, sample: int = 20000) -> bool:
+    """Whether at least half the letters in (a leading sample of) text are Latin"""
+    text = text[:sample]
+    letters = len(_LETTER_RE.findall(text))
+    return not letters or len(_LATIN_LETTER_RE.findall(text)) * 2 >= letters
+
+def _agent1_page_content(content: str, keywords: tuple, keywords_re: re.Pattern) -> Optional[str]:
+    """
+    Page content to send to Agent 1, or None if the page can't hold matching tenders
+    
+    Keyword pre-filtering only holds when keywords and page share a script: English
+    keywords never appear verbatim on e.g. a Russian page, whose tenders the LLM
+    translates and matches, so such pages go to the LLM in full.
+    """
+    if _is_mostly_latin(' '.join(keywords)) != _is_mostly_latin(content):
+        return content
+    if not keywords_re.search(content):
+        return None
+    return _keyword_windows(content, keywords_re)
+
+def _categorize_text(text: str, esg_re: re.Pattern, credit_re: re.Pattern) -> tuple:
+    """Category and all (deduplicated, lowercased) keywords matched in text"""
+    esg_hits = list(dict.fromkeys(m.lower() for m in esg_re.findall(text)))
+    credit_hits = list(dict.fromkeys(m.lower() for m in credit_re.findall(text)))
+    
+    if esg_hits and credit_hits:
+        category = 'both'
+    elif esg_hits:
+        category = 'esg'
+    elif credit_hits:
+        category = 'credit_rating'
+    else:
+        category = 'other'
+    return category, esg_hits + credit_hits
+
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(date_str: str) -> Optional[datetime]:
+    """Parse an ISO date/datetime string, classifying it before any parse attempt"""
+    if not date_str or not _ISO_DATE_RE.match(date_str):
+        return None  # Covers 'null' and non-ISO formats without raising
+    
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(date_str[:10], '%Y-%m-%d')
+    except ValueError:
+        return None
+
+def _normalize_date_match(match: re.Match) -> Optional[str]:
+    """Convert a ``_DATE_RE`` match into a YYYY-MM-DD string"""
+    kind = match.lastgroup
+    if kind == 'ru':  # Russian month names
+        month = _MONTHS_RU.get(match['ru_month'].lower())
+        if not month:
+            return None
+        year, day = match['ru_year'], match['ru_day']
+    else:  # Numeric dates
+        year, month, day = match[f'{kind}_year'], match[f'{kind}_month'], match[f'{kind}_day']
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+# Static Agent 1 system prompt; keywords are appended per keyword set
+_SYS_PROMPT_AGENT1 = """You are a tender extraction specialist. Your task is to:
 1. Extract ONLY procurement/tender opportunities that contain the specified ESG or Credit Rating keywords
 2. Be STRICT - only extract tenders that actually mention the provided keywords
 3. ALWAYS respond in ENGLISH, even if the source content is in another language
@@ -64,7 +164,7 @@ Categorize each tender as:
 - 'credit_rating' if it mentions: credit, rating, financial, risk, assessment, audit, creditworthiness
 - 'both' if it contains both types of keywords
 
-Return ONLY a valid JSON array:
+Return a JSON object whose "tenders" array holds:
 [
   {
     "title": "tender title (IN ENGLISH)",
@@ -76,60 +176,244 @@ Return ONLY a valid JSON array:
   }
 ]
 
-CRITICAL: Only include tenders that contain the specified keywords. If no tenders match the keywords, return an empty array [].
-IMPORTANT: Your response must be ONLY valid JSON, no additional text. ALL TEXT FIELDS MUST BE IN ENGLISH."""
+CRITICAL: Only include tenders that contain the specified keywords. If no tenders match the keywords, return an empty "tenders" array [].
+IMPORTANT: Your response must be ONLY valid JSON, no additional text. ALL TEXT FIELDS MUST BE IN ENGLISH.
+Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating keyword. Be strict and only include tenders that actually mention the provided keywords."""
 
-            user_prompt = f"""
-Page URL: {state['page_url']}
+_AGENT1_BATCH_INSTRUCTIONS = """
 
-ESG Keywords: {', '.join(state['keywords_esg'])}
-Credit Rating Keywords: {', '.join(state['keywords_credit'])}
+BATCH MODE: The content holds several pages, each delimited by <<<DOC id=N>>> and <<<END N>>>.
+Return a JSON object whose "pages" array has one entry per page: {"doc_id": "<that N>", "tenders": [...]}, using the tender format above."""
 
-Page Content (look for procurement opportunities that contain the specified keywords):
-{state['page_content']}
+_SYS_PROMPT_AGENT2 = """You are a tender detail extraction specialist. Your task is to:
+1. Extract comprehensive details from tender pages
+2. Provide all information in ENGLISH, regardless of source language
+3. Be thorough and accurate
+
+Extract the following information:
+- Full tender title (TRANSLATE TO ENGLISH)
+- Complete description (TRANSLATE TO ENGLISH)
+- Requirements and specifications (TRANSLATE TO ENGLISH)
+- Deadline/closing date
+- Contact information
+- Any other relevant details
+
+Return ONLY a valid JSON object:
+{
+  "title": "full tender title (IN ENGLISH)",
+  "description": "comprehensive description (IN ENGLISH)",
+  "requirements": "key requirements (IN ENGLISH)",
+  "deadline": "YYYY-MM-DD or null",
+  "contact_info": "contact details (IN ENGLISH)",
+  "additional_details": "other relevant information (IN ENGLISH)"
+}
+
+IMPORTANT: ALL TEXT MUST BE IN ENGLISH. Return only valid JSON."""
+
+_SYS_MSG_AGENT2 = SystemMessage(content=_SYS_PROMPT_AGENT2)
+
+@functools.lru_cache(maxsize=8)
+def _agent1_system_message(keywords_esg: tuple, keywords_credit: tuple,
+                           batch: bool = False) -> SystemMessage:
+    """Build the Agent 1 system message once per keyword set"""
+    system_prompt = _SYS_PROMPT_AGENT1
+    if batch:
+        system_prompt += _AGENT1_BATCH_INSTRUCTIONS
+    
+    # Keywords go at the end of the system prompt in a stable order so the
+    # whole system message is a byte-identical, cacheable prefix across pages
+    system_prompt += f"""
+
+ESG Keywords: {', '.join(sorted(keywords_esg))}
+Credit Rating Keywords: {', '.join(sorted(keywords_credit))}"""
+    return SystemMessage(content=system_prompt)
+
+class TenderItem(BaseModel):
+    """A tender extracted by Agent 1"""
+    title: str
+    url: str
+    date: Optional[str]
+    category: Literal['esg', 'credit_rating', 'both']
+    description: str
+    matched_keywords: List[str]
+
+class TenderList(BaseModel):
+    """Structured output schema for Agent 1"""
+    tenders: List[TenderItem]
+
+class PageTenders(BaseModel):
+    """Tenders found on one page of an Agent 1 batch, keyed by its position in the batch"""
+    doc_id: str
+    tenders: List[TenderItem]
+
+class TenderBatch(BaseModel):
+    """Structured output schema for batched Agent 1 calls"""
+    pages: List[PageTenders]
+
+class DetailedTenderInfo(BaseModel):
+    """Structured output schema for Agent 2"""
+    title: str
+    description: str
+    requirements: str
+    deadline: Optional[str]
+    contact_info: str
+    additional_details: str
+
+class AgentState(TypedDict):
+    page_url: str
+    page_content: str
+    raw_tenders: List[Dict]
+    categorized_tenders: List[Dict]
+    detailed_tenders: List[Dict]
+    keywords_esg: List[str]
+    keywords_credit: List[str]
+    error: Optional[str]
+
+# Crawler shared by every scrape in a run, so the browser is started only once
+_scraper: Optional["TenderScraper"] = None
+
+async def get_scraper() -> "TenderScraper":
+    """Return the shared scraper, starting its crawler on first use"""
+    global _scraper
+    if _scraper is None:
+        from scraper import TenderScraper
+        scraper = TenderScraper()
+        await scraper.__aenter__()
+        _scraper = scraper
+    return _scraper
+
+async def close_scraper():
+    """Shut down the shared scraper (call before the event loop ends)"""
+    global _scraper
+    if _scraper is not None:
+        scraper, _scraper = _scraper, None
+        await scraper.__aexit__(None, None, None)
+
+class TenderAgent:
+    def __init__(self):
+        from langchain_openai import ChatOpenAI
+        self.llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0,
+            api_key=Config.OPENAI_API_KEY
+        )
+        # Server-side constrained decoding, so responses are always schema-valid JSON
+        self.structured_llms = {
+            schema: self.llm.with_structured_output(schema, method="json_schema")
+            for schema in (TenderList, TenderBatch, DetailedTenderInfo)
+        }
+        self.content_store = ContentStore()
+        self._db_manager = None
+    
+    def _get_db_manager(self):
+        """Create the database manager on first use"""
+        if self._db_manager is None:
+            # Import database manager here to avoid circular imports
+            from database import DatabaseManager
+            self._db_manager = DatabaseManager()
+        return self._db_manager
+    
+    @staticmethod
+    def _agent1_cache_key(state: AgentState) -> tuple:
+        """Hashes identifying an Agent 1 result: page content and keyword lists"""
+        page_hash = hashlib.sha256(state['page_content'].encode()).hexdigest()
+        keyword_hash = hashlib.sha256(orjson.dumps(
+            [sorted(state['keywords_esg']), sorted(state['keywords_credit'])]
+        )).hexdigest()
+        return page_hash, keyword_hash
+    
+    def _load_agent1_result(self, state: AgentState) -> Optional[List[Dict]]:
+        """Reuse Agent 1 tenders from an earlier crawl of identical content"""
+        from models import get_db
+        
+        with next(get_db()) as db:
+            cached = self._get_db_manager().get_agent1_result(
+                db, *self._agent1_cache_key(state), Config.LLM_CACHE_TTL_HOURS
+            )
+        return orjson.loads(cached) if cached is not None else None
+    
+    def _save_agent1_result(self, state: AgentState):
+        """
+        Store Agent 1 tenders for this page content
+        
+        Callers only store tenders from a successful LLM response: a cache hit
+        is replayed as-is, so fallback_extraction output must never land here.
+        """
+        from models import get_db
+        
+        with next(get_db()) as db:
+            self._get_db_manager().save_agent1_result(
+                db, *self._agent1_cache_key(state), orjson.dumps(state['categorized_tenders']).decode()
+            )
+    
+    async def _cached_ainvoke(self, messages: List, schema: Type[BaseModel]) -> str:
+        """Invoke the structured LLM, reusing a stored JSON response for an identical prompt"""
+        from models import get_db
+        
+        # temperature=0 makes responses deterministic, so exact-match caching is safe
+        key = hashlib.sha256(orjson.dumps({
+            'model': self.llm.model_name,
+            'temperature': self.llm.temperature,
+            'schema': schema.__name__,
+            'messages': [{'role': m.type, 'content': m.content} for m in messages]
+        }, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        
+        with next(get_db()) as db:
+            cached = self._get_db_manager().get_cached_llm_response(db, key, Config.LLM_CACHE_TTL_HOURS)
+        if cached is not None:
+            logger.info("LLM cache hit, skipping API call")
+            return cached
+        
+        response = (await self.structured_llms[schema].ainvoke(messages)).model_dump_json()
+        with next(get_db()) as db:
+            self._get_db_manager().save_cached_llm_response(db, key, response)
+        return response
+    
+    async def extract_tenders_node(self, state: AgentState) -> AgentState:
+        """Agent 1: Extract tenders from page content and categorize them"""
+        try:
+            logger.info("Agent 1: Extracting and categorizing tenders")
+            
+            # Debug: Log a sample of the page content
+            content_sample = state['page_content'].replace('\n', ' ')
+            #logger.info(f"Page content sample: {content_sample}")
+            logger.info(f"Total page content length: {len(state['page_content'])} characters")
+            
+            # Skip the LLM entirely when the page mentions none of the keywords
+            keywords = tuple(state['keywords_esg']) + tuple(state['keywords_credit'])
+            page_content = _agent1_page_content(state['page_content'], keywords, _compile_kw_re(keywords))
+            if page_content is None:
+                logger.info("Agent 1: No ESG or Credit Rating keywords found, skipping LLM")
+                state['categorized_tenders'] = []
+                return state
+            
+            # Identical page content was already processed with these keywords
+            cached_tenders = self._load_agent1_result(state)
+            if cached_tenders is not None:
+                logger.info(f"Agent 1: Page content unchanged, reusing {len(cached_tenders)} tenders")
+                state['categorized_tenders'] = cached_tenders
+                return state
+            
+            system_message = _agent1_system_message(tuple(state['keywords_esg']), tuple(state['keywords_credit']))
+
+            user_prompt = f"""Page URL: {state['page_url']}
 
-Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating keyword. Be strict and only include tenders that actually mention the provided keywords. Return ONLY valid JSON."""
+Page Content (look for procurement opportunities that contain the specified keywords):
+{page_content}"""
 
             messages = [
-                SystemMessage(content=system_prompt),
+                system_message,
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.llm.ainvoke(messages)
-            response_content = response.content.strip()
+            response_content = await self._cached_ainvoke(messages, TenderList)
             
             logger.info(f"Agent 1 raw response: {response_content[:200]}...")
             
+            from_llm = False
             try:
-                # Try to extract JSON from response if it contains extra text
-                if response_content.startswith('```json'):
-                    # Extract JSON from markdown code block
-                    start = response_content.find('[')
-                    end = response_content.rfind(']') + 1
-                    if start != -1 and end != 0:
-                        json_str = response_content[start:end]
-                    else:
-                        json_str = response_content
-                elif response_content.startswith('['):
-                    json_str = response_content
-                else:
-                    # Try to find JSON array in the response
-                    start = response_content.find('[')
-                    end = response_content.rfind(']') + 1
-                    if start != -1 and end != 0:
-                        json_str = response_content[start:end]
-                    else:
-                        logger.warning("No JSON array found in response, using fallback extraction")
-                        fallback_tenders = self.fallback_extraction(state)
-                        state['categorized_tenders'] = fallback_tenders
-                        logger.info(f"Agent 1: Using fallback extraction, found {len(fallback_tenders)} tenders")
-                        return state
-                
-                # Parse JSON response
-                tenders_data = json.loads(json_str)
-                if not isinstance(tenders_data, list):
-                    logger.warning("Response is not a list, wrapping in array")
-                    tenders_data = [tenders_data] if tenders_data else []
+                tenders_data = orjson.loads(response_content)['tenders']
+                from_llm = True
                 
                 # If AI found nothing, try fallback extraction
                 if len(tenders_data) == 0:
@@ -137,18 +421,23 @@ Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating
                     fallback_tenders = self.fallback_extraction(state)
                     if len(fallback_tenders) > 0:
                         tenders_data = fallback_tenders
+                        from_llm = False
                         logger.info(f"Fallback extraction found {len(fallback_tenders)} tenders")
                 
                 state['categorized_tenders'] = tenders_data
                 logger.info(f"Agent 1: Extracted {len(tenders_data)} tenders")
                 
-            except json.JSONDecodeError as e:
+            except (orjson.JSONDecodeError, KeyError) as e:
                 logger.error(f"Agent 1: Failed to parse JSON response: {e}")
                 logger.error(f"Raw response: {response_content}")
                 # Create a fallback result based on simple text analysis
                 fallback_tenders = self.fallback_extraction(state)
                 state['categorized_tenders'] = fallback_tenders
                 logger.info(f"Agent 1: Using fallback extraction, found {len(fallback_tenders)} tenders")
+            
+            # Heuristic results are not cached, so unchanged content gets another LLM attempt
+            if from_llm:
+                self._save_agent1_result(state)
                 
         except Exception as e:
             logger.error(f"Agent 1 error: {e}")
@@ -157,6 +446,75 @@ Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating
         
         return state
     
+    async def extract_tenders_batch(self, states: List[AgentState]) -> List[AgentState]:
+        """Agent 1 for several pages: one LLM call per batch of pages sharing a keyword set"""
+        pending = {}
+        prompt_content = {}
+        for state in states:
+            state['categorized_tenders'] = []
+            keywords = tuple(state['keywords_esg']) + tuple(state['keywords_credit'])
+            page_content = _agent1_page_content(state['page_content'], keywords, _compile_kw_re(keywords))
+            if page_content is None:
+                logger.info(f"Agent 1: No keywords found on {state['page_url']}, skipping LLM")
+                continue
+            cached_tenders = self._load_agent1_result(state)
+            if cached_tenders is not None:
+                logger.info(f"Agent 1: {state['page_url']} unchanged, reusing {len(cached_tenders)} tenders")
+                state['categorized_tenders'] = cached_tenders
+                continue
+            keyword_key = (tuple(state['keywords_esg']), tuple(state['keywords_credit']))
+            pending.setdefault(keyword_key, []).append(state)
+            prompt_content[id(state)] = page_content
+        
+        for (keywords_esg, keywords_credit), group in pending.items():
+            system_message = _agent1_system_message(keywords_esg, keywords_credit, batch=True)
+            
+            for i in range(0, len(group), Config.AGENT1_BATCH_SIZE):
+                batch = group[i:i + Config.AGENT1_BATCH_SIZE]
+                logger.info(f"Agent 1: Extracting tenders from a batch of {len(batch)} pages")
+                
+                # Positional doc ids: the model can't mangle them the way it can echo back URLs
+                user_prompt = "\n\n".join(
+                    f"""<<<DOC id={doc_id}>>>
+Page URL: {state['page_url']}
+
+Page Content (look for procurement opportunities that contain the specified keywords):
+{prompt_content[id(state)]}
+<<<END {doc_id}>>>"""
+                    for doc_id, state in enumerate(batch)
+                )
+                messages = [
+                    system_message,
+                    HumanMessage(content=user_prompt)
+                ]
+                
+                try:
+                    response_content = await self._cached_ainvoke(messages, TenderBatch)
+                    by_doc = {
+                        page['doc_id']: page['tenders']
+                        for page in orjson.loads(response_content)['pages']
+                    }
+                except Exception as e:
+                    logger.error(f"Agent 1: Batch extraction failed: {e}")
+                    by_doc = {}
+                
+                for doc_id, state in enumerate(batch):
+                    tenders_data = by_doc.get(str(doc_id))
+                    from_llm = tenders_data is not None
+                    if not tenders_data:
+                        # Same behaviour as the single-page node: fall back to text analysis
+                        fallback_tenders = self.fallback_extraction(state)
+                        if fallback_tenders:
+                            tenders_data = fallback_tenders
+                            from_llm = False
+                    state['categorized_tenders'] = tenders_data or []
+                    logger.info(f"Agent 1: Extracted {len(state['categorized_tenders'])} tenders from {state['page_url']}")
+                    # Only LLM answers are cached; a failed call or heuristic result is retried next crawl
+                    if from_llm:
+                        self._save_agent1_result(state)
+        
+        return states
+    
     def fallback_extraction(self, state: AgentState) -> List[Dict]:
         """Fallback tender extraction using simple text analysis"""
         try:
@@ -165,82 +523,44 @@ Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating
             
             logger.info("Running fallback extraction...")
             
-            # Look for date patterns in the content
-            date_patterns = [
-                r'(\d{1,2})\s+(января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)\s+(\d{4})',
-                r'(\d{1,2})\.(\d{1,2})\.(\d{4})',
-                r'(\d{4})-(\d{1,2})-(\d{1,2})',
-                r'(\d{1,2})/(\d{1,2})/(\d{4})'
-            ]
-            
-            months_ru = {
-                'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4,
-                'мая': 5, 'июня': 6, 'июля': 7, 'августа': 8,
-                'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12
-            }
+            esg_re = _compile_kw_re(tuple(state['keywords_esg']))
+            credit_re = _compile_kw_re(tuple(state['keywords_credit']))
             
             tenders = []
-            lines = content.split('\n')
+            content_len = len(content)
+            last_line_start = -1
             
             # Look for lines with dates (common in tender listings)
-            for i, line in enumerate(lines):
-                line_clean = line.strip()
-                if not line_clean or len(line_clean) < 5:
-                    continue
+            for match in _DATE_RE.finditer(content):
+                line_start = content.rfind('\n', 0, match.start()) + 1
+                if line_start == last_line_start:
+                    continue  # Only the first date on a line counts
+                last_line_start = line_start
                 
-                # Check if line contains a date
-                date_found = None
-                for pattern in date_patterns:
-                    match = re.search(pattern, line_clean)
-                    if match:
-                        try:
-                            if 'января' in pattern or 'февраля' in pattern:  # Russian month names
-                                day, month_name, year = match.groups()
-                                month = months_ru.get(month_name.lower())
-                                if month:
-                                    date_found = f"{year}-{month:02d}-{int(day):02d}"
-                            else:  # Numeric dates
-                                groups = match.groups()
-                                if len(groups) == 3:
-                                    if '.' in pattern or '/' in pattern:
-                                        day, month, year = groups
-                                        date_found = f"{year}-{int(month):02d}-{int(day):02d}"
-                                    else:  # YYYY-MM-DD format
-                                        year, month, day = groups
-                                        date_found = f"{year}-{int(month):02d}-{int(day):02d}"
-                            break
-                        except (ValueError, TypeError):
-                            continue
+                date_found = _normalize_date_match(match)
                 
                 # If we found a date, this might be a tender listing
                 if date_found:
-                    # Look for context around this line
-                    context_lines = []
-                    for j in range(max(0, i-2), min(len(lines), i+3)):
-                        if lines[j].strip():
-                            context_lines.append(lines[j].strip())
+                    line_end = content.find('\n', match.end())
+                    if line_end == -1:
+                        line_end = content_len
+                    line_clean = content[line_start:line_end].strip()
                     
-                    context = ' '.join(context_lines)
+                    # Look for context around this line (two lines either side)
+                    context_start, context_end = line_start, line_end
+                    for _ in range(2):
+                        if context_start > 0:
+                            context_start = content.rfind('\n', 0, context_start - 1) + 1
+                        if context_end < content_len:
+                            next_end = content.find('\n', context_end + 1)
+                            context_end = content_len if next_end == -1 else next_end
                     
-                    # Determine category based on keywords
-                    category = 'other'
-                    matched_keywords = []
-                    context_lower = context.lower()
+                    context = ' '.join(
+                        ln.strip() for ln in content[context_start:context_end].split('\n') if ln.strip()
+                    )
                     
-                    # Check ESG keywords
-                    for keyword in state['keywords_esg']:
-                        if keyword.lower() in context_lower:
-                            category = 'esg'
-                            matched_keywords.append(keyword)
-                            break
-                    
-                    # Check Credit Rating keywords
-                    if category == 'other':
-                        for keyword in state['keywords_credit']:
-                            if keyword.lower() in context_lower:
-                                category = 'credit_rating'
-                                matched_keywords.append(keyword)
-                                break
+                    # Determine category based on keywords
+                    category, matched_keywords = _categorize_text(context, esg_re, credit_re)
                     
                     # Create tender entry
                     title = line_clean[:100] if len(line_clean) <= 100 else line_clean[:97] + "..."
@@ -261,43 +581,24 @@ Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating
             if len(tenders) == 0:
                 logger.info("No date-based tenders found, looking for keyword-based matches...")
                 
-                tender_keywords = [
-                    'тендер', 'конкурс', 'закупка', 'tender', 'procurement', 'bid', 'rfp',
-                    'внутренние тендеры', 'международные тендеры', 'ознакомиться'
-                ]
-                
-                for line in lines:
-                    line_clean = line.strip().lower()
-                    if any(keyword in line_clean for keyword in tender_keywords):
+                # Strip every line once; all matchers are case-insensitive, so no lowercased copy is needed
+                stripped = [ln.strip() for ln in content.split('\n')]
+                for line_clean in stripped:
+                    if line_clean and _TENDER_KEYWORDS_RE.search(line_clean):
                         # Found a tender-related line
-                        category = 'other'
-                        matched_keywords = []
-                        
-                        # Check for category keywords
-                        for keyword in state['keywords_esg']:
-                            if keyword.lower() in line_clean:
-                                category = 'esg'
-                                matched_keywords.append(keyword)
-                                break
-                        
-                        if category == 'other':
-                            for keyword in state['keywords_credit']:
-                                if keyword.lower() in line_clean:
-                                    category = 'credit_rating'
-                                    matched_keywords.append(keyword)
-                                    break
+                        category, matched_keywords = _categorize_text(line_clean, esg_re, credit_re)
                         
                         tender = {
-                            'title': line.strip()[:100],
+                            'title': line_clean[:100],
                             'url': state['page_url'],
                             'date': None,
                             'category': category,
-                            'description': line.strip(),
+                            'description': line_clean,
                             'matched_keywords': matched_keywords
                         }
                         
                         tenders.append(tender)
-                        logger.info(f"Found keyword-based tender: {line.strip()[:50]}...")
+                        logger.info(f"Found keyword-based tender: {line_clean[:50]}...")
                         
                         if len(tenders) >= 5:  # Limit to avoid too many results
                             break
@@ -311,17 +612,80 @@ Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating
     
     def parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime object"""
-        if not date_str or date_str == 'null':
-            return None
-        
-        try:
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except:
+        return _parse_date(date_str)
+
+    async def _process_tender_details(self, tender: Dict, scraper: "TenderScraper",
+                                      semaphore: asyncio.Semaphore, now_iso: str) -> Optional[Dict]:
+        """Scrape one tender page and extract its details with the LLM"""
+        async with semaphore:
             try:
-                return datetime.strptime(date_str, '%Y-%m-%d')
-            except:
-                return None
+                logger.info(f"Agent 2: Processing detailed info for: {tender.get('title', 'N/A')[:50]}...")
+                
+                # Scrape the tender's specific URL for detailed information
+                result = await scraper.scrape_page(tender['url'])
+                
+                if result['status'] == 'success':
+                    # Generate detailed description using AI
+                    user_prompt = f"""
+Tender Title: {tender.get('title', 'N/A')}
+Category: {tender.get('category', 'N/A')}
+Original Description: {tender.get('description', 'N/A')}
 
+Full Page Content:
+{result['markdown']}
+
+Generate a detailed professional summary of this tender."""
+
+                    messages = [
+                        _SYS_MSG_AGENT2,
+                        HumanMessage(content=user_prompt)
+                    ]
+                    
+                    try:
+                        response_content = await self._cached_ainvoke(messages, DetailedTenderInfo)
+                        detailed_info = orjson.loads(response_content)
+                    except Exception as e:
+                        # Structured output failed (refusal, schema validation or invoke error):
+                        # keep the scraped page as a partial record instead of dropping the tender
+                        logger.error(f"Agent 2: Failed to extract detailed info for {tender.get('title', 'N/A')}: {e}")
+                        return {
+                            **tender,
+                            'detailed_info': {
+                                'title': tender.get('title', 'N/A'),
+                                'description': result['markdown'][:1000] + "..." if len(result['markdown']) > 1000 else result['markdown'],
+                                'requirements': 'Information extraction failed',
+                                'deadline': None,
+                                'contact_info': 'Not available',
+                                'additional_details': 'Processing error occurred'
+                            },
+                            'full_content_ref': self.content_store.put(result['markdown']),
+                            'processing_status': 'partial',
+                            'processed_at': now_iso
+                        }
+                    
+                    # Keep the full page on disk and carry only a reference in the state
+                    detailed_info['full_content_ref'] = self.content_store.put(result['markdown'])
+                    
+                    # Save to detailed_tender database
+                    # First, we need the tender_id from the basic tender saved by Agent 1
+                    # For now, we'll store it in the state and let the scheduler handle DB operations
+                    detailed_tender = {
+                        **tender,
+                        'detailed_info': detailed_info,
+                        'processing_status': 'processed',
+                        'processed_at': now_iso
+                    }
+                    
+                    logger.info(f"Agent 2: Successfully processed detailed info for: {tender.get('title', 'N/A')[:50]}...")
+                    return detailed_tender
+                else:
+                    logger.error(f"Agent 2: Failed to scrape tender details: {result.get('error', 'Unknown error')}")
+                    return None
+                    
+            except Exception as e:
+                logger.error(f"Agent 2: Error processing tender {tender.get('title', 'N/A')}: {e}")
+                return None
+    
     async def process_tender_details_node(self, state: AgentState) -> AgentState:
         """Agent 2: Extract full details for filtered tenders and save to detailed_tender database"""
         try:
@@ -331,113 +695,23 @@ Extract ONLY tenders that contain at least one ESG keyword OR one Credit Rating
             from database import DatabaseManager
             db_manager = DatabaseManager()
             
-            detailed_tenders = []
+            # Process only the tenders that Agent 1 has already filtered and saved,
+            # overlapping the scrape + LLM latency of independent tenders
+            semaphore = asyncio.Semaphore(Config.DETAIL_CONCURRENCY)
+            now_iso = datetime.now(timezone.utc).isoformat()
+            scraper = await get_scraper()
+            results = await asyncio.gather(
+                *[self._process_tender_details(tender, scraper, semaphore, now_iso)
+                  for tender in state['categorized_tenders']],
+                return_exceptions=True
+            )
             
-            # Process only the tenders that Agent 1 has already filtered and saved
-            async with TenderScraper() as scraper:
-                for tender in state['categorized_tenders']:
-                    try:
-                        logger.info(f"Agent 2: Processing detailed info for: {tender.get('title', 'N/A')[:50]}...")
-                        
-                        # Scrape the tender's specific URL for detailed information
-                        result = await scraper.scrape_page(tender['url'])
-                        
-                        if result['status'] == 'success':
-                            # Generate detailed description using AI
-                            system_prompt = """You are a tender detail extraction specialist. Your task is to:
-1. Extract comprehensive details from tender pages
-2. Provide all information in ENGLISH, regardless of source language
-3. Be thorough and accurate
-
-Extract the following information:
-- Full tender title (TRANSLATE TO ENGLISH)
-- Complete description (TRANSLATE TO ENGLISH)
-- Requirements and specifications (TRANSLATE TO ENGLISH)
-- Deadline/closing date
-- Contact information
-- Any other relevant details
-
-Return ONLY a valid JSON object:
-{
-  "title": "full tender title (IN ENGLISH)",
-  "description": "comprehensive description (IN ENGLISH)",
-  "requirements": "key requirements (IN ENGLISH)",
-  "deadline": "YYYY-MM-DD or null",
-  "contact_info": "contact details (IN ENGLISH)",
-  "additional_details": "other relevant information (IN ENGLISH)"
-}
-
-IMPORTANT: ALL TEXT MUST BE IN ENGLISH. Return only valid JSON."""
-                            
-                            user_prompt = f"""
-Tender Title: {tender.get('title', 'N/A')}
-Category: {tender.get('category', 'N/A')}
-Original Description: {tender.get('description', 'N/A')}
-
-Full Page Content:
-{result['markdown']}
-
-Generate a detailed professional summary of this tender."""
-
-                            messages = [
-                                SystemMessage(content=system_prompt),
-                                HumanMessage(content=user_prompt)
-                            ]
-                            
-                            response = await self.llm.ainvoke(messages)
-                            
-                            try:
-                                # Parse the AI response
-                                response_content = response.content.strip()
-                                if response_content.startswith('```json'):
-                                    start = response_content.find('{')
-                                    end = response_content.rfind('}') + 1
-                                    json_str = response_content[start:end]
-                                else:
-                                    json_str = response_content
-                                
-                                detailed_info = json.loads(json_str)
-                                
-                                # Add full content to detailed info
-                                detailed_info['full_content'] = result['markdown']
-                                
-                                # Save to detailed_tender database
-                                # First, we need the tender_id from the basic tender saved by Agent 1
-                                # For now, we'll store it in the state and let the scheduler handle DB operations
-                                detailed_tender = {
-                                    **tender,
-                                    'detailed_info': detailed_info,
-                                    'processing_status': 'processed',
-                                    'processed_at': datetime.utcnow().isoformat()
-                                }
-                                
-                                detailed_tenders.append(detailed_tender)
-                                logger.info(f"Agent 2: Successfully processed detailed info for: {tender.get('title', 'N/A')[:50]}...")
-                                
-                            except json.JSONDecodeError as e:
-                                logger.error(f"Agent 2: Failed to parse detailed response for {tender.get('title', 'N/A')}: {e}")
-                                # Create fallback detailed info
-                                detailed_tender = {
-                                    **tender,
-                                    'detailed_info': {
-                                        'title': tender.get('title', 'N/A'),
-                                        'description': result['markdown'][:1000] + "..." if len(result['markdown']) > 1000 else result['markdown'],
-                                        'requirements': 'Information extraction failed',
-                                        'deadline': None,
-                                        'contact_info': 'Not available',
-                                        'additional_details': 'Processing error occurred'
-                                    },
-                                    'full_content': result['markdown'],
-                                    'processing_status': 'partial',
-                                    'processed_at': datetime.utcnow().isoformat()
-                                }
-                                detailed_tenders.append(detailed_tender)
-                        else:
-                            logger.error(f"Agent 2: Failed to scrape tender details: {result.get('error', 'Unknown error')}")
-                            
-                    except Exception as e:
-                        logger.error(f"Agent 2: Error processing tender {tender.get('title', 'N/A')}: {e}")
-                        continue
+            detailed_tenders = []
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Agent 2: Error processing tender: {result}")
+                elif result:
+                    detailed_tenders.append(result)
             
             state['detailed_tenders'] = detailed_tenders
             logger.info(f"Agent 2: Processed {len(detailed_tenders)} detailed tenders")
@@ -498,6 +772,8 @@ async def test_agents():
             
     except Exception as e:
         print(f"✗ Agent workflow failed: {e}")
+    finally:
+        await close_scraper()
 
 if __name__ == "__main__":
     import asyncio
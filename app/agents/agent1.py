@@ -2,18 +2,241 @@
 FIXED Agent 1: Tender Extraction with STRICT Keyword Filtering
 Updated to remove 'both' category - only ESG or Credit Rating
 """
+import asyncio
 import logging
-import json
+import hashlib
 import re
-from typing import Dict, List, Any
-from datetime import datetime, timedelta
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Any, Literal, Optional, Set, Tuple, Type
+from datetime import date, timedelta
+from urllib.parse import urljoin
+from langchain_core.exceptions import OutputParserException
 from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage
+from langchain.schema import HumanMessage, SystemMessage
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
 
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.llm_cache_repository import LLMCacheRepository
 
 logger = logging.getLogger(__name__)
 
+
+class ExtractedTender(BaseModel):
+    """A tender as returned by the extraction LLM"""
+    title: str = Field(description="English translated title")
+    url: str = Field(description="Full URL to the tender page")
+    date: Optional[str] = Field(description="Publication date as YYYY-MM-DD, or null")
+    description: str = Field(description="English translated brief description")
+    category: Literal['esg', 'credit_rating']
+    matched_keywords: List[str]
+    confidence_score: float
+
+
+class TenderList(BaseModel):
+    """Tenders extracted from one page"""
+    tenders: List[ExtractedTender]
+
+
+class DocumentTenders(BaseModel):
+    """Tenders extracted from one document of a batch"""
+    doc_id: str
+    tenders: List[ExtractedTender]
+
+
+class TenderBatch(BaseModel):
+    """Tenders extracted from every document of a batch"""
+    documents: List[DocumentTenders]
+
+
+class CleanTender(BaseModel):
+    """A validated Agent 1 tender; unknown keys are dropped"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+    
+    title: str
+    url: str
+    date: Optional[str] = None
+    description: str = ""
+    category: str = 'esg'
+    matched_keywords: List[str] = []
+    esg_keyword_count: int = 0
+    credit_keyword_count: int = 0
+    keyword_count: int = 0
+    date_status: str = 'unknown'
+    confidence_score: float = 0.8
+    
+    @field_validator('description')
+    @classmethod
+    def _limit_description(cls, value: str) -> str:
+        return value[:500]
+    
+    @field_validator('category')
+    @classmethod
+    def _only_esg_or_credit(cls, value: str) -> str:
+        category = value.lower()
+        if category not in ('esg', 'credit_rating'):
+            logger.warning(f"Invalid category '{category}', defaulting to 'esg'")
+            return 'esg'
+        return category
+    
+    @model_validator(mode='after')
+    def _count_keywords(self) -> 'CleanTender':
+        self.keyword_count = len(self.matched_keywords)
+        return self
+
+
+_EXTRACTION_RULES = """You extract procurement tenders from web page content.
+- For each tender give title, URL, publication date and a brief description.
+- Translate title and description to English; keep URLs unchanged.
+- category is "esg" or "credit_rating" (never both): the keyword list with more matches, "esg" on a tie.
+- matched_keywords lists the given keywords that the tender mentions."""
+
+_STRICT_RULES = """- ONLY extract tenders whose title or description contains at least one given keyword (case-insensitive, inflections count). Return no tenders if none do."""
+
+_ALL_TENDERS_RULES = """- Extract ALL tenders regardless of keywords (testing mode)."""
+
+# Static system blocks, byte-identical on every call so the provider's prompt
+# prefix cache can reuse them; keywords and page content follow in the user message
+_SYSTEM_MESSAGE_STRICT = SystemMessage(content=f"{_EXTRACTION_RULES}\n{_STRICT_RULES}")
+_SYSTEM_MESSAGE_ALL_TENDERS = SystemMessage(content=f"{_EXTRACTION_RULES}\n{_ALL_TENDERS_RULES}")
+
+
+@lru_cache(maxsize=4)
+def _get_llm(model: str, api_key: str, temperature: float) -> ChatOpenAI:
+    """Shared ChatOpenAI client (and its HTTP connection pool) per configuration"""
+    return ChatOpenAI(model=model, api_key=api_key, temperature=temperature)
+
+
+@lru_cache(maxsize=32)
+def _keyword_scanner(keywords: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[str, Tuple[str, ...]]]:
+    """
+    Compile lowercased keywords into a single pattern that is tried at every
+    position of the text (one pass instead of one substring scan per keyword).
+    
+    At each position the alternation reports only the longest keyword, so the
+    second value maps every keyword to all keywords contained in it; together
+    they give exactly the set of keywords that occur as substrings.
+    """
+    unique = sorted({k for k in keywords if k}, key=len, reverse=True)
+    if not unique:
+        return re.compile(r'(?!)'), {}
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, unique)) + '))')
+    contained = {k: tuple(other for other in unique if other in k) for k in unique}
+    return pattern, contained
+
+
+@lru_cache(maxsize=32)
+def _keyword_span_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    """
+    Case-insensitive keyword alternation for matching the original (not
+    lowercased) text, so match offsets index it directly: str.lower() can
+    change lengths, e.g. 'İ' lowercases to two code points
+    """
+    unique = sorted({k for k in keywords if k}, key=len, reverse=True)
+    if not unique:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(map(re.escape, unique)), re.IGNORECASE)
+
+
+_WORD_RE = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=128)
+def _compile_keyword_matcher(keywords: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[str, List[str]], Dict[str, Tuple[str, ...]]]:
+    """
+    Prepare keywords for whole-word matching with simple inflections (s/ing/ed).
+    
+    Returns a word-boundary pattern for multi-word phrases, a map from stem to
+    keywords, and a map from every inflected form of a single-word stem to its
+    stems, so single words are found by set lookups on the text's tokens.
+    """
+    by_stem: Dict[str, List[str]] = {}
+    for keyword in keywords:
+        keyword_lower = keyword.lower()
+        stem = keyword_lower
+        for suffix in ('ing', 'ed', 's'):
+            if keyword_lower.endswith(suffix) and len(keyword_lower) - len(suffix) > 3:
+                stem = keyword_lower[:-len(suffix)]
+                break
+        if stem:
+            by_stem.setdefault(stem, []).append(keyword)
+    
+    token_forms: Dict[str, Tuple[str, ...]] = {}
+    phrases = []
+    for stem in by_stem:
+        if _WORD_RE.fullmatch(stem):
+            for form in (stem, stem + 's', stem + 'ing', stem + 'ed'):
+                token_forms[form] = token_forms.get(form, ()) + (stem,)
+        else:
+            phrases.append(stem)
+    
+    if not phrases:
+        return re.compile(r'(?!)'), by_stem, token_forms
+    phrases.sort(key=len, reverse=True)
+    pattern = re.compile(r'\b(' + '|'.join(map(re.escape, phrases)) + r')(?:s|ing|ed)?\b')
+    return pattern, by_stem, token_forms
+
+
+def _find_keywords(text_lower: str, keywords_lower: Tuple[str, ...]) -> Set[str]:
+    """Return the lowercased keywords that occur anywhere in the lowercased text"""
+    pattern, contained = _keyword_scanner(keywords_lower)
+    found = set()
+    for hit in {m.group(1) for m in pattern.finditer(text_lower)}:
+        found.update(contained[hit])
+    return found
+
+
+# Markdown links (not images) as produced by the crawler: [text](url)
+_MD_LINK_RE = re.compile(r'(?<!!)\[([^\]\n]+)\]\(([^)\s]+)[^)]*\)')
+
+# Normalized tender dates (what the LLM and the deterministic pass produce)
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+
+# Publication dates as YYYY-MM-DD / YYYY.MM.DD or DD.MM.YYYY / DD/MM/YYYY
+_LISTING_DATE_RE = re.compile(
+    r'\b(?:(?P<y1>20\d{2})[-/.](?P<m1>\d{1,2})[-/.](?P<d1>\d{1,2})'
+    r'|(?P<d2>\d{1,2})[./](?P<m2>\d{1,2})[./](?P<y2>20\d{2}))\b'
+)
+
+
+# Procurement vocabulary a line must carry before its link counts as a tender without the LLM
+_PROCUREMENT_TERM_RE = re.compile(
+    r'\b(?:tenders?|rfp|rfq|rfi|eoi|bids?|bidding|procurement|request for (?:proposals?|quotations?)'
+    r'|expression of interest|тендер\w*|закупк\w*|ihale\w*)\b',
+    re.IGNORECASE
+)
+
+
+def _find_listing_date(text: str):
+    """Return the first valid date in text as YYYY-MM-DD, or None"""
+    for match in _LISTING_DATE_RE.finditer(text):
+        if match['y1']:
+            year, month, day = match['y1'], match['m1'], match['d1']
+        else:
+            year, month, day = match['y2'], match['m2'], match['d2']
+        try:
+            return date(int(year), int(month), int(day)).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _keyword_windows(content: str, keywords_lower: Tuple[str, ...],
+                     before: int = 500, after: int = 1500) -> str:
+    """Cut the page down to merged windows around keyword hits, separated by ---"""
+    pattern = _keyword_span_pattern(keywords_lower)
+    spans = []
+    for match in pattern.finditer(content):
+        start = max(0, match.start() - before)
+        end = min(len(content), match.end() + after)
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    return '\n---\n'.join(content[start:end] for start, end in spans)
+
+
 class TenderExtractionAgent:
     """
     FIXED Agent 1: Extract tenders with STRICT keyword filtering
@@ -27,11 +250,21 @@ class TenderExtractionAgent:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.1
-        )
+        self.llm = _get_llm(settings.OPENAI_MODEL, settings.OPENAI_API_KEY, 0.1)
+        # Server-side constrained decoding, so responses always match the schema
+        self.structured_llms = {
+            schema: self.llm.with_structured_output(schema, method="json_schema", strict=True)
+            for schema in (TenderList, TenderBatch)
+        }
+        
+        self.cache_repo = LLMCacheRepository()
+        
+        # Pages whose keyword excerpts share one LLM call in extract_many
+        self.batch_size = 5
+        
+        # Deterministic extraction must find at least this many tender-shaped
+        # listings (dated line + procurement term) before the page skips the LLM
+        self.min_deterministic_tenders = 3
         
         # Date filtering configuration
         self.max_days_old = 90
@@ -40,7 +273,8 @@ class TenderExtractionAgent:
     async def extract_and_categorize_tenders(self, page_content: str, 
                                            esg_keywords: List[str], 
                                            credit_keywords: List[str],
-                                           include_all_tenders: bool = False) -> List[Dict[str, Any]]:
+                                           include_all_tenders: bool = False,
+                                           page_url: str = "") -> List[Dict[str, Any]]:
         """
         Extract and categorize tenders with STRICT keyword filtering
         Only returns 'esg' or 'credit_rating' categories (no 'both')
@@ -50,6 +284,7 @@ class TenderExtractionAgent:
             esg_keywords: List of ESG-related keywords
             credit_keywords: List of credit rating keywords
             include_all_tenders: If True, skip keyword filtering (for testing)
+            page_url: Page URL, used to resolve relative tender links
             
         Returns:
             List of tenders categorized as either 'esg' or 'credit_rating'
@@ -60,214 +295,335 @@ class TenderExtractionAgent:
             logger.info(f"Credit keywords: {credit_keywords}")
             logger.info(f"Keyword filtering: {'DISABLED' if include_all_tenders else 'ENABLED (STRICT)'}")
             
+            # Lowercase the page and keywords once; helpers below take the lowered views
+            content_lower = page_content.lower()
+            esg_lower = tuple(keyword.lower() for keyword in esg_keywords)
+            credit_lower = tuple(keyword.lower() for keyword in credit_keywords)
+            
             # Step 1: Pre-filter content - check if ANY keywords exist
             if not include_all_tenders:
-                keyword_found = self._check_keywords_in_content(page_content, esg_keywords + credit_keywords)
+                keyword_found = self._check_keywords_in_content(content_lower, esg_lower + credit_lower)
                 if not keyword_found:
                     logger.info("Agent 1: No ESG or Credit Rating keywords found in content - skipping extraction")
                     return []
+                
+                # Cheap path first: keyword lines that link to a tender need no LLM
+                deterministic_tenders = self._deterministic_extract(
+                    page_content, esg_lower + credit_lower, page_url
+                )
+                if len(deterministic_tenders) >= self.min_deterministic_tenders:
+                    logger.info(f"Agent 1: Deterministic extraction found {len(deterministic_tenders)} tenders, skipping LLM")
+                    return await asyncio.to_thread(
+                        self._finalize_tenders,
+                        deterministic_tenders, esg_keywords, credit_keywords, esg_lower, credit_lower
+                    )
+                
+                # Only the regions around keyword hits can hold matching tenders
+                llm_content = _keyword_windows(page_content, esg_lower + credit_lower)
+                logger.info(f"Agent 1: Reduced content from {len(page_content)} to {len(llm_content)} chars")
+            else:
+                llm_content = page_content
             
-            # Step 2: Build the STRICT extraction prompt
-            system_prompt = self._build_strict_extraction_prompt(esg_keywords, credit_keywords, include_all_tenders)
+            # Step 2: Pick the static extraction instructions
+            system_message = self._build_strict_extraction_prompt(include_all_tenders)
             
-            # Step 3: Create user message with keyword emphasis
-            user_message = f"""
-KEYWORDS TO MATCH (MANDATORY):
-=============================
-ESG Keywords: {', '.join(esg_keywords)}
+            # Step 3: Create user message with the keywords and content
+            user_message = f"""ESG Keywords: {', '.join(esg_keywords)}
 Credit Rating Keywords: {', '.join(credit_keywords)}
 
 CONTENT TO ANALYZE:
-==================
-{page_content}
-
-CRITICAL INSTRUCTION: 
-- ONLY extract tenders that contain at least ONE keyword from the lists above
-- If a tender doesn't mention these specific keywords, DO NOT include it
-- Categorize as either 'esg' OR 'credit_rating' (no 'both' category)
-- If tender has keywords from both categories, choose the category with MORE keyword matches
-- Return EMPTY ARRAY [] if no tenders contain the keywords
-
-Return ONLY the JSON array with tenders that contain the specified keywords.
-"""
+{llm_content}"""
             
-            # Step 4: Get response from LLM
+            # Step 4: Get the schema-validated response from the LLM
             messages = [
-                HumanMessage(content=f"{system_prompt}\n\n{user_message}")
+                system_message,
+                HumanMessage(content=user_message)
             ]
             
-            response = await self.llm.ainvoke(messages)
-            response_text = response.content.strip()
+            response_text = await self._cached_ainvoke(messages, TenderList)
             
             logger.info(f"Agent 1 raw response: {response_text[:300]}...")
             
-            # Step 5: Parse and validate response
-            tenders = self._parse_json_response(response_text)
+            # Step 5: Convert to plain tender dicts
+            tenders = [tender.model_dump() for tender in TenderList.model_validate_json(response_text).tenders]
             
-            # Step 6: CRITICAL - Double-check keyword matching and categorization
-            if not include_all_tenders:
-                validated_tenders = self._double_check_keyword_matching(tenders, esg_keywords, credit_keywords)
-                logger.info(f"Before keyword validation: {len(tenders)} tenders")
-                logger.info(f"After keyword validation: {len(validated_tenders)} tenders")
-                tenders = validated_tenders
+            # Step 6: CRITICAL - Double-check keywords, filter by date and validate
+            if include_all_tenders:
+                final_tenders = await asyncio.to_thread(self._validate_tenders, tenders)
+                logger.info(f"Agent 1 COMPLETED: {len(final_tenders)} valid tenders extracted")
+                self._log_categorization_summary(final_tenders, esg_keywords, credit_keywords)
+                return final_tenders
             
-            # Step 7: Apply date filtering if enabled
-            if not include_all_tenders:
-                filtered_tenders = self._apply_date_filtering(tenders)
-                logger.info(f"After date filtering: {len(filtered_tenders)} tenders")
-                tenders = filtered_tenders
+            # Validation is CPU-bound; keep it off the event loop so other pages can progress
+            return await asyncio.to_thread(
+                self._finalize_tenders, tenders, esg_keywords, credit_keywords, esg_lower, credit_lower
+            )
+            
+        except Exception as e:
+            logger.error(f"Agent 1 failed: {e}")
+            return []
+    
+    async def extract_many(self, pages: List[Tuple[Any, str, str]],
+                           esg_keywords: List[str],
+                           credit_keywords: List[str],
+                           include_all_tenders: bool = False) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Extraction for several pages, packing up to batch_size pages into one
+        LLM call so the system prompt is paid once
+        
+        Args:
+            pages: (page_id, page_url, page_content) tuples
+            esg_keywords: List of ESG-related keywords
+            credit_keywords: List of credit rating keywords
+            include_all_tenders: If True, extract every tender from the full pages
+                (no keyword pre-filter or keyword/date checks), as
+                extract_and_categorize_tenders(include_all_tenders=True) does
+            
+        Returns:
+            Dict mapping each page_id to its validated tenders
+        """
+        esg_lower = tuple(keyword.lower() for keyword in esg_keywords)
+        credit_lower = tuple(keyword.lower() for keyword in credit_keywords)
+        all_lower = esg_lower + credit_lower
+        
+        results: Dict[Any, List[Dict[str, Any]]] = {}
+        pending = []
+        
+        for page_id, page_url, page_content in pages:
+            if include_all_tenders:
+                pending.append((page_id, page_content))
+                continue
+            
+            content_lower = page_content.lower()
+            if not self._check_keywords_in_content(content_lower, all_lower):
+                results[page_id] = []
+                continue
             
-            # Step 8: Final validation and cleaning
-            final_tenders = self._validate_tenders(tenders)
+            deterministic_tenders = self._deterministic_extract(page_content, all_lower, page_url)
+            if len(deterministic_tenders) >= self.min_deterministic_tenders:
+                logger.info(f"Agent 1: Deterministic extraction found {len(deterministic_tenders)} tenders on {page_url}")
+                results[page_id] = await asyncio.to_thread(
+                    self._finalize_tenders, deterministic_tenders, esg_keywords, credit_keywords, esg_lower, credit_lower
+                )
+                continue
             
-            logger.info(f"Agent 1 COMPLETED: {len(final_tenders)} valid tenders extracted")
-            self._log_categorization_summary(final_tenders, esg_keywords, credit_keywords)
+            pending.append((page_id, _keyword_windows(page_content, all_lower)))
+        
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        logger.info(f"Agent 1: {len(pending)} pages need the LLM, sending {len(batches)} batches")
+        
+        batch_results = await asyncio.gather(*(
+            self._extract_batch(batch, esg_keywords, credit_keywords, include_all_tenders) for batch in batches
+        ))
+        
+        for batch, tenders_by_doc in zip(batches, batch_results):
+            for page_id, _ in batch:
+                if include_all_tenders:
+                    results[page_id] = await asyncio.to_thread(self._validate_tenders, tenders_by_doc.get(str(page_id), []))
+                    continue
+                results[page_id] = await asyncio.to_thread(
+                    self._finalize_tenders, tenders_by_doc.get(str(page_id), []),
+                    esg_keywords, credit_keywords, esg_lower, credit_lower
+                )
+        
+        return results
+    
+    async def _extract_batch(self, batch: List[Tuple[Any, str]],
+                             esg_keywords: List[str],
+                             credit_keywords: List[str],
+                             include_all_tenders: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """One LLM call for several page excerpts, returning tenders per document id"""
+        try:
+            system_message = self._build_strict_extraction_prompt(include_all_tenders)
+            documents = "\n".join(
+                f"<<<DOC id={page_id}>>>\n{content}\n<<<END {page_id}>>>"
+                for page_id, content in batch
+            )
+            
+            user_message = f"""ESG Keywords: {', '.join(esg_keywords)}
+Credit Rating Keywords: {', '.join(credit_keywords)}
+
+Analyze each document separately (delimited by <<<DOC id=N>>> and <<<END N>>>) and return one entry per document id.
+
+DOCUMENTS TO ANALYZE:
+{documents}"""
+            messages = [
+                system_message,
+                HumanMessage(content=user_message)
+            ]
             
-            return final_tenders
+            response_text = await self._cached_ainvoke(messages, TenderBatch)
+            return {
+                document.doc_id: [tender.model_dump() for tender in document.tenders]
+                for document in TenderBatch.model_validate_json(response_text).documents
+            }
             
         except Exception as e:
-            logger.error(f"Agent 1 failed: {e}")
-            return []
+            logger.error(f"Agent 1 batch of {len(batch)} pages failed: {e}")
+            return {}
+    
+    def _finalize_tenders(self, tenders: List[Dict[str, Any]],
+                          esg_keywords: List[str], credit_keywords: List[str],
+                          esg_lower: Tuple[str, ...], credit_lower: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """Keyword double-check, date filtering and final validation of extracted tenders"""
+        validated_tenders = self._double_check_keyword_matching(
+            tenders, esg_keywords, credit_keywords, esg_lower, credit_lower
+        )
+        logger.info(f"Before keyword validation: {len(tenders)} tenders")
+        logger.info(f"After keyword validation: {len(validated_tenders)} tenders")
+        
+        filtered_tenders = self._apply_date_filtering(validated_tenders)
+        logger.info(f"After date filtering: {len(filtered_tenders)} tenders")
+        
+        final_tenders = self._validate_tenders(filtered_tenders)
+        
+        logger.info(f"Agent 1 COMPLETED: {len(final_tenders)} valid tenders extracted")
+        self._log_categorization_summary(final_tenders, esg_keywords, credit_keywords)
+        
+        return final_tenders
+    
+    def _deterministic_extract(self, page_content: str,
+                               keywords_lower: Tuple[str, ...], page_url: str) -> List[Dict[str, Any]]:
+        """
+        Extract tenders without the LLM from listing-shaped lines only: a markdown
+        link on a line that contains a keyword, a procurement term and a listing
+        date. Nav links, news and report pages that merely mention a keyword
+        don't qualify and are left to the LLM.
+        """
+        # Matched case-insensitively on page_content itself so line offsets stay valid
+        pattern = _keyword_span_pattern(keywords_lower)
+        tenders = []
+        seen_urls = set()
+        
+        for match in _MD_LINK_RE.finditer(page_content):
+            line_start = page_content.rfind('\n', 0, match.start()) + 1
+            line_end = page_content.find('\n', match.end())
+            if line_end == -1:
+                line_end = len(page_content)
+            
+            if not pattern.search(page_content, line_start, line_end):
+                continue
+            if not _PROCUREMENT_TERM_RE.search(page_content, line_start, line_end):
+                continue
+            
+            line = page_content[line_start:line_end]
+            listing_date = _find_listing_date(line)
+            if not listing_date:
+                continue
+            
+            url = urljoin(page_url, match.group(2))
+            if url in seen_urls or not url.startswith(('http://', 'https://')):
+                continue
+            seen_urls.add(url)
+            
+            description = _MD_LINK_RE.sub(lambda m: m.group(1), line).strip(' \t#*|-')
+            link_text = match.group(1).strip()
+            
+            tenders.append({
+                'title': link_text if len(link_text) >= 15 else description[:200],
+                'url': url,
+                'date': listing_date,
+                'description': description,
+                'category': 'esg',  # Set by the keyword double-check
+                'matched_keywords': [],
+                'confidence_score': 0.7
+            })
+        
+        return tenders
+    
+    async def _cached_ainvoke(self, messages: List, schema: Type[BaseModel]) -> str:
+        """Invoke the structured LLM, reusing the stored JSON response for an identical model and prompt"""
+        # Length-prefix each part so different splits can never hash the same
+        parts = [settings.OPENAI_MODEL, schema.__name__] + [
+            part for message in messages for part in (message.type, message.content)
+        ]
+        key = hashlib.sha256(b"".join(
+            len(data).to_bytes(8, 'big') + data
+            for data in (part.encode() for part in parts)
+        )).hexdigest()
+        
+        # Short-lived sessions: batched calls run concurrently, so none is held across the LLM call
+        db = SessionLocal()
+        try:
+            cached = self.cache_repo.get_response(db, key, settings.LLM_CACHE_TTL_HOURS)
+            if cached is not None:
+                logger.info("Agent 1: LLM cache hit, skipping API call")
+                return cached
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+        finally:
+            db.close()
+        
+        # On a validation failure, feed the error back with exponential backoff (max 2 retries)
+        for attempt in range(3):
+            try:
+                result = await self.structured_llms[schema].ainvoke(messages)
+                break
+            except (ValidationError, OutputParserException) as e:
+                if attempt == 2:
+                    raise
+                logger.warning(f"Agent 1: Invalid structured response (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(2 ** attempt)
+                messages = messages + [HumanMessage(
+                    content=f"Your previous response failed validation: {e}\nReturn output that matches the schema."
+                )]
+        response_text = result.model_dump_json()
+        
+        db = SessionLocal()
+        try:
+            self.cache_repo.save_response(db, key, response_text)
+        except Exception as e:
+            logger.warning(f"LLM cache save failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+        return response_text
     
-    def _check_keywords_in_content(self, content: str, keywords: List[str]) -> bool:
-        """Pre-check if ANY keywords exist in content"""
-        content_lower = content.lower()
+    def _check_keywords_in_content(self, content_lower: str, keywords_lower: Tuple[str, ...]) -> bool:
+        """Pre-check if ANY keywords exist in content (both already lowercased)"""
+        pattern, _ = _keyword_scanner(keywords_lower)
+        match = pattern.search(content_lower)
         
-        for keyword in keywords:
-            if keyword.lower() in content_lower:
-                logger.info(f"Pre-check: Found keyword '{keyword}' in content")
-                return True
+        if match:
+            # Lazy %-formatting: nothing is built when INFO is disabled
+            logger.info("Pre-check: Found keyword '%s' in content", match.group(1))
+            return True
         
         logger.info("Pre-check: No keywords found in content")
         return False
     
-    def _build_strict_extraction_prompt(self, esg_keywords: List[str], 
-                                      credit_keywords: List[str],
-                                      include_all_tenders: bool) -> str:
-        """Build STRICT extraction prompt with mandatory keyword matching (no 'both' category)"""
-        
-        esg_keywords_str = ", ".join(esg_keywords)
-        credit_keywords_str = ", ".join(credit_keywords)
-        
-        keyword_filtering_rules = ""
-        if not include_all_tenders:
-            keyword_filtering_rules = f"""
-MANDATORY KEYWORD FILTERING:
-============================
-🚨 CRITICAL: ONLY extract tenders that contain these EXACT keywords:
-
-ESG KEYWORDS (case-insensitive): {esg_keywords_str}
-CREDIT RATING KEYWORDS (case-insensitive): {credit_keywords_str}
-
-STRICT RULES:
-1. The tender title OR description MUST contain at least ONE keyword from either list
-2. If NO keywords are found, DO NOT extract the tender
-3. Be case-insensitive but look for EXACT word matches
-4. Partial matches are OK (e.g., "environmental" matches "environment")
-5. If you find ZERO tenders with keywords, return EMPTY ARRAY []
-
-CATEGORIZATION RULES (NO 'BOTH' CATEGORY):
-==========================================
-- If tender contains ONLY ESG keywords → category: "esg"
-- If tender contains ONLY Credit Rating keywords → category: "credit_rating"
-- If tender contains keywords from BOTH lists → choose category with MORE keyword matches
-- If equal matches from both → default to "esg"
-
-EXAMPLE MATCHES:
-- "Environmental impact assessment" → Contains "environmental" (ESG) → category: "esg"
-- "Credit risk evaluation" → Contains "credit" (Credit Rating) → category: "credit_rating"
-- "Environmental credit assessment" → Contains both → count matches → assign to category with more
-- "Construction project management" → NO KEYWORDS → DO NOT EXTRACT
-"""
-        else:
-            keyword_filtering_rules = """
-KEYWORD FILTERING: DISABLED
-===========================
-Extract ALL tenders regardless of keywords (testing mode).
-Categorize randomly as 'esg' or 'credit_rating'.
-"""
-        
-        return f"""You are a STRICT tender extraction specialist. Your task is to:
-
-1. ONLY extract tenders that contain the specified keywords
-2. Categorize each tender as EITHER 'esg' OR 'credit_rating' (never 'both')
-3. Translate all content to English
-4. Return structured JSON format
-
-{keyword_filtering_rules}
-
-EXTRACTION REQUIREMENTS:
-========================
-1. Extract title, URL, date, and brief description
-2. TRANSLATE all non-English content to English
-3. Keep URLs unchanged
-4. Convert dates to YYYY-MM-DD format
-5. Extract ONLY tenders that match the keyword criteria
-
-OUTPUT FORMAT:
-==============
-Return ONLY a JSON array in this exact format:
-[
-  {{
-    "title": "English translated title",
-    "url": "full URL to tender page",
-    "date": "YYYY-MM-DD or null",
-    "description": "English translated brief description",
-    "category": "esg|credit_rating",
-    "matched_keywords": ["keyword1", "keyword2"],
-    "esg_keyword_count": 2,
-    "credit_keyword_count": 0,
-    "confidence_score": 0.95
-  }}
-]
-
-VALIDATION CHECKLIST:
-====================
-Before including any tender, verify:
-✓ Title or description contains at least one specified keyword
-✓ Keyword match is case-insensitive but exact
-✓ All text is translated to English
-✓ Category is ONLY 'esg' or 'credit_rating' (never 'both')
-✓ Category reflects the keyword type with more matches
-✓ Matched keywords list shows which keywords were found
-
-IMPORTANT:
-- Return EMPTY ARRAY [] if no tenders contain the specified keywords
-- Do NOT extract tenders about construction, IT, general services unless they mention ESG/credit keywords
-- Be STRICT - only extract tenders that actually relate to ESG or credit rating topics
-- NO 'both' category allowed - choose esg OR credit_rating based on keyword count"""
+    def _build_strict_extraction_prompt(self, include_all_tenders: bool) -> SystemMessage:
+        """Get the extraction instructions; the schema itself is enforced by the API"""
+        return _SYSTEM_MESSAGE_ALL_TENDERS if include_all_tenders else _SYSTEM_MESSAGE_STRICT
     
     def _double_check_keyword_matching(self, tenders: List[Dict[str, Any]], 
                                      esg_keywords: List[str], 
-                                     credit_keywords: List[str]) -> List[Dict[str, Any]]:
+                                     credit_keywords: List[str],
+                                     esg_lower: Tuple[str, ...],
+                                     credit_lower: Tuple[str, ...]) -> List[Dict[str, Any]]:
         """Double-check keyword matching and ensure proper categorization (no 'both')"""
         validated_tenders = []
+        all_keywords_lower = esg_lower + credit_lower
+        
+        # (keyword, lowercased keyword, is_esg) in ESG-then-credit order
+        catalog = [(kw, kw_lower, 1) for kw, kw_lower in zip(esg_keywords, esg_lower)] + \
+                  [(kw, kw_lower, 0) for kw, kw_lower in zip(credit_keywords, credit_lower)]
         
         for tender in tenders:
-            title = tender.get('title', '').lower()
-            description = tender.get('description', '').lower()
-            content = f"{title} {description}"
-            
-            # Find actual keyword matches
-            found_esg_keywords = []
-            found_credit_keywords = []
-            
-            # Check ESG keywords
-            for keyword in esg_keywords:
-                if keyword.lower() in content:
-                    found_esg_keywords.append(keyword)
-            
-            # Check Credit Rating keywords
-            for keyword in credit_keywords:
-                if keyword.lower() in content:
-                    found_credit_keywords.append(keyword)
+            content = f"{tender.get('title', '')} {tender.get('description', '')}".lower()
             
-            total_found_keywords = found_esg_keywords + found_credit_keywords
+            # Find actual keyword matches in one scan, then count both categories in one pass
+            found = _find_keywords(content, all_keywords_lower)
+            total_found_keywords = []
+            esg_count = 0
+            for keyword, keyword_lower, is_esg in catalog:
+                if keyword_lower in found:
+                    total_found_keywords.append(keyword)
+                    esg_count += is_esg
             
             if total_found_keywords:
                 # Determine category based on keyword count (no 'both' category)
-                esg_count = len(found_esg_keywords)
-                credit_count = len(found_credit_keywords)
+                credit_count = len(total_found_keywords) - esg_count
                 
                 if esg_count > credit_count:
                     category = 'esg'
@@ -286,116 +642,66 @@ IMPORTANT:
                 
                 validated_tenders.append(tender)
                 
-                logger.info(f"✓ Validated: '{tender['title'][:50]}...' → {category}")
-                logger.info(f"  ESG keywords: {found_esg_keywords} (count: {esg_count})")
-                logger.info(f"  Credit keywords: {found_credit_keywords} (count: {credit_count})")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Validated: '%s...' -> %s", tender['title'][:50], category)
+                    logger.info("  ESG keywords: %s (count: %d)", total_found_keywords[:esg_count], esg_count)
+                    logger.info("  Credit keywords: %s (count: %d)", total_found_keywords[esg_count:], credit_count)
             else:
-                logger.warning(f"✗ REJECTED: '{tender.get('title', 'Unknown')[:50]}...' - No keywords found")
+                logger.warning("REJECTED: '%.50s...' - No keywords found", tender.get('title', 'Unknown'))
         
         return validated_tenders
     
     def _apply_date_filtering(self, tenders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Apply date filtering to remove old/expired tenders"""
         filtered_tenders = []
-        current_date = datetime.now().date()
-        max_age = timedelta(days=self.max_days_old)
+        current_date = date.today()
+        cutoff = current_date - timedelta(days=self.max_days_old)
         
         for tender in tenders:
             try:
                 # Check publication date and deadline
                 date_str = tender.get('date')
                 if date_str:
-                    tender_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    days_old = (current_date - tender_date).days
+                    match = _ISO_DATE_RE.match(date_str)
+                    if not match:
+                        raise ValueError(f"unexpected date format '{date_str}'")
+                    tender_date = date(int(match[1]), int(match[2]), int(match[3]))
                     
-                    if days_old <= self.max_days_old:
+                    if tender_date >= cutoff:
                         tender['date_status'] = 'recent'
                         filtered_tenders.append(tender)
-                        logger.debug(f"✓ Date OK: {tender['title'][:30]}... ({days_old} days old)")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Date OK: %.30s... (%d days old)", tender['title'], (current_date - tender_date).days)
                     else:
-                        logger.info(f"✗ Too old: {tender['title'][:30]}... ({days_old} days old)")
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info("Too old: %.30s... (%d days old)", tender['title'], (current_date - tender_date).days)
                 else:
                     # No date - include with warning
                     tender['date_status'] = 'unknown'
                     filtered_tenders.append(tender)
-                    logger.debug(f"✓ No date: {tender['title'][:30]}...")
+                    logger.debug("No date: %.30s...", tender['title'])
                     
             except Exception as e:
-                logger.warning(f"Date parsing error for tender: {e}")
+                logger.warning("Date parsing error for tender: %s", e)
                 tender['date_status'] = 'error'
                 filtered_tenders.append(tender)  # Include on error
         
         return filtered_tenders
     
-    def _parse_json_response(self, response_text: str) -> List[Dict[str, Any]]:
-        """Parse JSON response from LLM, handling markdown code blocks"""
-        try:
-            # Clean up markdown code blocks
-            cleaned_text = response_text
-            if response_text.startswith('```json'):
-                cleaned_text = response_text.replace('```json', '').replace('```', '').strip()
-            elif response_text.startswith('```'):
-                cleaned_text = response_text.replace('```', '').strip()
-            
-            # Parse JSON
-            tenders = json.loads(cleaned_text)
-            
-            if not isinstance(tenders, list):
-                logger.warning("Response is not a list, converting to empty list")
-                return []
-            
-            return tenders
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            logger.error(f"Response preview: {response_text[:200]}...")
-            return []
-        except Exception as e:
-            logger.error(f"Unexpected error parsing response: {e}")
-            return []
-    
     def _validate_tenders(self, tenders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Validate and clean tender data (ensuring no 'both' category)"""
         validated = []
         
         for tender in tenders:
-            try:
-                # Required fields check
-                if not tender.get('title') or not tender.get('url'):
-                    logger.warning(f"Skipping tender with missing title or URL: {tender}")
-                    continue
-                
-                # Validate category (only allow 'esg' or 'credit_rating')
-                category = tender.get('category', '').lower()
-                if category not in ['esg', 'credit_rating']:
-                    logger.warning(f"Invalid category '{category}' for tender: {tender.get('title', 'N/A')}")
-                    # Default to 'esg' if invalid category
-                    category = 'esg'
-                
-                # Ensure matched_keywords exists
-                if 'matched_keywords' not in tender:
-                    tender['matched_keywords'] = []
-                
-                # Clean and structure the tender
-                cleaned_tender = {
-                    'title': str(tender.get('title', '')).strip(),
-                    'url': str(tender.get('url', '')).strip(),
-                    'date': tender.get('date'),
-                    'description': str(tender.get('description', '')).strip()[:500],  # Limit description
-                    'category': category,  # Only 'esg' or 'credit_rating'
-                    'matched_keywords': tender.get('matched_keywords', []),
-                    'esg_keyword_count': tender.get('esg_keyword_count', 0),
-                    'credit_keyword_count': tender.get('credit_keyword_count', 0),
-                    'keyword_count': len(tender.get('matched_keywords', [])),
-                    'date_status': tender.get('date_status', 'unknown'),
-                    'confidence_score': tender.get('confidence_score', 0.8)
-                }
-                
-                validated.append(cleaned_tender)
-                
-            except Exception as e:
-                logger.warning(f"Error validating tender: {e}, tender: {tender}")
+            # Required fields check
+            if not tender.get('title') or not tender.get('url'):
+                logger.warning("Skipping tender with missing title or URL: %s", tender)
                 continue
+            
+            try:
+                validated.append(CleanTender.model_validate(tender).model_dump())
+            except ValidationError as e:
+                logger.warning("Error validating tender: %s, tender: %s", e, tender)
         
         return validated
     
@@ -412,13 +718,10 @@ IMPORTANT:
         credit_count = len([t for t in tenders if t['category'] == 'credit_rating'])
         
         # Keyword usage statistics
-        all_matched_keywords = []
-        for tender in tenders:
-            all_matched_keywords.extend(tender.get('matched_keywords', []))
-        
-        keyword_usage = {}
-        for keyword in all_matched_keywords:
-            keyword_usage[keyword] = keyword_usage.get(keyword, 0) + 1
+        keyword_usage = Counter(
+            keyword for tender in tenders for keyword in tender.get('matched_keywords', ())
+        )
+        esg_set = {keyword.lower() for keyword in esg_keywords}
         
         logger.info("✅ EXTRACTION SUMMARY (No 'Both' Category):")
         logger.info(f"   ESG tenders: {esg_count}")
@@ -427,8 +730,8 @@ IMPORTANT:
         
         if keyword_usage:
             logger.info("📊 KEYWORD USAGE:")
-            for keyword, count in sorted(keyword_usage.items(), key=lambda x: x[1], reverse=True):
-                keyword_type = "ESG" if keyword in esg_keywords else "Credit Rating"
+            for keyword, count in keyword_usage.most_common():
+                keyword_type = "ESG" if keyword.lower() in esg_set else "Credit Rating"
                 logger.info(f"   '{keyword}' ({keyword_type}): {count} matches")
         
         # Sample results
@@ -444,22 +747,19 @@ IMPORTANT:
                                        tender_repo, keyword_repo, db):
         """Save keyword matches to database for tracking"""
         try:
-            # Get keyword objects from database
-            for keyword_str in matched_keywords:
-                # Find the keyword in database
-                keywords = keyword_repo.get_keywords_by_category(db, "esg") + \
-                          keyword_repo.get_keywords_by_category(db, "credit_rating")
-                
-                for keyword_obj in keywords:
-                    if keyword_obj.keyword.lower() == keyword_str.lower():
-                        # Create association and update usage
-                        tender_repo.add_keyword_match(db, tender_id, keyword_obj.id)
-                        keyword_obj.increment_usage()
-                        logger.info(f"Saved keyword match: tender {tender_id} ↔ keyword '{keyword_str}'")
-                        break
-                        
+            # Load the keyword table once instead of twice per matched keyword
+            keyword_map = keyword_repo.get_active_keyword_map(db)
+            
+            matched = [keyword_map[k.lower()] for k in matched_keywords if k.lower() in keyword_map]
+            
+            # Create associations and update usage in bulk, then commit once
+            tender_repo.add_keyword_matches(db, tender_id, [keyword_obj.id for keyword_obj in matched])
+            db.commit()
+            logger.info("Saved %d keyword matches for tender %s", len(matched), tender_id)
+            
         except Exception as e:
             logger.error(f"Error saving keyword matches: {e}")
+            db.rollback()
 
 
 class KeywordMatcher:
@@ -468,26 +768,17 @@ class KeywordMatcher:
     @staticmethod
     def find_keyword_matches(text: str, keywords: List[str]) -> List[str]:
         """Find keyword matches with fuzzy matching and stemming"""
+        pattern, by_stem, token_forms = _compile_keyword_matcher(tuple(keywords))
         text_lower = text.lower()
-        matches = []
         
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            
-            # Exact match
-            if keyword_lower in text_lower:
-                matches.append(keyword)
-                continue
-            
-            # Stemmed matching (basic)
-            keyword_stem = keyword_lower.rstrip('s').rstrip('ing').rstrip('ed')
-            if len(keyword_stem) > 3 and keyword_stem in text_lower:
-                matches.append(keyword)
-                continue
-            
-            # Word boundary matching
-            pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-            if re.search(pattern, text_lower):
-                matches.append(keyword)
+        # Single words: O(1) lookups of the text's tokens; phrases: one regex scan
+        hits = [
+            (match.start(), stem)
+            for match in _WORD_RE.finditer(text_lower) if match.group() in token_forms
+            for stem in token_forms[match.group()]
+        ]
+        hits.extend((match.start(), match.group(1)) for match in pattern.finditer(text_lower))
+        hits.sort()
         
-        return list(set(matches))  # Remove duplicates
\ No newline at end of file
+        # De-duplicate in one pass, keeping keywords in first-seen order
+        return list(dict.fromkeys(keyword for _, stem in hits for keyword in by_stem[stem]))
@@ -2,17 +2,99 @@
 Enhanced Agent 2: Detail Extraction with Date Validation
 Validates tender dates and filters out expired tenders
 """
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import re
+import time
+import orjson
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Any, Literal, Optional
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+from pydantic import BaseModel, Field
 
 from app.core.config import settings
 from app.services.scraper import TenderScraper
 
 logger = logging.getLogger(__name__)
 
+# Date formats accepted by _parse_date: YYYY-MM-DD and DD.MM.YYYY / DD/MM/YYYY / DD-MM-YYYY
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+_DMY_DATE_RE = re.compile(r'^(\d{1,2})([./-])(\d{1,2})\2(\d{4})$')
+
+# Page compression: markdown links are reduced to their text, and only lines
+# around date/contact keywords are kept for long pages
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_DATE_KEYWORD_RE = re.compile(
+    r'deadline|срок|дедлайн|submission|closing|due|publication|contact',
+    re.IGNORECASE
+)
+
+
+class ContactInfo(BaseModel):
+    """Issuing organization contact details"""
+    organization: Optional[str]
+    contact_person: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    address: Optional[str]
+
+
+class DateValidation(BaseModel):
+    """LLM assessment of the tender's dates"""
+    deadline_status: Literal['active', 'expired', 'urgent', 'unknown']
+    days_until_deadline: Optional[int]
+    urgency_level: Literal['low', 'medium', 'high', 'urgent', 'expired', 'unknown']
+    all_extracted_dates: List[str] = Field(description="Every date found, as YYYY-MM-DD")
+
+
+class TenderDetails(BaseModel):
+    """Detailed tender information as returned by the extraction LLM"""
+    detailed_title: str = Field(description="Complete translated title")
+    detailed_description: str = Field(description="Full translated description")
+    requirements: Optional[str]
+    publication_date: Optional[str] = Field(description="YYYY-MM-DD or null")
+    submission_deadline: Optional[str] = Field(description="YYYY-MM-DD or null")
+    deadline: Optional[str] = Field(description="Primary deadline as YYYY-MM-DD or null")
+    project_start_date: Optional[str] = Field(description="YYYY-MM-DD or null")
+    project_end_date: Optional[str] = Field(description="YYYY-MM-DD or null")
+    date_validation: DateValidation
+    tender_value: Optional[str] = Field(description="Budget/estimated value with currency")
+    duration: Optional[str]
+    contact_info: ContactInfo
+    documents_required: Optional[str]
+    evaluation_criteria: Optional[str]
+    additional_details: Optional[str]
+    tender_type: Optional[str]
+    procurement_method: Optional[str]
+    categories: Optional[str]
+
+
+class IndexedTenderDetails(TenderDetails):
+    """Detailed tender information for one tender of a batched request"""
+    tender_index: int = Field(description="Number of the ### TENDER block")
+
+
+class TenderDetailsBatch(BaseModel):
+    """Detailed tender information for every tender of a batched request"""
+    results: List[IndexedTenderDetails]
+
+
+class _short:
+    """Log argument that truncates a tender title only if the record is emitted"""
+    __slots__ = ('value',)
+    
+    def __init__(self, value: Any):
+        self.value = value
+    
+    def __str__(self) -> str:
+        return str(self.value)[:50]
+
+
 class TenderDetailAgent:
     """
     Enhanced Agent 2: Extract detailed information with date validation
@@ -30,10 +112,60 @@ class TenderDetailAgent:
             api_key=settings.OPENAI_API_KEY,
             temperature=0.1
         )
+        self.structured_llm = self.llm.with_structured_output(TenderDetails, method="json_schema", strict=True)
+        self.structured_batch_llm = self.llm.with_structured_output(
+            TenderDetailsBatch, method="json_schema", strict=True
+        )
         
         # Date validation configuration
         self.max_days_old = 90  # Don't process tenders older than 90 days
         self.urgent_days_threshold = 7  # Mark as urgent if deadline within 7 days
+        
+        # Number of scrape/LLM calls in flight at once
+        self.max_concurrency = 10
+        # Tender pages sent per LLM call under one shared prompt (1 disables batching)
+        self.llm_batch_size = 6
+        
+        # Client-side request pacing to stay under the OpenAI requests-per-minute cap
+        self.llm_max_retries = 5
+        self._request_interval = 60.0 / max(1, settings.OPENAI_RPM)
+        self._next_request_at = 0.0
+        self._rate_lock = asyncio.Lock()
+        
+        # OpenAI Batch API (bulk runs only): status poll interval and the longest
+        # a run waits before cancelling the batch, both in seconds
+        self.batch_poll_interval = 60
+        self.batch_max_wait = settings.BATCH_API_MAX_WAIT_SECONDS
+        self._openai_client: Optional[AsyncOpenAI] = None
+        
+        # Scraper shared across calls while the agent is used as an async context manager
+        self._scraper: Optional[TenderScraper] = None
+        
+        # Scraped page content by URL: (fetched_at, markdown), least recently used first
+        self._page_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._page_cache_ttl = 3600  # seconds
+        self._page_cache_size = 256
+    
+    async def __aenter__(self):
+        """Open one scraper session reused by every tender until exit"""
+        self._scraper = TenderScraper()
+        await self._scraper.__aenter__()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Close the shared scraper session"""
+        if self._scraper:
+            scraper, self._scraper = self._scraper, None
+            await scraper.__aexit__(exc_type, exc_val, exc_tb)
+    
+    @asynccontextmanager
+    async def _scraper_session(self) -> AsyncIterator[TenderScraper]:
+        """Yield the shared scraper, or one opened just for this call"""
+        if self._scraper:
+            yield self._scraper
+        else:
+            async with TenderScraper() as scraper:
+                yield scraper
     
     async def extract_tender_details(self, tender_url: str, 
                                    basic_tender: Dict[str, Any],
@@ -50,49 +182,119 @@ class TenderDetailAgent:
             Detailed tender information or None if expired/invalid
         """
         try:
-            logger.info(f"Agent 2: Processing tender details for {tender_url}")
+            logger.info("Agent 2: Processing tender details for %s", tender_url)
             
             # Pre-validation: Check if tender is worth processing
             if not skip_date_validation:
                 should_process = self._should_process_tender(basic_tender)
                 if not should_process:
-                    logger.info(f"Agent 2: Skipping expired/old tender: {basic_tender.get('title', 'Unknown')[:50]}...")
+                    logger.info("Agent 2: Skipping expired/old tender: %s...", _short(basic_tender.get('title', 'Unknown')))
                     return self._create_skipped_details(basic_tender, "Tender expired or too old")
             
             # Step 1: Scrape the individual tender page
-            page_content = await self._scrape_tender_page(tender_url)
+            async with self._scraper_session() as scraper:
+                page_content = await self._scrape_tender_page(scraper, tender_url)
             
             if not page_content:
-                logger.error(f"Agent 2: Failed to scrape tender page: {tender_url}")
+                logger.error("Agent 2: Failed to scrape tender page: %s", tender_url)
                 return self._create_fallback_details(basic_tender, "Failed to scrape page")
             
             # Step 2: Extract detailed information with enhanced date extraction
             detailed_info = await self._extract_detailed_info_with_dates(page_content, basic_tender)
             
             if not detailed_info:
-                logger.error(f"Agent 2: Failed to extract details from: {tender_url}")
+                logger.error("Agent 2: Failed to extract details from: %s", tender_url)
                 return self._create_fallback_details(basic_tender, "Failed to extract details")
             
             # Step 3: Final date validation on extracted details
-            if not skip_date_validation:
-                date_validation_result = self._validate_extracted_dates(detailed_info, basic_tender)
-                detailed_info.update(date_validation_result)
-                
-                if date_validation_result.get('skip_processing'):
-                    logger.info(f"Agent 2: Skipping after date validation: {basic_tender.get('title', 'Unknown')[:50]}...")
-                    return self._create_skipped_details(basic_tender, "Failed date validation")
-            
-            logger.info(f"Agent 2: Completed for: {basic_tender.get('title', 'Unknown')[:50]}...")
-            return detailed_info
+            return self._finish_details(detailed_info, basic_tender, skip_date_validation)
             
         except Exception as e:
-            logger.error(f"Agent 2: Error for {tender_url}: {e}")
+            logger.error("Agent 2: Error for %s: %s", tender_url, e)
             return self._create_fallback_details(basic_tender, str(e))
     
-    def _should_process_tender(self, basic_tender: Dict[str, Any]) -> bool:
+    async def _extract_tender_batch(self, tenders: List[Dict[str, Any]],
+                                    skip_date_validation: bool,
+                                    semaphore: asyncio.Semaphore,
+                                    scraper: TenderScraper,
+                                    current_date: date,
+                                    now_iso: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Run the detail pipeline for a window of pre-validated tenders, sharing
+        one LLM call for all pages that were scraped successfully.
+        
+        Returns one result per input tender, in the same order.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tenders)
+        pending = range(len(tenders))
+        
+        async def _scrape(idx: int) -> Optional[str]:
+            async with semaphore:
+                return await self._scrape_tender_page(scraper, tenders[idx].get('url'))
+        
+        contents = await asyncio.gather(*[_scrape(idx) for idx in pending])
+        
+        scraped = []
+        for idx, content in zip(pending, contents):
+            if content:
+                scraped.append((idx, content))
+            else:
+                logger.error("Agent 2: Failed to scrape tender page: %s", tenders[idx].get('url'))
+                results[idx] = self._create_fallback_details(tenders[idx], "Failed to scrape page", now_iso)
+        
+        if not scraped:
+            return results
+        
+        if len(scraped) > 1:
+            async with semaphore:
+                batch_details = await self._extract_batch(
+                    [(content, tenders[idx]) for idx, content in scraped], current_date, now_iso
+                )
+        else:
+            batch_details = None
+        
+        if batch_details is None:
+            # Single page, or the batched response could not be parsed: one call per tender
+            async def _extract_one(content: str, tender: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    return await self._extract_detailed_info_with_dates(content, tender, current_date, now_iso)
+            
+            batch_details = await asyncio.gather(*[
+                _extract_one(content, tenders[idx]) for idx, content in scraped
+            ])
+        
+        for (idx, _), detailed_info in zip(scraped, batch_details):
+            tender = tenders[idx]
+            if not detailed_info:
+                logger.error("Agent 2: Failed to extract details from: %s", tender.get('url'))
+                results[idx] = self._create_fallback_details(tender, "Failed to extract details", now_iso)
+            else:
+                results[idx] = self._finish_details(
+                    detailed_info, tender, skip_date_validation, current_date, now_iso
+                )
+        
+        return results
+    
+    def _finish_details(self, detailed_info: Dict[str, Any], basic_tender: Dict[str, Any],
+                        skip_date_validation: bool, current_date: Optional[date] = None,
+                        now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """Apply final date validation to extracted details"""
+        if not skip_date_validation:
+            date_validation_result = self._validate_extracted_dates(detailed_info, basic_tender, current_date)
+            detailed_info.update(date_validation_result)
+            
+            if date_validation_result.get('skip_processing'):
+                logger.info("Agent 2: Skipping after date validation: %s...", _short(basic_tender.get('title', 'Unknown')))
+                return self._create_skipped_details(basic_tender, "Failed date validation", now_iso)
+        
+        logger.info("Agent 2: Completed for: %s...", _short(basic_tender.get('title', 'Unknown')))
+        return detailed_info
+    
+    def _should_process_tender(self, basic_tender: Dict[str, Any],
+                               current_date: Optional[date] = None) -> bool:
         """Pre-check if tender should be processed based on basic info"""
         try:
-            current_date = datetime.now().date()
+            current_date = current_date or datetime.now().date()
             
             # Check date_status from Agent 1
             date_status = basic_tender.get('date_status', 'unknown')
@@ -104,94 +306,229 @@ class TenderDetailAgent:
             if publication_date:
                 days_old = (current_date - publication_date).days
                 if days_old > self.max_days_old:
-                    logger.info(f"Tender too old: {days_old} days")
+                    logger.info("Tender too old: %s days", days_old)
                     return False
             
             # Check deadline
             deadline = self._parse_date(basic_tender.get('deadline') or basic_tender.get('date'))
             if deadline and deadline < current_date:
-                logger.info(f"Tender deadline passed: {deadline}")
+                logger.info("Tender deadline passed: %s", deadline)
                 return False
             
             return True
             
         except Exception as e:
-            logger.warning(f"Error in pre-validation: {e}")
+            logger.warning("Error in pre-validation: %s", e)
             return True  # Process on error (benefit of doubt)
     
-    async def _scrape_tender_page(self, tender_url: str) -> Optional[str]:
-        """Scrape individual tender page using crawl4ai"""
+    async def _scrape_tender_page(self, scraper: TenderScraper, tender_url: str) -> Optional[str]:
+        """Scrape individual tender page using an open crawl4ai scraper (cached per URL)"""
         try:
-            logger.info(f"Scraping tender page: {tender_url}")
+            cached = self._page_cache.get(tender_url)
+            if cached and time.monotonic() - cached[0] < self._page_cache_ttl:
+                self._page_cache.move_to_end(tender_url)
+                logger.info("Using cached tender page: %s", tender_url)
+                return cached[1]
             
-            async with TenderScraper() as scraper:
-                result = await scraper.scrape_page(tender_url)
+            logger.info("Scraping tender page: %s", tender_url)
+            
+            result = await scraper.scrape_page(tender_url)
+            
+            if result['status'] == 'success':
+                content = result['markdown']
+                logger.info("Successfully scraped %s characters from %s", len(content), tender_url)
+                self._page_cache[tender_url] = (time.monotonic(), content)
+                self._page_cache.move_to_end(tender_url)
+                while len(self._page_cache) > self._page_cache_size:
+                    self._page_cache.popitem(last=False)
+                return content
+            else:
+                logger.error("Scraping failed for %s: %s", tender_url, result.get('error', 'Unknown error'))
+                return None
                 
-                if result['status'] == 'success':
-                    content = result['markdown']
-                    logger.info(f"Successfully scraped {len(content)} characters from {tender_url}")
-                    return content
-                else:
-                    logger.error(f"Scraping failed for {tender_url}: {result.get('error', 'Unknown error')}")
-                    return None
-                    
         except Exception as e:
-            logger.error(f"Exception while scraping {tender_url}: {e}")
+            logger.error("Exception while scraping %s: %s", tender_url, e)
             return None
     
     async def _extract_detailed_info_with_dates(self, page_content: str, 
-                                              basic_tender: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                                              basic_tender: Dict[str, Any],
+                                              current_date: Optional[date] = None,
+                                              now_iso: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Extract detailed information with enhanced date extraction"""
         try:
-            system_prompt = self._build_enhanced_detail_extraction_prompt()
+            messages = [
+                HumanMessage(content=self._build_detail_request(page_content, basic_tender, current_date))
+            ]
             
-            user_message = f"""
-BASIC TENDER INFORMATION (from Agent 1):
-=======================================
-Title: {basic_tender.get('title', 'N/A')}
-URL: {basic_tender.get('url', 'N/A')}
-Category: {basic_tender.get('category', 'N/A')}
-Publication Date: {basic_tender.get('publication_date', 'N/A')}
-Deadline: {basic_tender.get('deadline', 'N/A')}
-Date Status: {basic_tender.get('date_status', 'unknown')}
-
-FULL TENDER PAGE CONTENT:
-========================
-{page_content}
-========================
+            # Schema-constrained output: no fences or free-form JSON to parse
+            response = await self._llm_call(messages, self.structured_llm)
+            detailed_info = response.model_dump()
+            
+            # Add metadata
+            detailed_info['extracted_at'] = now_iso or datetime.utcnow().isoformat()
+            detailed_info['page_content_length'] = len(page_content)
+            detailed_info['source_url'] = basic_tender.get('url')
+            
+            return detailed_info
+                
+        except Exception as e:
+            logger.error("Error extracting detailed info: %s", e)
+            return None
+    
+    async def _llm_call(self, messages: List[HumanMessage], runnable=None):
+        """Invoke the LLM (or a structured-output runnable) within the RPM budget, backing off on 429s"""
+        for attempt in range(self.llm_max_retries):
+            async with self._rate_lock:
+                now = time.monotonic()
+                wait = self._next_request_at - now
+                self._next_request_at = max(now, self._next_request_at) + self._request_interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+            
+            try:
+                return await (runnable or self.llm).ainvoke(messages)
+            except RateLimitError as e:
+                if attempt == self.llm_max_retries - 1:
+                    raise
+                delay = 2 ** attempt
+                logger.warning("Agent 2: OpenAI rate limit hit, retrying in %ss: %s", delay, e)
+                await asyncio.sleep(delay)
+    
+    def _build_detail_request(self, page_content: str, basic_tender: Dict[str, Any],
+                              current_date: Optional[date] = None) -> str:
+        """Build the full single-tender extraction prompt"""
+        current_date = current_date or datetime.now().date()
+        system_prompt = self._build_enhanced_detail_extraction_prompt(current_date)
+        
+        user_message = f"""
+{self._format_tender_block(page_content, basic_tender)}
 
-Current Date: {datetime.now().strftime('%Y-%m-%d')}
+Current Date: {current_date.isoformat()}
 
 Please extract detailed information with special attention to dates.
 Return ONLY the JSON object with no additional text.
+"""
+        return f"{system_prompt}\n\n{user_message}"
+    
+    async def _extract_batch(self, items: List[tuple], current_date: Optional[date] = None,
+                             now_iso: Optional[str] = None) -> Optional[List[Optional[Dict[str, Any]]]]:
+        """
+        Extract details for several tender pages in one LLM call
+        
+        Args:
+            items: (page_content, basic_tender) pairs
+            
+        Returns:
+            One detailed info dict (or None) per item, in order, or None if the
+            batched response could not be parsed
+        """
+        try:
+            current_date = current_date or datetime.now().date()
+            system_prompt = self._build_enhanced_detail_extraction_prompt(current_date)
+            
+            blocks = "\n\n".join(
+                f"### TENDER {i}\n{self._format_tender_block(page_content, basic_tender)}"
+                for i, (page_content, basic_tender) in enumerate(items, 1)
+            )
+            
+            user_message = f"""
+The following {len(items)} tenders are numbered ### TENDER 1 to ### TENDER {len(items)}.
+Extract detailed information for EACH tender separately, using only that tender's own content.
+
+{blocks}
+
+Current Date: {current_date.isoformat()}
+
+Return ONLY a JSON object of the form {{"results": [{{...}}, {{...}}]}} with exactly
+{len(items)} objects in "results", in the same order as the tenders above. Each object
+uses the format described above plus "tender_index": the tender's number.
+Return no additional text.
 """
             
             messages = [
                 HumanMessage(content=f"{system_prompt}\n\n{user_message}")
             ]
             
-            response = await self.llm.ainvoke(messages)
-            response_text = response.content.strip()
-            
-            # Parse JSON response
-            detailed_info = self._parse_detail_response(response_text)
+            response = await self._llm_call(messages, self.structured_batch_llm)
+            results = response.results
             
-            if detailed_info:
-                # Add metadata
-                detailed_info['extracted_at'] = datetime.utcnow().isoformat()
-                detailed_info['page_content_length'] = len(page_content)
-                detailed_info['source_url'] = basic_tender.get('url')
-                
-                return detailed_info
-            else:
+            if len(results) != len(items):
+                logger.warning("Agent 2: Batched response unusable for %s tenders, falling back to single calls", len(items))
                 return None
-                
+            
+            by_index = {}
+            for result in results:
+                result_info = result.model_dump()
+                by_index[result_info.pop('tender_index')] = result_info
+            
+            extracted_at = now_iso or datetime.utcnow().isoformat()
+            detailed = []
+            for i, (page_content, basic_tender) in enumerate(items, 1):
+                detailed_info = by_index.get(i)
+                if detailed_info:
+                    detailed_info['extracted_at'] = extracted_at
+                    detailed_info['page_content_length'] = len(page_content)
+                    detailed_info['source_url'] = basic_tender.get('url')
+                detailed.append(detailed_info)
+            
+            return detailed
+            
         except Exception as e:
-            logger.error(f"Error extracting detailed info: {e}")
+            logger.error("Error extracting batched details: %s", e)
             return None
     
-    def _build_enhanced_detail_extraction_prompt(self) -> str:
+    def _format_tender_block(self, page_content: str, basic_tender: Dict[str, Any]) -> str:
+        """Format basic tender info and page content for the extraction prompt"""
+        return f"""BASIC TENDER INFORMATION (from Agent 1):
+=======================================
+Title: {basic_tender.get('title', 'N/A')}
+URL: {basic_tender.get('url', 'N/A')}
+Category: {basic_tender.get('category', 'N/A')}
+Publication Date: {basic_tender.get('publication_date', 'N/A')}
+Deadline: {basic_tender.get('deadline', 'N/A')}
+Date Status: {basic_tender.get('date_status', 'unknown')}
+
+TENDER PAGE CONTENT:
+========================
+{self._compress_page_content(page_content)}
+========================"""
+    
+    def _compress_page_content(self, md: str, max_chars: int = 8000, context_lines: int = 40) -> str:
+        """
+        Reduce scraped markdown to the parts relevant for detail extraction
+        
+        Link URLs are always dropped. Pages still longer than max_chars are cut
+        down to windows of context_lines around date/contact keywords.
+        """
+        text = _MD_LINK_RE.sub(r'\1', md)
+        if len(text) <= max_chars:
+            return text
+        
+        lines = text.splitlines()
+        hits = [i for i, line in enumerate(lines) if _DATE_KEYWORD_RE.search(line)]
+        if not hits:
+            return text[:max_chars]
+        
+        # Merge overlapping windows
+        ranges = []
+        for i in hits:
+            start, end = max(0, i - context_lines), min(len(lines), i + context_lines + 1)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+        
+        compressed = "\n...\n".join("\n".join(lines[start:end]) for start, end in ranges)
+        return compressed[:max_chars]
+    
+    def _build_enhanced_detail_extraction_prompt(self, current_date: Optional[date] = None) -> str:
         """Build enhanced extraction prompt with date focus"""
+        return self._prompt_for_date((current_date or datetime.now().date()).isoformat())
+    
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _prompt_for_date(date_str: str) -> str:
+        """Extraction prompt for a given current date (only changes daily, so cached)"""
         return f"""You are a professional tender analysis specialist. Extract comprehensive details with special focus on DATE VALIDATION.
 
 CRITICAL DATE REQUIREMENTS:
@@ -199,7 +536,7 @@ CRITICAL DATE REQUIREMENTS:
 1. Extract ALL dates mentioned in the tender
 2. Identify publication date, submission deadline, project start/end dates
 3. Convert all dates to YYYY-MM-DD format
-4. Validate that deadlines are in the future (after {datetime.now().strftime('%Y-%m-%d')})
+4. Validate that deadlines are in the future (after {date_str})
 5. Mark urgency level based on deadline proximity
 
 TRANSLATION REQUIREMENTS:
@@ -273,10 +610,11 @@ IMPORTANT:
 """
     
     def _validate_extracted_dates(self, detailed_info: Dict[str, Any], 
-                                 basic_tender: Dict[str, Any]) -> Dict[str, Any]:
+                                 basic_tender: Dict[str, Any],
+                                 current_date: Optional[date] = None) -> Dict[str, Any]:
         """Validate extracted dates and determine processing status"""
         try:
-            current_date = datetime.now().date()
+            current_date = current_date or datetime.now().date()
             validation_result = {
                 'skip_processing': False,
                 'date_validation_status': 'valid',
@@ -299,14 +637,10 @@ IMPORTANT:
                     validation_result['validation_notes'].append(f"High priority: {days_until} days until deadline")
                 
                 # Update date validation info
-                if 'date_validation' not in detailed_info:
-                    detailed_info['date_validation'] = {}
-                
-                detailed_info['date_validation'].update({
-                    'days_until_deadline': days_until,
-                    'deadline_status': 'expired' if days_until < 0 else 'urgent' if days_until <= 7 else 'active',
-                    'urgency_level': self._calculate_urgency_level(days_until)
-                })
+                date_validation = detailed_info.setdefault('date_validation', {})
+                date_validation['days_until_deadline'] = days_until
+                date_validation['deadline_status'] = 'expired' if days_until < 0 else 'urgent' if days_until <= 7 else 'active'
+                date_validation['urgency_level'] = self._calculate_urgency_level(days_until)
             
             # Check publication date
             pub_date = self._parse_date(detailed_info.get('publication_date'))
@@ -320,7 +654,7 @@ IMPORTANT:
             return validation_result
             
         except Exception as e:
-            logger.warning(f"Error in date validation: {e}")
+            logger.warning("Error in date validation: %s", e)
             return {
                 'skip_processing': False,
                 'date_validation_status': 'validation_error',
@@ -350,18 +684,21 @@ IMPORTANT:
                 return date_value.date()
             
             date_str = str(date_value)
-            for fmt in ['%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y']:
-                try:
-                    return datetime.strptime(date_str, fmt).date()
-                except ValueError:
-                    continue
+            match = _ISO_DATE_RE.match(date_str)
+            if match:
+                return date(int(match[1]), int(match[2]), int(match[3]))
+            
+            match = _DMY_DATE_RE.match(date_str)
+            if match:
+                return date(int(match[4]), int(match[3]), int(match[1]))
             
             return None
             
         except Exception:
             return None
     
-    def _create_skipped_details(self, basic_tender: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    def _create_skipped_details(self, basic_tender: Dict[str, Any], reason: str,
+                                now_iso: Optional[str] = None) -> Dict[str, Any]:
         """Create details for skipped tender"""
         return {
             'detailed_title': basic_tender.get('title', 'N/A'),
@@ -389,13 +726,14 @@ IMPORTANT:
             'tender_type': None,
             'procurement_method': None,
             'categories': None,
-            'extracted_at': datetime.utcnow().isoformat(),
+            'extracted_at': now_iso or datetime.utcnow().isoformat(),
             'extraction_status': 'skipped',
             'skip_reason': reason,
             'source_url': basic_tender.get('url', 'N/A')
         }
     
-    def _create_fallback_details(self, basic_tender: Dict[str, Any], error_message: str) -> Dict[str, Any]:
+    def _create_fallback_details(self, basic_tender: Dict[str, Any], error_message: str,
+                                 now_iso: Optional[str] = None) -> Dict[str, Any]:
         """Create fallback detailed information when extraction fails"""
         return {
             'detailed_title': basic_tender.get('title', 'N/A'),
@@ -418,7 +756,7 @@ IMPORTANT:
             'tender_type': None,
             'procurement_method': None,
             'categories': None,
-            'extracted_at': datetime.utcnow().isoformat(),
+            'extracted_at': now_iso or datetime.utcnow().isoformat(),
             'extraction_status': 'failed',
             'error_message': error_message,
             'source_url': basic_tender.get('url', 'N/A')
@@ -426,18 +764,22 @@ IMPORTANT:
     
     def _parse_detail_response(self, response_text: str) -> Optional[Dict[str, Any]]:
         """Parse detailed information JSON response from LLM"""
-        import json
-        
         try:
             # Clean up markdown code blocks
-            cleaned_text = response_text
-            if response_text.startswith('```json'):
-                cleaned_text = response_text.replace('```json', '').replace('```', '').strip()
-            elif response_text.startswith('```'):
-                cleaned_text = response_text.replace('```', '').strip()
+            cleaned_text = (
+                response_text.strip()
+                .removeprefix('```json')
+                .removeprefix('```')
+                .removesuffix('```')
+                .strip()
+            )
+            
+            if not cleaned_text.startswith('{'):
+                logger.error("Detailed response is not a JSON object")
+                return None
             
             # Parse JSON
-            detailed_info = json.loads(cleaned_text)
+            detailed_info = orjson.loads(cleaned_text)
             
             if not isinstance(detailed_info, dict):
                 logger.warning("Detailed response is not a dictionary")
@@ -445,74 +787,344 @@ IMPORTANT:
             
             return detailed_info
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse detailed JSON response: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse detailed JSON response: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Unexpected error parsing detailed response: {e}")
+            logger.error("Unexpected error parsing detailed response: %s", e)
+            return None
+    
+    def _get_openai_client(self) -> AsyncOpenAI:
+        """Get the OpenAI client used for Batch API requests"""
+        if self._openai_client is None:
+            self._openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        return self._openai_client
+    
+    async def submit_batch(self, tender_list: List[Dict[str, Any]],
+                           scraper: Optional[TenderScraper] = None,
+                           current_date: Optional[date] = None) -> Optional[str]:
+        """
+        Scrape tender pages and submit their extraction requests to the OpenAI Batch API
+        
+        Args:
+            tender_list: List of basic tender information from Agent 1
+            scraper: Open scraper to reuse (a new session is opened otherwise)
+            current_date: Date the prompts treat as today (defaults to now)
+            
+        Returns:
+            Batch ID, or None if nothing could be submitted
+        """
+        try:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            unique = list({t.get('url'): t for t in tender_list if t.get('url')}.values())
+            
+            async def _scrape(scraper: TenderScraper, tender: Dict[str, Any]) -> Optional[str]:
+                async with semaphore:
+                    return await self._scrape_tender_page(scraper, tender['url'])
+            
+            if scraper:
+                contents = await asyncio.gather(*[_scrape(scraper, t) for t in unique])
+            else:
+                async with self._scraper_session() as session:
+                    contents = await asyncio.gather(*[_scrape(session, t) for t in unique])
+            
+            lines = []
+            for tender, content in zip(unique, contents):
+                if not content:
+                    continue
+                lines.append(orjson.dumps({
+                    "custom_id": tender['url'],
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": settings.OPENAI_MODEL,
+                        "temperature": 0.1,
+                        "response_format": {"type": "json_object"},
+                        "messages": [
+                            {"role": "user", "content": self._build_detail_request(content, tender, current_date)}
+                        ]
+                    }
+                }))
+            
+            if not lines:
+                logger.warning("Agent 2: No tender pages scraped, nothing to submit to Batch API")
+                return None
+            
+            client = self._get_openai_client()
+            input_file = await client.files.create(
+                file=("agent2_batch.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = await client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            
+            logger.info("Agent 2: Submitted batch %s with %s tender pages", batch.id, len(lines))
+            return batch.id
+            
+        except Exception as e:
+            logger.error("Agent 2: Failed to submit batch: %s", e)
             return None
     
+    async def poll_batch(self, batch_id: str) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        Fetch the results of a Batch API job
+        
+        Returns:
+            Mapping of tender URL to detailed info (None where parsing failed),
+            or None while the batch is still running, winding down or couldn't
+            be reached (transient API error). Expired and cancelled batches
+            return whatever requests completed; an empty mapping means the
+            batch ended without output.
+        """
+        try:
+            client = self._get_openai_client()
+            batch = await client.batches.retrieve(batch_id)
+            
+            # 'cancelling' is not terminal: completed requests still land in the output file
+            if batch.status in ('validating', 'in_progress', 'finalizing', 'cancelling'):
+                return None
+            
+            if batch.status in ('expired', 'cancelled'):
+                logger.warning("Agent 2: Batch %s %s, collecting its partial results", batch_id, batch.status)
+            elif batch.status != 'completed':
+                logger.error("Agent 2: Batch %s ended with status %s", batch_id, batch.status)
+                return {}
+            
+            if not batch.output_file_id:
+                logger.error("Agent 2: Batch %s ended (%s) without output", batch_id, batch.status)
+                return {}
+            
+            output = await client.files.content(batch.output_file_id)
+            
+        except (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError) as e:
+            # Keep polling: the batch (and what it cost) is still there
+            logger.warning("Agent 2: Transient error polling batch %s, retrying: %s", batch_id, e)
+            return None
+        except Exception as e:
+            logger.error("Agent 2: Failed to poll batch %s: %s", batch_id, e)
+            return {}
+        
+        extracted_at = datetime.utcnow().isoformat()
+        results = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            # A bad line (e.g. a refusal with no content) only loses its own tender
+            try:
+                record = orjson.loads(line)
+                url = record.get('custom_id')
+                body = (record.get('response') or {}).get('body') or {}
+                choices = body.get('choices') or []
+                
+                detailed_info = None
+                if choices and choices[0]['message'].get('content'):
+                    detailed_info = self._parse_detail_response(choices[0]['message']['content'])
+                if detailed_info:
+                    detailed_info['extracted_at'] = extracted_at
+                    detailed_info['source_url'] = url
+                results[url] = detailed_info
+            except Exception as e:
+                logger.error("Agent 2: Skipping unreadable line in batch %s output: %s", batch_id, e)
+        
+        logger.info("Agent 2: Batch %s returned %s results", batch_id, len(results))
+        return results
+    
+    async def _wait_for_batch(self, batch_id: str) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Poll a batch until it reaches a terminal status"""
+        while True:
+            polled = await self.poll_batch(batch_id)
+            if polled is not None:
+                return polled
+            await asyncio.sleep(self.batch_poll_interval)
+    
+    async def _process_with_batch_api(self, tender_list: List[Dict[str, Any]],
+                                      skip_date_validation: bool,
+                                      scraper: TenderScraper,
+                                      current_date: date,
+                                      now_iso: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Run pre-validated tenders through the Batch API, waiting at most batch_max_wait
+        
+        A batch that isn't done in time is cancelled and its tenders get fallback details.
+        """
+        results: List[Optional[Dict[str, Any]]] = []
+        
+        batch_results: Dict[str, Optional[Dict[str, Any]]] = {}
+        batch_id = await self.submit_batch(tender_list, scraper, current_date) if tender_list else None
+        if batch_id:
+            try:
+                batch_results = await asyncio.wait_for(self._wait_for_batch(batch_id), self.batch_max_wait)
+            except asyncio.TimeoutError:
+                logger.warning("Agent 2: Batch %s not done after %ss, cancelling", batch_id, self.batch_max_wait)
+                try:
+                    await self._get_openai_client().batches.cancel(batch_id)
+                except Exception as e:
+                    logger.error("Agent 2: Failed to cancel batch %s: %s", batch_id, e)
+        
+        for tender in tender_list:
+            detailed_info = batch_results.get(tender.get('url'))
+            if detailed_info:
+                results.append(self._finish_details(
+                    dict(detailed_info), tender, skip_date_validation, current_date, now_iso
+                ))
+            else:
+                results.append(self._create_fallback_details(tender, "Batch extraction failed", now_iso))
+        
+        return results
+    
     async def process_multiple_tenders(self, tender_list: List[Dict[str, Any]], 
-                                     skip_date_validation: bool = False) -> List[Dict[str, Any]]:
+                                     skip_date_validation: bool = False,
+                                     use_batch_api: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Process multiple tenders with date validation
         
         Args:
             tender_list: List of basic tender information from Agent 1
             skip_date_validation: If True, process all tenders regardless of dates
+            use_batch_api: If True, extract through the OpenAI Batch API (half the
+                cost, latency bounded by BATCH_API_MAX_WAIT_SECONDS); defaults to
+                settings.USE_BATCH_API
             
         Returns:
-            List of detailed tender information (only valid/active tenders)
+            List of detailed tender information (only valid/active tenders), in input order
         """
-        detailed_results = []
+        indexed = [item async for item in self._iter_indexed_details(
+            tender_list, skip_date_validation, use_batch_api
+        )]
+        indexed.sort(key=lambda item: item[0])
+        return [combined_result for _, combined_result in indexed]
+    
+    async def _iter_indexed_details(self, tender_list: List[Dict[str, Any]],
+                                    skip_date_validation: bool,
+                                    use_batch_api: Optional[bool]) -> AsyncIterator[tuple]:
+        """Yield (input index, combined result) pairs in completion order"""
+        if use_batch_api is None:
+            use_batch_api = settings.USE_BATCH_API
+        total = len(tender_list)
+        yielded = 0
         skipped_count = 0
         
-        logger.info(f"Agent 2: Processing {len(tender_list)} tenders (date validation: {'OFF' if skip_date_validation else 'ON'})")
+        # One clock reading per run: consistent dates across every tender in the batch
+        current_date = datetime.now().date()
+        now_iso = datetime.utcnow().isoformat()
         
-        for i, tender in enumerate(tender_list, 1):
-            try:
-                logger.info(f"Processing tender {i}/{len(tender_list)}: {tender.get('title', 'Unknown')[:50]}...")
-                
-                detailed_info = await self.extract_tender_details(
-                    tender_url=tender.get('url'),
-                    basic_tender=tender,
-                    skip_date_validation=skip_date_validation
-                )
-                
-                if detailed_info:
-                    # Check if tender was skipped
-                    if detailed_info.get('extraction_status') == 'skipped':
-                        skipped_count += 1
-                        logger.info(f"Skipped tender {i}/{len(tender_list)}: {detailed_info.get('skip_reason', 'Unknown reason')}")
-                        
-                        # Only include skipped tenders if we're not filtering by date
-                        if skip_date_validation:
-                            combined_result = {
-                                **tender,
-                                'detailed_info': detailed_info,
-                                'processing_status': 'skipped',
-                                'processed_at': datetime.utcnow().isoformat()
-                            }
-                            detailed_results.append(combined_result)
-                    else:
-                        # Include valid tender
-                        combined_result = {
-                            **tender,
-                            'detailed_info': detailed_info,
-                            'processing_status': 'completed',
-                            'processed_at': datetime.utcnow().isoformat()
-                        }
-                        detailed_results.append(combined_result)
-                        logger.info(f"Successfully processed tender {i}/{len(tender_list)}")
+        logger.info("Agent 2: Processing %s tenders (date validation: %s)", total, 'OFF' if skip_date_validation else 'ON')
+        
+        # Pre-filter expired/old tenders so they never reach the scrape/LLM pipeline.
+        # This only runs with date validation on, where skipped tenders are dropped
+        # from the results, so no skip details are built for them.
+        if skip_date_validation:
+            active_indices = list(range(total))
+        else:
+            active_indices = []
+            for idx, tender in enumerate(tender_list):
+                if self._should_process_tender(tender, current_date):
+                    active_indices.append(idx)
                 else:
-                    logger.error(f"Failed to process tender {i}/{len(tender_list)}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing tender {i}/{len(tender_list)}: {e}")
-                continue
+                    logger.info("Agent 2: Skipping expired/old tender: %s...", _short(tender.get('title', 'Unknown')))
+                    skipped_count += 1
+        
+        # Each URL is scraped and extracted once; duplicates share its result
+        duplicates: Dict[int, List[int]] = defaultdict(list)
+        first_by_url: Dict[str, int] = {}
+        unique_indices = []
+        for idx in active_indices:
+            url = tender_list[idx].get('url')
+            if url and url in first_by_url:
+                duplicates[first_by_url[url]].append(idx)
+            else:
+                if url:
+                    first_by_url[url] = idx
+                unique_indices.append(idx)
+        
+        if len(unique_indices) < len(active_indices):
+            logger.info("Agent 2: %s duplicate tender URLs share results", len(active_indices) - len(unique_indices))
+        
+        if unique_indices:
+            async def _run(indices: List[int], coro) -> tuple:
+                try:
+                    return indices, await coro
+                except Exception as e:
+                    return indices, [e] * len(indices)
+            
+            # One scraper session for the whole run instead of one per tender
+            async with self._scraper_session() as scraper:
+                if use_batch_api:
+                    units = [(unique_indices, self._process_with_batch_api(
+                        [tender_list[idx] for idx in unique_indices], skip_date_validation, scraper,
+                        current_date, now_iso
+                    ))]
+                else:
+                    semaphore = asyncio.Semaphore(self.max_concurrency)
+                    batch_size = max(1, self.llm_batch_size)
+                    windows = [unique_indices[i:i + batch_size] for i in range(0, len(unique_indices), batch_size)]
+                    units = [(window, self._extract_tender_batch(
+                        [tender_list[idx] for idx in window], skip_date_validation, semaphore, scraper,
+                        current_date, now_iso
+                    )) for window in windows]
+                
+                tasks = [asyncio.create_task(_run(indices, coro)) for indices, coro in units]
+                try:
+                    for future in asyncio.as_completed(tasks):
+                        indices, unit_results = await future
+                        for first_idx, detailed_info in zip(indices, unit_results):
+                            for idx in [first_idx, *duplicates.get(first_idx, ())]:
+                                shared_info = detailed_info
+                                if idx != first_idx and isinstance(detailed_info, dict):
+                                    shared_info = dict(detailed_info)
+                                if isinstance(shared_info, dict) and shared_info.get('extraction_status') == 'skipped':
+                                    skipped_count += 1
+                                combined_result = self._combine_result(
+                                    idx + 1, total, tender_list[idx], shared_info, skip_date_validation, now_iso
+                                )
+                                if combined_result:
+                                    yielded += 1
+                                    yield idx, combined_result
+                finally:
+                    # A consumer that stops early (or is cancelled) must not leave
+                    # scrape/LLM tasks running after the scraper session closes
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
         
-        logger.info(f"Agent 2 completed: {len(detailed_results)}/{len(tender_list)} tenders processed successfully")
+        logger.info("Agent 2 completed: %s/%s tenders processed successfully", yielded, total)
         if skipped_count > 0:
-            logger.info(f"Skipped {skipped_count} tenders due to date validation")
+            logger.info("Skipped %s tenders due to date validation", skipped_count)
+    
+    def _combine_result(self, i: int, total: int, tender: Dict[str, Any], detailed_info: Any,
+                        skip_date_validation: bool, now_iso: str) -> Optional[Dict[str, Any]]:
+        """Merge basic and detailed info, or return None if the tender is dropped"""
+        if isinstance(detailed_info, Exception):
+            logger.error("Error processing tender %s/%s: %s", i, total, detailed_info)
+            return None
+        
+        if not detailed_info:
+            logger.error("Failed to process tender %s/%s", i, total)
+            return None
         
-        return detailed_results
\ No newline at end of file
+        # Check if tender was skipped
+        if detailed_info.get('extraction_status') == 'skipped':
+            logger.info("Skipped tender %s/%s: %s", i, total, detailed_info.get('skip_reason', 'Unknown reason'))
+            
+            # Only include skipped tenders if we're not filtering by date
+            if not skip_date_validation:
+                return None
+            
+            return {
+                **tender,
+                'detailed_info': detailed_info,
+                'processing_status': 'skipped',
+                'processed_at': now_iso
+            }
+        
+        # Include valid tender
+        logger.info("Successfully processed tender %s/%s", i, total)
+        return {
+            **tender,
+            'detailed_info': detailed_info,
+            'processing_status': 'completed',
+            'processed_at': now_iso
+        }
@@ -2,358 +2,128 @@
 Enhanced Agent 3: Rich Detailed Email Composer Agent
 Creates beautiful, detailed emails with full tender information and modern CSS styling
 """
+import asyncio
+import functools
+import httpx
+import jinja2
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage
+import orjson
+import random
+import re
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-class EmailComposerAgent:
-    """
-    Agent 3: Compose rich, detailed emails with beautiful formatting
-    
-    Role:
-    - Take detailed tender information from Agent 2
-    - Create comprehensive, well-formatted emails
-    - Use modern CSS styling for professional appearance
-    - Handle multiple tenders efficiently
-    """
-    
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.1
-        )
-    
-    async def compose_tender_email(self, tender_data: Dict[str, Any], 
-                                 detailed_info: Dict[str, Any], 
-                                 team_category: str) -> Dict[str, Any]:
-        """
-        Compose rich, detailed email content for tender notification
-        
-        Args:
-            tender_data: Basic tender information from Agent 1
-            detailed_info: Detailed tender information from Agent 2
-            team_category: Target team category ("esg", "credit_rating", "both")
-            
-        Returns:
-            Dictionary with comprehensive email content
-        """
-        try:
-            logger.info(f"Agent 3: Composing detailed email for {team_category} team - {tender_data.get('title', 'Unknown')[:50]}...")
-            
-            # Build detailed email prompt
-            email_prompt = self._build_detailed_email_prompt(team_category)
-            
-            # Create user message with all available data
-            user_message = f"""
-BASIC TENDER INFORMATION:
-========================
-Title: {tender_data.get('title', 'N/A')}
-URL: {tender_data.get('url', 'N/A')}
-Category: {tender_data.get('category', 'N/A')}
-Date: {tender_data.get('date', 'N/A')}
-Description: {tender_data.get('description', 'N/A')}
-Matched Keywords: {', '.join(tender_data.get('matched_keywords', []))}
+# One connection pool for every composer instance, so TCP/TLS connections to
+# OpenAI stay warm across emails; closed by close_http_client() at shutdown
+_SHARED_HTTP = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=50),
+    timeout=httpx.Timeout(60.0)
+)
 
-DETAILED INFORMATION FROM AGENT 2:
-==================================
-{self._format_all_details(detailed_info)}
 
-Please compose a comprehensive, well-formatted email for the {team_category.upper()} team.
-Include ALL available details and make it visually appealing with proper sections.
-Return ONLY the JSON object with no additional text.
-"""
-            
-            # Get response from LLM
-            messages = [
-                HumanMessage(content=f"{email_prompt}\n\n{user_message}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            response_text = response.content.strip()
-            
-            # Parse JSON response
-            email_content = self._parse_email_response(response_text)
-            
-            if email_content:
-                # Add metadata
-                email_content['generated_at'] = datetime.utcnow().isoformat()
-                email_content['team_category'] = team_category
-                email_content['tender_id'] = tender_data.get('id')
-                email_content['agent_version'] = '3.0-enhanced'
-                
-                logger.info(f"Agent 3: Successfully composed detailed email for {team_category} team")
-                return email_content
-            else:
-                logger.error(f"Agent 3: Failed to parse email response for {team_category} team")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Agent 3: Error composing email for {team_category} team: {e}")
-            return None
-    
-    def _build_detailed_email_prompt(self, team_category: str) -> str:
-        """Build a comprehensive email composition prompt"""
-        team_name = "ESG Team" if team_category == "esg" else "Credit Rating Team"
-        
-        return f"""You are composing a comprehensive, professional email notification for the {team_name}.
+async def close_http_client() -> None:
+    """Close the shared HTTP client used for OpenAI requests"""
+    await _SHARED_HTTP.aclose()
 
-REQUIREMENTS:
-=============
-1. Use ALL available detailed information from Agent 2
-2. Create a visually appealing, well-structured email
-3. Include modern CSS styling for professional appearance
-4. Make it comprehensive but scannable
-5. Use clear sections and proper formatting
-6. Include all contact details, requirements, deadlines
-7. Make it actionable with clear next steps
 
-EMAIL STRUCTURE:
-================
-Compose a detailed email with this structure:
+# Fields the email sender needs in every composed email
+_REQUIRED_FIELDS = frozenset({'subject', 'summary', 'html_body'})
 
-{{
-  "subject": "Clear, informative subject line including key details",
-  "priority": "High|Medium|Low (based on deadline urgency)",
-  "summary": "2-3 sentence executive summary of the opportunity",
-  "tender_details": {{
-    "title": "Full tender title",
-    "organization": "Issuing organization",
-    "deadline": "Deadline with urgency assessment",
-    "value": "Tender value/budget if available",
-    "scope": "What exactly they need",
-    "requirements": "Key requirements and qualifications"
-  }},
-  "contact_info": {{
-    "organization": "Contact organization",
-    "person": "Contact person name",
-    "phone": "Phone number",
-    "email": "Email address",
-    "address": "Address if available"
-  }},
-  "next_steps": "Clear action items for the team",
-  "html_body": "Complete HTML email with modern CSS styling and all details"
-}}
 
-CSS STYLING REQUIREMENTS:
-=========================
-- Modern, professional design
-- Clean typography with good readability
-- Color-coded sections for easy scanning
-- Responsive design that works on mobile
-- Clear visual hierarchy
-- Action buttons with hover effects
-- Professional color scheme (blues, grays, whites)
+def _strict_object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON schema object in the shape strict structured outputs require"""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
 
-CONTENT REQUIREMENTS:
-====================
-- Include ALL detailed information from Agent 2
-- Show complete requirements list
-- Display full contact information
-- Include deadline with urgency indicator
-- Show tender value/budget if available
-- Add clear call-to-action buttons
-- Include all relevant dates and timelines
 
-TONE AND STYLE:
-===============
-- Professional but engaging
-- Clear and direct communication
-- Well-organized information hierarchy
-- Emphasis on actionable next steps
-- Include urgency indicators where appropriate
+_STRING = {"type": "string"}
 
-HTML STRUCTURE REQUIREMENTS:
-============================
-- Header section with tender title and category
-- Executive summary section
-- Detailed tender information section
-- Requirements section with bullet points
-- Contact information section
-- Timeline/deadline section with urgency
-- Next steps section with action buttons
-- Footer with system information
+# Structured-output schema for one composed email, matching the prompt's EMAIL STRUCTURE
+_EMAIL_PROPERTIES = {
+    "subject": _STRING,
+    "priority": {"type": "string", "enum": ["High", "Medium", "Low"]},
+    "summary": _STRING,
+    "tender_details": _strict_object({
+        key: _STRING for key in ("title", "organization", "deadline", "value", "scope", "requirements")
+    }),
+    "contact_info": _strict_object({
+        key: _STRING for key in ("organization", "person", "phone", "email", "address")
+    }),
+    "next_steps": _STRING,
+    "html_body": _STRING
+}
 
-Use modern HTML/CSS practices and ensure the email looks professional in all email clients."""
-    
-    def _format_all_details(self, detailed_info: Dict[str, Any]) -> str:
-        """Format all detailed information comprehensively"""
-        formatted_details = []
-        
-        detail_mapping = {
-            'detailed_title': 'Detailed Title',
-            'detailed_description': 'Detailed Description',
-            'requirements': 'Requirements',
-            'deadline': 'Deadline',
-            'submission_deadline': 'Submission Deadline',
-            'tender_value': 'Tender Value',
-            'duration': 'Project Duration',
-            'contact_info': 'Contact Information',
-            'documents_required': 'Required Documents',
-            'evaluation_criteria': 'Evaluation Criteria',
-            'additional_details': 'Additional Details',
-            'tender_type': 'Tender Type',
-            'procurement_method': 'Procurement Method',
-            'categories': 'Categories'
-        }
-        
-        for key, label in detail_mapping.items():
-            if key in detailed_info and detailed_info[key]:
-                value = detailed_info[key]
-                if isinstance(value, dict):
-                    formatted_details.append(f"{label}: {value}")
-                elif isinstance(value, list):
-                    formatted_details.append(f"{label}: {', '.join([str(v) for v in value])}")
-                else:
-                    formatted_details.append(f"{label}: {str(value)}")
-        
-        return "\n".join(formatted_details)
-    
-    def _parse_email_response(self, response_text: str) -> Optional[Dict[str, Any]]:
-        """Parse detailed email JSON response"""
-        import json
-        
-        try:
-            # Clean up markdown code blocks
-            cleaned_text = response_text
-            if response_text.startswith('```json'):
-                cleaned_text = response_text.replace('```json', '').replace('```', '').strip()
-            elif response_text.startswith('```'):
-                cleaned_text = response_text.replace('```', '').strip()
-            
-            # Parse JSON
-            email_content = json.loads(cleaned_text)
-            
-            if not isinstance(email_content, dict):
-                logger.warning("Email response is not a dictionary")
-                return None
-            
-            # Validate required fields
-            required_fields = ['subject', 'summary', 'html_body']
-            if not all(field in email_content for field in required_fields):
-                logger.warning(f"Missing required fields in email response")
-                return None
-            
-            return email_content
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse email JSON response: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error parsing email response: {e}")
-            return None
-    
-    def _create_detailed_fallback_email(self, tender_data: Dict[str, Any], 
-                                      detailed_info: Dict[str, Any], 
-                                      team_category: str) -> Dict[str, Any]:
-        """Create detailed fallback email when AI composition fails"""
-        team_name = "ESG Team" if team_category == "esg" else "Credit Rating Team"
-        title = tender_data.get('title', 'New Tender Opportunity')
-        
-        # Extract key details
-        deadline = detailed_info.get('deadline', 'Not specified')
-        contact_info = detailed_info.get('contact_info', {})
-        requirements = detailed_info.get('requirements', 'See tender details')
-        tender_value = detailed_info.get('tender_value', 'Not specified')
-        
-        # Parse contact info if it's a JSON string
-        if isinstance(contact_info, str):
-            try:
-                import json
-                contact_info = json.loads(contact_info)
-            except:
-                contact_info = {'organization': contact_info}
-        
-        # Determine urgency
-        urgency = self._assess_deadline_urgency(deadline)
-        priority = "High" if urgency == "URGENT" else "Medium"
-        
-        return {
-            'subject': f"New {team_category.upper()} Tender: {title[:40]}..." + (" [URGENT]" if urgency == "URGENT" else ""),
-            'priority': priority,
-            'summary': f"A new {team_category} tender opportunity has been identified that requires immediate attention from the {team_name}.",
-            'tender_details': {
-                'title': title,
-                'organization': contact_info.get('organization', 'Not specified'),
-                'deadline': deadline,
-                'value': tender_value,
-                'scope': detailed_info.get('detailed_description', tender_data.get('description', 'See tender details')),
-                'requirements': requirements
-            },
-            'contact_info': contact_info,
-            'next_steps': 'Review tender details, assess our capabilities, and prepare proposal if suitable.',
-            'html_body': self._create_rich_html_template(
-                title, team_name, team_category, tender_data, detailed_info, contact_info, urgency
-            ),
-            'generated_at': datetime.utcnow().isoformat(),
-            'team_category': team_category,
-            'agent_version': '3.0-enhanced-fallback'
-        }
-    
-    def _assess_deadline_urgency(self, deadline_str: str) -> str:
-        """Assess deadline urgency"""
-        if not deadline_str or deadline_str == 'Not specified':
-            return "NORMAL"
-        
-        try:
-            # Try to parse the deadline
-            deadline = datetime.strptime(deadline_str.split()[0], '%Y-%m-%d')
-            now = datetime.now()
-            days_left = (deadline - now).days
-            
-            if days_left <= 3:
-                return "URGENT"
-            elif days_left <= 7:
-                return "HIGH"
-            elif days_left <= 14:
-                return "MEDIUM"
-            else:
-                return "NORMAL"
-        except:
-            return "NORMAL"
-    
-    def _create_rich_html_template(self, title: str, team_name: str, team_category: str, 
-                                 tender_data: Dict[str, Any], detailed_info: Dict[str, Any], 
-                                 contact_info: Dict[str, Any], urgency: str) -> str:
-        """Create rich HTML email template with modern styling"""
-        
-        # Extract details
-        deadline = detailed_info.get('deadline', 'Not specified')
-        requirements = detailed_info.get('requirements', 'See tender details')
-        tender_value = detailed_info.get('tender_value', 'Not specified')
-        description = detailed_info.get('detailed_description', tender_data.get('description', ''))
-        
-        # Format requirements as list if it's a string with newlines
-        if isinstance(requirements, str) and '\n' in requirements:
-            req_list = requirements.split('\n')
-            requirements_html = "<ul>" + "".join([f"<li>{req.strip()}</li>" for req in req_list if req.strip()]) + "</ul>"
-        else:
-            requirements_html = f"<p>{requirements}</p>"
-        
-        # Urgency styling
-        urgency_colors = {
-            "URGENT": "#dc3545",
-            "HIGH": "#fd7e14", 
-            "MEDIUM": "#ffc107",
-            "NORMAL": "#28a745"
-        }
-        urgency_color = urgency_colors.get(urgency, "#6c757d")
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Tender Notification</title>
-            <style>
-                body {{
+_EMAIL_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "tender_email", "strict": True, "schema": _strict_object(_EMAIL_PROPERTIES)}
+}
+
+_EMAIL_BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "tender_email_batch",
+        "strict": True,
+        "schema": _strict_object({
+            "emails": {
+                "type": "array",
+                "items": _strict_object({**_EMAIL_PROPERTIES, "tender_index": {"type": "integer"}})
+            }
+        })
+    }
+}
+
+# Agent 1 tender fields and Agent 2 detail fields sent in the composition prompt
+_TENDER_PROMPT_KEYS = ('title', 'url', 'category', 'date', 'description', 'matched_keywords')
+
+_DETAIL_PROMPT_KEYS = (
+    'detailed_title',
+    'detailed_description',
+    'requirements',
+    'deadline',
+    'submission_deadline',
+    'tender_value',
+    'duration',
+    'contact_info',
+    'documents_required',
+    'evaluation_criteria',
+    'additional_details',
+    'tender_type',
+    'procurement_method',
+    'categories'
+)
+
+# Team display names; any other category is addressed to the Credit Rating team
+_TEAM_NAMES = {"esg": "ESG Team"}
+
+_URGENCY_COLORS = {
+    "URGENT": "#dc3545",
+    "HIGH": "#fd7e14",
+    "MEDIUM": "#ffc107",
+    "NORMAL": "#28a745"
+}
+
+
+
+def _minify_css(css: str) -> str:
+    """Collapse whitespace around CSS punctuation; run once at import on the static stylesheets"""
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([:;{},])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+# Static CSS of the single-tender and digest emails, minified and spliced into their templates at import
+_RICH_EMAIL_CSS = _minify_css("""
+                body {
                     font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                     line-height: 1.6;
                     color: #333;
@@ -361,125 +131,125 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     margin: 0 auto;
                     padding: 20px;
                     background-color: #f8f9fa;
-                }}
-                .email-container {{
+                }
+                .email-container {
                     background-color: white;
                     border-radius: 10px;
                     box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
                     overflow: hidden;
-                }}
-                .header {{
+                }
+                .header {
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     color: white;
                     padding: 30px;
                     text-align: center;
-                }}
-                .header h1 {{
+                }
+                .header h1 {
                     margin: 0;
                     font-size: 24px;
                     font-weight: 600;
-                }}
-                .header .team-badge {{
+                }
+                .header .team-badge {
                     background-color: rgba(255, 255, 255, 0.2);
                     padding: 5px 15px;
                     border-radius: 20px;
                     font-size: 14px;
                     margin-top: 10px;
                     display: inline-block;
-                }}
-                .urgency-banner {{
-                    background-color: {urgency_color};
+                }
+                .urgency-banner {
+                    background-color: {{ urgency_color }};
                     color: white;
                     text-align: center;
                     padding: 10px;
                     font-weight: bold;
                     text-transform: uppercase;
                     letter-spacing: 1px;
-                }}
-                .content {{
+                }
+                .content {
                     padding: 30px;
-                }}
-                .tender-title {{
+                }
+                .tender-title {
                     color: #2c3e50;
                     font-size: 22px;
                     font-weight: 600;
                     margin: 0 0 20px 0;
                     padding-bottom: 10px;
                     border-bottom: 3px solid #667eea;
-                }}
-                .section {{
+                }
+                .section {
                     margin: 25px 0;
                     padding: 20px;
                     background-color: #f8f9fa;
                     border-radius: 8px;
                     border-left: 4px solid #667eea;
-                }}
-                .section-title {{
+                }
+                .section-title {
                     color: #495057;
                     font-size: 16px;
                     font-weight: 600;
                     margin: 0 0 15px 0;
                     text-transform: uppercase;
                     letter-spacing: 0.5px;
-                }}
-                .detail-grid {{
+                }
+                .detail-grid {
                     display: grid;
                     grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
                     gap: 15px;
                     margin: 15px 0;
-                }}
-                .detail-item {{
+                }
+                .detail-item {
                     background: white;
                     padding: 15px;
                     border-radius: 6px;
                     border: 1px solid #e9ecef;
-                }}
-                .detail-label {{
+                }
+                .detail-label {
                     font-weight: 600;
                     color: #6c757d;
                     font-size: 12px;
                     text-transform: uppercase;
                     letter-spacing: 0.5px;
                     margin-bottom: 5px;
-                }}
-                .detail-value {{
+                }
+                .detail-value {
                     color: #2c3e50;
                     font-size: 14px;
-                }}
-                .requirements ul {{
+                }
+                .requirements ul {
                     margin: 10px 0;
                     padding-left: 20px;
-                }}
-                .requirements li {{
+                }
+                .requirements li {
                     margin: 8px 0;
                     color: #495057;
-                }}
-                .contact-card {{
+                }
+                .contact-card {
                     background: white;
                     border: 1px solid #dee2e6;
                     border-radius: 8px;
                     padding: 20px;
                     margin: 15px 0;
-                }}
-                .contact-name {{
+                }
+                .contact-name {
                     font-weight: 600;
                     color: #2c3e50;
                     font-size: 16px;
                     margin-bottom: 10px;
-                }}
-                .contact-details {{
+                }
+                .contact-details {
                     color: #6c757d;
                     line-height: 1.8;
-                }}
-                .cta-section {{
+                }
+                .cta-section {
                     text-align: center;
                     margin: 30px 0;
                     padding: 25px;
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     border-radius: 8px;
                     color: white;
-                }}
-                .cta-button {{
+                }
+                .cta-button {
                     display: inline-block;
                     background-color: white;
                     color: #667eea;
@@ -489,20 +259,20 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     font-weight: 600;
                     margin: 10px;
                     transition: all 0.3s ease;
-                }}
-                .cta-button:hover {{
+                }
+                .cta-button:hover {
                     background-color: #f8f9fa;
                     transform: translateY(-2px);
                     box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
-                }}
-                .footer {{
+                }
+                .footer {
                     background-color: #2c3e50;
                     color: white;
                     padding: 20px;
                     text-align: center;
                     font-size: 12px;
-                }}
-                .deadline-warning {{
+                }
+                .deadline-warning {
                     background-color: #fff3cd;
                     border: 1px solid #ffeaa7;
                     color: #856404;
@@ -511,228 +281,11 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     margin: 15px 0;
                     text-align: center;
                     font-weight: 600;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="email-container">
-                <div class="header">
-                    <h1>New Tender Opportunity</h1>
-                    <div class="team-badge">{team_name}</div>
-                </div>
-                
-                {"<div class='urgency-banner'>⚠️ " + urgency + " DEADLINE</div>" if urgency in ["URGENT", "HIGH"] else ""}
-                
-                <div class="content">
-                    <h2 class="tender-title">{title}</h2>
-                    
-                    <div class="section">
-                        <div class="section-title">📋 Overview</div>
-                        <p>{description[:300]}{'...' if len(description) > 300 else ''}</p>
-                    </div>
-                    
-                    <div class="section">
-                        <div class="section-title">📊 Key Details</div>
-                        <div class="detail-grid">
-                            <div class="detail-item">
-                                <div class="detail-label">Organization</div>
-                                <div class="detail-value">{contact_info.get('organization', 'Not specified')}</div>
-                            </div>
-                            <div class="detail-item">
-                                <div class="detail-label">Deadline</div>
-                                <div class="detail-value">{deadline}</div>
-                            </div>
-                            <div class="detail-item">
-                                <div class="detail-label">Tender Value</div>
-                                <div class="detail-value">{tender_value}</div>
-                            </div>
-                            <div class="detail-item">
-                                <div class="detail-label">Category</div>
-                                <div class="detail-value">{team_category.upper()}</div>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <div class="section-title">📝 Requirements</div>
-                        <div class="requirements">
-                            {requirements_html}
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <div class="section-title">📞 Contact Information</div>
-                        <div class="contact-card">
-                            <div class="contact-name">{contact_info.get('contact_person', 'Contact Person Not Specified')}</div>
-                            <div class="contact-details">
-                                <strong>Organization:</strong> {contact_info.get('organization', 'Not specified')}<br>
-                                {"<strong>Phone:</strong> " + contact_info.get('phone', 'Not specified') + "<br>" if contact_info.get('phone') else ""}
-                                {"<strong>Email:</strong> " + contact_info.get('email', 'Not specified') + "<br>" if contact_info.get('email') else ""}
-                                {"<strong>Address:</strong> " + contact_info.get('address', 'Not specified') if contact_info.get('address') else ""}
-                            </div>
-                        </div>
-                    </div>
-                    
-                    {f"<div class='deadline-warning'>⏰ ATTENTION: Deadline is {deadline} - Immediate action required!</div>" if urgency in ["URGENT", "HIGH"] else ""}
-                    
-                    <div class="cta-section">
-                        <h3 style="margin-top: 0;">Next Steps</h3>
-                        <p>Review the full tender details and assess our capability to participate</p>
-                        <a href="{tender_data.get('url', '#')}" class="cta-button">📄 View Full Tender</a>
-                        <a href="mailto:{contact_info.get('email', '')}" class="cta-button">📧 Contact Issuer</a>
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <p>🤖 Automated notification from Tender Monitoring System v3.0</p>
-                    <p>Processed by Agent 1 (Extraction) → Agent 2 (Details) → Agent 3 (Email Composition)</p>
-                    <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-    
-    async def compose_multiple_tenders_email(self, tenders_with_details: List[Dict[str, Any]], 
-                                           team_category: str) -> Dict[str, Any]:
-        """
-        Compose a single email with multiple tenders (digest format)
-        """
-        try:
-            logger.info(f"Agent 3: Composing multi-tender email for {team_category} team with {len(tenders_with_details)} tenders")
-            
-            team_name = "ESG Team" if team_category == "esg" else "Credit Rating Team"
-            
-            # Create comprehensive multi-tender email
-            subject = f"New {team_category.upper()} Tenders - {len(tenders_with_details)} Opportunities Found"
-            
-            html_body = self._create_multi_tender_html(tenders_with_details, team_name, team_category)
-            
-            return {
-                'subject': subject,
-                'priority': self._assess_multi_tender_priority(tenders_with_details),
-                'summary': f"We found {len(tenders_with_details)} new {team_category} tender opportunities that match your criteria and require immediate review.",
-                'tender_count': len(tenders_with_details),
-                'html_body': html_body,
-                'generated_at': datetime.utcnow().isoformat(),
-                'team_category': team_category,
-                'agent_version': '3.0-enhanced-multi'
-            }
-            
-        except Exception as e:
-            logger.error(f"Agent 3: Error composing multi-tender email: {e}")
-            return self._create_simple_multi_tender_fallback(tenders_with_details, team_category)
-    
-    def _assess_multi_tender_priority(self, tenders: List[Dict[str, Any]]) -> str:
-        """Assess priority for multiple tenders based on deadlines"""
-        urgent_count = 0
-        high_count = 0
-        
-        for tender in tenders:
-            detailed_info = tender.get('detailed_info', {})
-            deadline = detailed_info.get('deadline', '')
-            urgency = self._assess_deadline_urgency(deadline)
-            
-            if urgency == "URGENT":
-                urgent_count += 1
-            elif urgency == "HIGH":
-                high_count += 1
-        
-        if urgent_count > 0:
-            return "High"
-        elif high_count > 0:
-            return "Medium"
-        else:
-            return "Medium"
-    
-    def _create_multi_tender_html(self, tenders: List[Dict[str, Any]], 
-                                team_name: str, team_category: str) -> str:
-        """Create HTML for multiple tenders email"""
-        
-        tender_cards = ""
-        urgent_tenders = []
-        
-        for i, tender in enumerate(tenders, 1):
-            tender_data = tender
-            detailed_info = tender.get('detailed_info', {})
-            
-            # Extract details
-            title = tender_data.get('title', 'Untitled Tender')
-            deadline = detailed_info.get('deadline', 'Not specified')
-            urgency = self._assess_deadline_urgency(deadline)
-            contact_info = detailed_info.get('contact_info', {})
-            tender_value = detailed_info.get('tender_value', 'Not specified')
-            
-            if urgency in ["URGENT", "HIGH"]:
-                urgent_tenders.append((i, title, deadline))
-            
-            # Parse contact info if string
-            if isinstance(contact_info, str):
-                try:
-                    import json
-                    contact_info = json.loads(contact_info)
-                except:
-                    contact_info = {'organization': contact_info}
-            
-            urgency_colors = {
-                "URGENT": "#dc3545",
-                "HIGH": "#fd7e14", 
-                "MEDIUM": "#ffc107",
-                "NORMAL": "#28a745"
-            }
-            urgency_color = urgency_colors.get(urgency, "#6c757d")
-            
-            tender_cards += f"""
-            <div class="tender-card">
-                <div class="tender-header">
-                    <div class="tender-number">#{i}</div>
-                    <div class="urgency-badge" style="background-color: {urgency_color};">{urgency}</div>
-                </div>
-                <h3 class="tender-title">{title}</h3>
-                <div class="tender-meta">
-                    <div class="meta-item">
-                        <span class="meta-label">Organization:</span>
-                        <span class="meta-value">{contact_info.get('organization', 'Not specified')}</span>
-                    </div>
-                    <div class="meta-item">
-                        <span class="meta-label">Deadline:</span>
-                        <span class="meta-value">{deadline}</span>
-                    </div>
-                    <div class="meta-item">
-                        <span class="meta-label">Value:</span>
-                        <span class="meta-value">{tender_value}</span>
-                    </div>
-                </div>
-                <div class="tender-description">
-                    {detailed_info.get('detailed_description', tender_data.get('description', 'No description available'))[:200]}...
-                </div>
-                <div class="tender-actions">
-                    <a href="{tender_data.get('url', '#')}" class="action-btn primary">View Details</a>
-                    {"<a href='mailto:" + contact_info.get('email', '') + "' class='action-btn secondary'>Contact</a>" if contact_info.get('email') else ""}
-                </div>
-            </div>
-            """
-        
-        # Create urgent tenders summary if any
-        urgent_summary = ""
-        if urgent_tenders:
-            urgent_list = "".join([f"<li>#{num}: {title} (Due: {deadline})</li>" for num, title, deadline in urgent_tenders])
-            urgent_summary = f"""
-            <div class="urgent-summary">
-                <h3>⚠️ Urgent Deadlines Requiring Immediate Attention</h3>
-                <ul>{urgent_list}</ul>
-            </div>
-            """
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Multiple Tender Opportunities</title>
-            <style>
-                body {{
+                }
+""")
+
+_DIGEST_EMAIL_CSS = _minify_css("""
+                body {
                     font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                     line-height: 1.6;
                     color: #333;
@@ -740,30 +293,30 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     margin: 0 auto;
                     padding: 20px;
                     background-color: #f8f9fa;
-                }}
-                .email-container {{
+                }
+                .email-container {
                     background-color: white;
                     border-radius: 10px;
                     box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
                     overflow: hidden;
-                }}
-                .header {{
+                }
+                .header {
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     color: white;
                     padding: 30px;
                     text-align: center;
-                }}
-                .header h1 {{
+                }
+                .header h1 {
                     margin: 0;
                     font-size: 28px;
                     font-weight: 600;
-                }}
-                .header .subtitle {{
+                }
+                .header .subtitle {
                     opacity: 0.9;
                     margin-top: 10px;
                     font-size: 16px;
-                }}
-                .stats-bar {{
+                }
+                .stats-bar {
                     background-color: #2c3e50;
                     color: white;
                     padding: 15px;
@@ -771,40 +324,40 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     display: flex;
                     justify-content: space-around;
                     flex-wrap: wrap;
-                }}
-                .stat-item {{
+                }
+                .stat-item {
                     text-align: center;
                     margin: 5px;
-                }}
-                .stat-number {{
+                }
+                .stat-number {
                     font-size: 24px;
                     font-weight: bold;
                     display: block;
-                }}
-                .stat-label {{
+                }
+                .stat-label {
                     font-size: 12px;
                     opacity: 0.8;
                     text-transform: uppercase;
-                }}
-                .urgent-summary {{
+                }
+                .urgent-summary {
                     background-color: #fff3cd;
                     border: 2px solid #ffc107;
                     padding: 20px;
                     margin: 20px;
                     border-radius: 8px;
-                }}
-                .urgent-summary h3 {{
+                }
+                .urgent-summary h3 {
                     color: #856404;
                     margin-top: 0;
-                }}
-                .urgent-summary ul {{
+                }
+                .urgent-summary ul {
                     color: #856404;
                     margin: 10px 0;
-                }}
-                .content {{
+                }
+                .content {
                     padding: 20px;
-                }}
-                .tender-card {{
+                }
+                .tender-card {
                     background: white;
                     border: 1px solid #dee2e6;
                     border-radius: 8px;
@@ -812,18 +365,18 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     padding: 25px;
                     box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
                     transition: all 0.3s ease;
-                }}
-                .tender-card:hover {{
+                }
+                .tender-card:hover {
                     box-shadow: 0 4px 8px rgba(0, 0, 0, 0.15);
                     transform: translateY(-2px);
-                }}
-                .tender-header {{
+                }
+                .tender-header {
                     display: flex;
                     justify-content: space-between;
                     align-items: center;
                     margin-bottom: 15px;
-                }}
-                .tender-number {{
+                }
+                .tender-number {
                     background-color: #667eea;
                     color: white;
                     width: 30px;
@@ -834,23 +387,23 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     justify-content: center;
                     font-weight: bold;
                     font-size: 14px;
-                }}
-                .urgency-badge {{
+                }
+                .urgency-badge {
                     padding: 4px 12px;
                     border-radius: 20px;
                     color: white;
                     font-size: 12px;
                     font-weight: bold;
                     text-transform: uppercase;
-                }}
-                .tender-title {{
+                }
+                .tender-title {
                     color: #2c3e50;
                     font-size: 18px;
                     font-weight: 600;
                     margin: 0 0 15px 0;
                     line-height: 1.4;
-                }}
-                .tender-meta {{
+                }
+                .tender-meta {
                     display: grid;
                     grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
                     gap: 10px;
@@ -858,36 +411,36 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     padding: 15px;
                     background-color: #f8f9fa;
                     border-radius: 6px;
-                }}
-                .meta-item {{
+                }
+                .meta-item {
                     display: flex;
                     flex-direction: column;
-                }}
-                .meta-label {{
+                }
+                .meta-label {
                     font-size: 12px;
                     color: #6c757d;
                     font-weight: 600;
                     text-transform: uppercase;
                     letter-spacing: 0.5px;
-                }}
-                .meta-value {{
+                }
+                .meta-value {
                     font-size: 14px;
                     color: #2c3e50;
                     font-weight: 500;
                     margin-top: 2px;
-                }}
-                .tender-description {{
+                }
+                .tender-description {
                     color: #495057;
                     line-height: 1.6;
                     margin: 15px 0;
-                }}
-                .tender-actions {{
+                }
+                .tender-actions {
                     display: flex;
                     gap: 10px;
                     margin-top: 20px;
                     flex-wrap: wrap;
-                }}
-                .action-btn {{
+                }
+                .action-btn {
                     padding: 10px 20px;
                     border-radius: 6px;
                     text-decoration: none;
@@ -895,86 +448,219 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     font-size: 14px;
                     transition: all 0.3s ease;
                     display: inline-block;
-                }}
-                .action-btn.primary {{
+                }
+                .action-btn.primary {
                     background-color: #667eea;
                     color: white;
-                }}
-                .action-btn.primary:hover {{
+                }
+                .action-btn.primary:hover {
                     background-color: #5a67d8;
                     transform: translateY(-1px);
-                }}
-                .action-btn.secondary {{
+                }
+                .action-btn.secondary {
                     background-color: #6c757d;
                     color: white;
-                }}
-                .action-btn.secondary:hover {{
+                }
+                .action-btn.secondary:hover {
                     background-color: #5a6268;
-                }}
-                .summary-section {{
+                }
+                .summary-section {
                     background-color: #f8f9fa;
                     padding: 25px;
                     margin: 20px 0;
                     border-radius: 8px;
                     border-left: 4px solid #667eea;
-                }}
-                .footer {{
+                }
+                .footer {
                     background-color: #2c3e50;
                     color: white;
                     padding: 20px;
                     text-align: center;
                     font-size: 12px;
-                }}
-                @media (max-width: 600px) {{
-                    .tender-meta {{
+                }
+                @media (max-width: 600px) {
+                    .tender-meta {
                         grid-template-columns: 1fr;
-                    }}
-                    .tender-actions {{
+                    }
+                    .tender-actions {
                         flex-direction: column;
-                    }}
-                    .action-btn {{
+                    }
+                    .action-btn {
                         text-align: center;
-                    }}
-                }}
-            </style>
+                    }
+                }
+""")
+
+# Compiled once at import; rendering only substitutes the per-tender values
+_JINJA_ENV = jinja2.Environment(autoescape=True, enable_async=False)
+
+_RICH_EMAIL_TEMPLATE = _JINJA_ENV.from_string("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Tender Notification</title>
+            <style>""" + _RICH_EMAIL_CSS + """</style>
+        </head>
+        <body>
+            <div class="email-container">
+                <div class="header">
+                    <h1>New Tender Opportunity</h1>
+                    <div class="team-badge">{{ team_name }}</div>
+                </div>
+                
+                {% if urgency in ("URGENT", "HIGH") %}<div class='urgency-banner'>⚠️ {{ urgency }} DEADLINE</div>{% endif %}
+                
+                <div class="content">
+                    <h2 class="tender-title">{{ title }}</h2>
+                    
+                    <div class="section">
+                        <div class="section-title">📋 Overview</div>
+                        <p>{{ description }}</p>
+                    </div>
+                    
+                    <div class="section">
+                        <div class="section-title">📊 Key Details</div>
+                        <div class="detail-grid">
+                            <div class="detail-item">
+                                <div class="detail-label">Organization</div>
+                                <div class="detail-value">{{ organization }}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label">Deadline</div>
+                                <div class="detail-value">{{ deadline }}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label">Tender Value</div>
+                                <div class="detail-value">{{ tender_value }}</div>
+                            </div>
+                            <div class="detail-item">
+                                <div class="detail-label">Category</div>
+                                <div class="detail-value">{{ team_category|upper }}</div>
+                            </div>
+                        </div>
+                    </div>
+                    
+                    <div class="section">
+                        <div class="section-title">📝 Requirements</div>
+                        <div class="requirements">
+                            {% if requirements is string and '\\n' in requirements %}<ul>{% for req in requirements.split('\\n') if req.strip() %}<li>{{ req.strip() }}</li>{% endfor %}</ul>{% else %}<p>{{ requirements }}</p>{% endif %}
+                        </div>
+                    </div>
+                    
+                    <div class="section">
+                        <div class="section-title">📞 Contact Information</div>
+                        <div class="contact-card">
+                            <div class="contact-name">{{ person }}</div>
+                            <div class="contact-details">
+                                <strong>Organization:</strong> {{ organization }}<br>
+                                {% if phone %}<strong>Phone:</strong> {{ phone }}<br>{% endif %}
+                                {% if email %}<strong>Email:</strong> {{ email }}<br>{% endif %}
+                                {% if address %}<strong>Address:</strong> {{ address }}{% endif %}
+                            </div>
+                        </div>
+                    </div>
+                    
+                    {% if urgency in ("URGENT", "HIGH") %}<div class='deadline-warning'>⏰ ATTENTION: Deadline is {{ deadline }} - Immediate action required!</div>{% endif %}
+                    
+                    <div class="cta-section">
+                        <h3 style="margin-top: 0;">Next Steps</h3>
+                        <p>Review the full tender details and assess our capability to participate</p>
+                        <a href="{{ url }}" class="cta-button">📄 View Full Tender</a>
+                        <a href="mailto:{{ email or '' }}" class="cta-button">📧 Contact Issuer</a>
+                    </div>
+                </div>
+                
+                <div class="footer">
+                    <p>🤖 Automated notification from Tender Monitoring System v3.0</p>
+                    <p>Processed by Agent 1 (Extraction) → Agent 2 (Details) → Agent 3 (Email Composition)</p>
+                    <p>Generated: {{ generated_at }}</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+# Multi-tender digest; cards and the urgent list iterate over per-tender dicts,
+# every urgency-dependent string is chosen in Python and passed in flat
+_DIGEST_EMAIL_TEMPLATE = _JINJA_ENV.from_string("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Multiple Tender Opportunities</title>
+            <style>""" + _DIGEST_EMAIL_CSS + """</style>
         </head>
         <body>
             <div class="email-container">
+
                 <div class="header">
                     <h1>New Tender Opportunities</h1>
-                    <div class="subtitle">{team_name} - {len(tenders)} Opportunities Found</div>
+                    <div class="subtitle">{{ team_name }} - {{ tenders|length }} Opportunities Found</div>
                 </div>
                 
                 <div class="stats-bar">
                     <div class="stat-item">
-                        <span class="stat-number">{len(tenders)}</span>
+                        <span class="stat-number">{{ tenders|length }}</span>
                         <span class="stat-label">Total Tenders</span>
                     </div>
                     <div class="stat-item">
-                        <span class="stat-number">{len(urgent_tenders)}</span>
+                        <span class="stat-number">{{ urgent_tenders|length }}</span>
                         <span class="stat-label">Urgent Deadlines</span>
                     </div>
                     <div class="stat-item">
-                        <span class="stat-number">{team_category.upper()}</span>
+                        <span class="stat-number">{{ category_label }}</span>
                         <span class="stat-label">Category</span>
                     </div>
                 </div>
-                
-                {urgent_summary}
-                
+                {% if has_urgent %}
+                <div class="urgent-summary">
+                    <h3>⚠️ Urgent Deadlines Requiring Immediate Attention</h3>
+                    <ul>{% for t in urgent_tenders %}<li>#{{ t.i }}: {{ t.title }} (Due: {{ t.deadline }})</li>{% endfor %}</ul>
+                </div>
+                {% endif %}
                 <div class="content">
                     <div class="summary-section">
                         <h3>📋 Executive Summary</h3>
-                        <p>We've identified {len(tenders)} new tender opportunities that match your {team_category} criteria. 
-                        {'Several require immediate attention due to urgent deadlines.' if urgent_tenders else 'Please review each opportunity and assess our capability to participate.'}</p>
+                        <p>We've identified {{ tenders|length }} new tender opportunities that match your {{ team_category }} criteria. 
+                        {{ urgent_blurb }}</p>
                     </div>
-                    
-                    {tender_cards}
-                    
+                    {% for t in tenders %}
+                    <div class="tender-card">
+                        <div class="tender-header">
+                            <div class="tender-number">#{{ t.i }}</div>
+                            <div class="urgency-badge" style="background-color: {{ t.urgency_color }};">{{ t.urgency }}</div>
+                        </div>
+                        <h3 class="tender-title">{{ t.title }}</h3>
+                        <div class="tender-meta">
+                            <div class="meta-item">
+                                <span class="meta-label">Organization:</span>
+                                <span class="meta-value">{{ t.organization }}</span>
+                            </div>
+                            <div class="meta-item">
+                                <span class="meta-label">Deadline:</span>
+                                <span class="meta-value">{{ t.deadline }}</span>
+                            </div>
+                            <div class="meta-item">
+                                <span class="meta-label">Value:</span>
+                                <span class="meta-value">{{ t.tender_value }}</span>
+                            </div>
+                        </div>
+                        <div class="tender-description">
+                            {{ t.description }}
+                        </div>
+                        <div class="tender-actions">
+                            <a href="{{ t.url }}" class="action-btn primary">View Details</a>
+                            {% if t.email %}<a href='mailto:{{ t.email }}' class='action-btn secondary'>Contact</a>{% endif %}
+                        </div>
+                    </div>
+                    {% endfor %}
                     <div class="summary-section">
                         <h3>🎯 Recommended Next Steps</h3>
                         <ol>
-                            <li><strong>Immediate Review:</strong> {"Focus on urgent deadlines first" if urgent_tenders else "Review all opportunities systematically"}</li>
+                            <li><strong>Immediate Review:</strong> {{ next_steps_first }}</li>
                             <li><strong>Capability Assessment:</strong> Evaluate our qualifications against each tender's requirements</li>
                             <li><strong>Team Meeting:</strong> Schedule discussion to prioritize opportunities</li>
                             <li><strong>Proposal Planning:</strong> Begin preparation for selected tenders</li>
@@ -985,58 +671,964 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                 <div class="footer">
                     <p>🤖 Automated notification from Tender Monitoring System v3.0</p>
                     <p>Processed by Agent 1 (Extraction) → Agent 2 (Details) → Agent 3 (Email Composition)</p>
-                    <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                    <p>Generated: {{ generated_at }}</p>
                 </div>
             </div>
         </body>
         </html>
-        """
-    
-    def _create_simple_multi_tender_fallback(self, tenders: List[Dict[str, Any]], 
-                                           team_category: str) -> Dict[str, Any]:
-        """Simple fallback for multi-tender emails"""
-        team_name = "ESG Team" if team_category == "esg" else "Credit Rating Team"
-        
-        return {
-            'subject': f"New {team_category.upper()} Tenders - {len(tenders)} Found",
-            'priority': 'Medium',
-            'summary': f"We found {len(tenders)} new tender opportunities for the {team_name}.",
-            'tender_count': len(tenders),
-            'html_body': f"""
+        """)
+
+_DIGEST_FALLBACK_TEMPLATE = _JINJA_ENV.from_string("""
             <div style="font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto;">
-                <h2>New Tender Opportunities - {team_name}</h2>
-                <p>We found {len(tenders)} new tender(s) that match your criteria.</p>
-                
-                {''.join([f'''
+                <h2>New Tender Opportunities - {{ team_name }}</h2>
+                <p>We found {{ tenders|length }} new tender(s) that match your criteria.</p>
+                {% for tender in tenders %}
                 <div style="border: 1px solid #ddd; margin: 15px 0; padding: 15px; border-radius: 5px;">
-                    <h3>{tender.get('title', 'Untitled Tender')}</h3>
-                    <p><strong>Category:</strong> {team_category.upper()}</p>
-                    <p><a href="{tender.get('url', '#')}" style="color: #007bff;">View Tender Details</a></p>
+                    <h3>{{ tender.get('title', 'Untitled Tender') }}</h3>
+                    <p><strong>Category:</strong> {{ team_category|upper }}</p>
+                    <p><a href="{{ tender.get('url', '#') }}" style="color: #007bff;">View Tender Details</a></p>
                 </div>
-                ''' for tender in tenders])}
-                
+                {% endfor %}
                 <p>Please review these opportunities and assess our capability to participate.</p>
             </div>
-            """,
-            'generated_at': datetime.utcnow().isoformat(),
-            'team_category': team_category,
-            'agent_version': '3.0-fallback-multi'
-        }
+            """)
+
+# Compact digest: no <style> block, inline styles on a handful of elements only
+_COMPACT_DIGEST_TEMPLATE = _JINJA_ENV.from_string("""<!DOCTYPE html>
+<html><head><meta charset="UTF-8"><title>Multiple Tender Opportunities</title></head>
+<body style="font-family: Arial, sans-serif; color: #333; max-width: 700px; margin: 0 auto;">
+<h2 style="color: #1e3c72;">{{ team_name }} - {{ tenders|length }} Opportunities Found ({{ urgent_tenders|length }} urgent)</h2>
+<p>{{ urgent_blurb }}</p>
+{% for t in tenders %}<p style="border-left: 3px solid {{ t.urgency_color }}; padding-left: 8px;">
+<strong>#{{ t.i }} <a href="{{ t.url }}">{{ t.title }}</a></strong> [{{ t.urgency }}]<br>
+{{ t.organization }} | Deadline: {{ t.deadline }} | Value: {{ t.tender_value }}{% if t.email %} | <a href="mailto:{{ t.email }}">Contact</a>{% endif %}
+</p>
+{% endfor %}<p style="font-size: 12px; color: #666;">Tender Monitoring System v3.0 | Generated: {{ generated_at }}</p>
+</body></html>
+""")
+
+_DIGEST_TEMPLATES = {
+    'rich': _DIGEST_EMAIL_TEMPLATE,
+    'compact': _COMPACT_DIGEST_TEMPLATE
+}
+
+# Urgency-dependent digest text; digests without urgent tenders (the common case) reuse these as-is
+_URGENT_BLURB = "Several require immediate attention due to urgent deadlines."
+_URGENT_FIRST_STEP = "Focus on urgent deadlines first"
+_NO_URGENT_BLURB = "Please review each opportunity and assess our capability to participate."
+_NO_URGENT_FIRST_STEP = "Review all opportunities systematically"
+
+
+def _build_card(i: int, tender: Dict[str, Any], urgency: str) -> Dict[str, Any]:
+    """Flat render context for one digest card, reading each tender field once"""
+    detailed_info = tender.get('detailed_info', {})
     
-    async def compose_multiple_emails(self, tenders_with_details: List[Dict[str, Any]], 
-                                    team_category: str) -> List[Dict[str, Any]]:
-        """
-        Compose emails for multiple tenders - can be individual or digest format
+    # Parse contact info if string
+    contact_info = detailed_info.get('contact_info', {})
+    if isinstance(contact_info, str):
+        try:
+            contact_info = orjson.loads(contact_info)
+        except (orjson.JSONDecodeError, TypeError):
+            contact_info = {'organization': contact_info}
+    
+    description = detailed_info.get('detailed_description', tender.get('description', 'No description available'))
+    if len(description) > 200:
+        description = description[:200] + '...'
+    
+    return {
+        'i': i,
+        'urgent': urgency in ("URGENT", "HIGH"),
+        'urgency': urgency,
+        'urgency_color': _URGENCY_COLORS.get(urgency, "#6c757d"),
+        'title': tender.get('title', 'Untitled Tender'),
+        'organization': contact_info.get('organization', 'Not specified'),
+        'deadline': detailed_info.get('deadline', 'Not specified'),
+        'tender_value': detailed_info.get('tender_value', 'Not specified'),
+        'description': description,
+        'url': tender.get('url', '#'),
+        'email': contact_info.get('email')
+    }
+
+
+def iter_multi_tender(tenders: List[Dict[str, Any]], urgencies: List[str],
+                      team_name: str, team_category: str, generated_at: str,
+                      style: str = 'rich') -> Iterator[str]:
+    """
+    Yield the digest HTML in template-sized chunks for tenders with precomputed urgencies
+    
+    Pure and synchronous: no agent state, clock reads or I/O, so the async
+    composer entrypoints stay thin and the renderer can be profiled alone.
+    Consumers that write to a socket or SMTP stream can forward the chunks
+    without holding the whole document.
+    """
+    cards = [_build_card(i, tender, urgency) for i, (tender, urgency) in enumerate(zip(tenders, urgencies), 1)]
+    has_urgent = "URGENT" in urgencies or "HIGH" in urgencies
+    
+    # Branch once; only digests with urgent tenders pay for the filtered summary list
+    if has_urgent:
+        urgent_tenders = [card for card in cards if card['urgent']]
+        urgent_blurb = _URGENT_BLURB
+        next_steps_first = _URGENT_FIRST_STEP
+    else:
+        urgent_tenders = ()
+        urgent_blurb = _NO_URGENT_BLURB
+        next_steps_first = _NO_URGENT_FIRST_STEP
+    
+    yield from _DIGEST_TEMPLATES.get(style, _DIGEST_EMAIL_TEMPLATE).generate(
+        tenders=cards,
+        urgent_tenders=urgent_tenders,
+        has_urgent=has_urgent,
+        urgent_blurb=urgent_blurb,
+        next_steps_first=next_steps_first,
+        category_label=team_category.upper(),
+        team_name=team_name,
+        team_category=team_category,
+        generated_at=generated_at
+    )
+
+
+def render_multi_tender(tenders: List[Dict[str, Any]], urgencies: List[str],
+                        team_name: str, team_category: str, generated_at: str,
+                        style: str = 'rich') -> str:
+    """Render the digest HTML as a single string (joined once from iter_multi_tender)"""
+    return "".join(iter_multi_tender(tenders, urgencies, team_name, team_category, generated_at, style))
+
+
+def _text_entry(i: int, tender: Dict[str, Any], urgency: str) -> str:
+    """One plain-text digest entry; each field is read once into a local"""
+    title = tender.get('title', 'Untitled Tender')
+    deadline = tender.get('detailed_info', {}).get('deadline', 'Not specified')
+    url = tender.get('url', '#')
+    return f"#{i} [{urgency}] {title}\n    Deadline: {deadline}\n    {url}"
+
+
+def render_multi_tender_text(tenders: List[Dict[str, Any]], urgencies: List[str],
+                             team_name: str, generated_at: str) -> str:
+    """Plain-text alternative of the digest: title, deadline and link per tender"""
+    entries = "\n".join([
+        _text_entry(i, tender, urgency)
+        for i, (tender, urgency) in enumerate(zip(tenders, urgencies), 1)
+    ])
+    return f"{team_name} - {len(tenders)} new tender opportunities\n\n{entries}\n\nGenerated: {generated_at}"
+
+
+class EmailComposerAgent:
+    """
+    Agent 3: Compose rich, detailed emails with beautiful formatting
+    
+    Role:
+    - Take detailed tender information from Agent 2
+    - Create comprehensive, well-formatted emails
+    - Use modern CSS styling for professional appearance
+    - Handle multiple tenders efficiently
+    """
+    
+    def __init__(self):
+        # OpenAI SDK client on the shared connection pool; also used for the Batch API
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=_SHARED_HTTP)
+        
+        # Tenders composed per LLM call in compose_tender_emails_batch
+        self.email_batch_size = 5
+        
+        # Concurrent LLM calls, per-request timeout and retries for transient OpenAI errors
+        self.max_concurrency = settings.OPENAI_CONCURRENCY or 20
+        self.llm_timeout = 30.0
+        self.llm_max_attempts = 3
+        self.llm_max_backoff = 10
+        
+        # OpenAI Batch API (settings.USE_BATCH_API): status poll interval and the
+        # longest the notification path waits before cancelling, both in seconds
+        self.batch_poll_interval = 60
+        self.batch_max_wait = settings.BATCH_API_MAX_WAIT_SECONDS
+        
+        # Composed digests keyed by (team, day, style, tender ids), least recently used evicted first
+        self._digest_cache = OrderedDict()
+        self.digest_cache_size = 128
+    
+    async def compose_tender_email(self, tender_data: Dict[str, Any], 
+                                 detailed_info: Dict[str, Any], 
+                                 team_category: str) -> Dict[str, Any]:
         """
-        email_compositions = []
+        Compose rich, detailed email content for tender notification
         
-        logger.info(f"Agent 3: Composing emails for {len(tenders_with_details)} tenders for {team_category} team")
+        Renders the deterministic HTML template unless settings.USE_LLM_COMPOSER
+        is enabled, in which case the email is composed by the LLM.
         
-        # If multiple tenders, create a digest email instead of individual emails
-        if len(tenders_with_details) > 1:
-            logger.info(f"Agent 3: Creating digest email for {len(tenders_with_details)} tenders")
+        Args:
+            tender_data: Basic tender information from Agent 1
+            detailed_info: Detailed tender information from Agent 2
+            team_category: Target team category ("esg", "credit_rating", "both")
             
-            digest_email = await self.compose_multiple_tenders_email(tenders_with_details, team_category)
+        Returns:
+            Dictionary with comprehensive email content
+        """
+        try:
+            if not settings.USE_LLM_COMPOSER:
+                return self.compose_tender_email_fast(tender_data, detailed_info, team_category)
+            
+            logger.info(f"Agent 3: Composing detailed email for {team_category} team - {tender_data.get('title', 'Unknown')[:50]}...")
+            
+            # Static prompt first as the system message so OpenAI prompt caching applies
+            messages = [
+                {"role": "system", "content": self._build_detailed_email_prompt(team_category)},
+                {"role": "user", "content": self._build_email_request(tender_data, detailed_info, team_category)}
+            ]
+            
+            response_text = (await self._invoke_llm(messages)).strip()
+            
+            # Parse JSON response
+            email_content = self._parse_email_response(response_text)
+            
+            if email_content:
+                self._add_email_metadata(email_content, tender_data, team_category)
+                
+                logger.info(f"Agent 3: Successfully composed detailed email for {team_category} team")
+                return email_content
+            else:
+                logger.error(f"Agent 3: Failed to parse email response for {team_category} team")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Agent 3: Error composing email for {team_category} team: {e}")
+            return None
+    
+    def _build_email_request(self, tender_data: Dict[str, Any], detailed_info: Dict[str, Any],
+                             team_category: str) -> str:
+        """Build the tender-specific user message; the static prompt goes in the system message"""
+        payload = orjson.dumps(
+            {**self._tender_prompt_payload(tender_data, detailed_info), "team": team_category},
+            default=str
+        ).decode()
+        
+        return f"""{payload}
+
+"tender" is the basic listing and "details" the detailed information from Agent 2.
+Compose a comprehensive, well-formatted email for the {team_category.upper()} team.
+Include ALL available details and make it visually appealing with proper sections."""
+    
+    async def submit_batch_compose(self, tenders: List[Dict[str, Any]], team_category: str) -> Optional[str]:
+        """
+        Submit one email composition request per tender to the OpenAI Batch API
+        
+        Each request's custom_id is the tender's position in the list, so
+        poll_batch results map back with int(custom_id).
+        
+        Returns:
+            Batch ID, or None if submission failed
+        """
+        try:
+            lines = [
+                orjson.dumps({
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": settings.OPENAI_MODEL,
+                        "temperature": 0.1,
+                        "response_format": _EMAIL_RESPONSE_FORMAT,
+                        "messages": [
+                            {"role": "system", "content": self._build_detailed_email_prompt(team_category)},
+                            {
+                                "role": "user",
+                                "content": self._build_email_request(
+                                    tender, tender.get('detailed_info', {}), team_category
+                                )
+                            }
+                        ]
+                    }
+                })
+                for i, tender in enumerate(tenders)
+            ]
+            
+            input_file = await self.client.files.create(
+                file=("agent3_batch.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = await self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            
+            logger.info(f"Agent 3: Submitted batch {batch.id} with {len(lines)} {team_category} emails")
+            return batch.id
+            
+        except Exception as e:
+            logger.error(f"Agent 3: Failed to submit batch: {e}")
+            return None
+    
+    async def poll_batch(self, batch_id: str) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        Fetch the results of a Batch API composition job
+        
+        Returns:
+            Mapping of custom_id to parsed email content (None where parsing
+            failed), or None while the batch is still running, winding down or
+            couldn't be reached (transient API error). Expired and cancelled
+            batches return whatever requests completed; an empty mapping means
+            the batch ended without output.
+        """
+        try:
+            batch = await self.client.batches.retrieve(batch_id)
+            
+            # 'cancelling' is not terminal: completed requests still land in the output file
+            if batch.status in ('validating', 'in_progress', 'finalizing', 'cancelling'):
+                return None
+            
+            if batch.status in ('expired', 'cancelled'):
+                logger.warning(f"Agent 3: Batch {batch_id} {batch.status}, collecting its partial results")
+            elif batch.status != 'completed':
+                logger.error(f"Agent 3: Batch {batch_id} ended with status {batch.status}")
+                return {}
+            
+            if not batch.output_file_id:
+                logger.error(f"Agent 3: Batch {batch_id} ended ({batch.status}) without output")
+                return {}
+            
+            output = await self.client.files.content(batch.output_file_id)
+            
+        except (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError) as e:
+            # Keep polling: the batch (and what it cost) is still there
+            logger.warning(f"Agent 3: Transient error polling batch {batch_id}, retrying: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Agent 3: Failed to poll batch {batch_id}: {e}")
+            return {}
+        
+        results = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            # A bad line (e.g. a refusal with no content) only loses its own email
+            try:
+                record = orjson.loads(line)
+                body = (record.get('response') or {}).get('body') or {}
+                choices = body.get('choices') or []
+                
+                email_content = None
+                if choices and choices[0]['message'].get('content'):
+                    email_content = self._parse_email_response(choices[0]['message']['content'].strip())
+                results[record.get('custom_id')] = email_content
+            except Exception as e:
+                logger.error(f"Agent 3: Skipping unreadable line in batch {batch_id} output: {e}")
+        
+        logger.info(f"Agent 3: Batch {batch_id} returned {len(results)} emails")
+        return results
+    
+    async def _wait_for_batch(self, batch_id: str) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Poll a batch until it reaches a terminal status"""
+        while True:
+            polled = await self.poll_batch(batch_id)
+            if polled is not None:
+                return polled
+            await asyncio.sleep(self.batch_poll_interval)
+    
+    async def _compose_with_batch_api(self, tenders: List[Dict[str, Any]],
+                                      team_category: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Compose individual emails through the Batch API, waiting at most batch_max_wait
+        
+        A batch that isn't done in time is cancelled; tenders without a batch
+        result get the template email so notifications aren't held back.
+        """
+        batch_results: Dict[str, Optional[Dict[str, Any]]] = {}
+        
+        batch_id = await self.submit_batch_compose(tenders, team_category)
+        if batch_id:
+            try:
+                batch_results = await asyncio.wait_for(self._wait_for_batch(batch_id), self.batch_max_wait)
+            except asyncio.TimeoutError:
+                logger.warning(f"Agent 3: Batch {batch_id} not done after {self.batch_max_wait}s, cancelling")
+                try:
+                    await self.client.batches.cancel(batch_id)
+                except Exception as e:
+                    logger.error(f"Agent 3: Failed to cancel batch {batch_id}: {e}")
+        
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+        emails = []
+        for i, tender in enumerate(tenders):
+            email_content = batch_results.get(str(i))
+            if email_content:
+                self._add_email_metadata(email_content, tender, team_category, now_iso)
+            else:
+                email_content = self.compose_tender_email_fast(tender, tender.get('detailed_info', {}), team_category, now)
+            emails.append(email_content)
+        return emails
+    
+    async def compose_tender_emails_batch(self, tenders_with_details: List[Dict[str, Any]],
+                                          team_category: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Compose individual emails for several tenders with one LLM call per
+        email_batch_size tenders, sharing the composition prompt
+        
+        Returns:
+            One email content dict (or None) per tender, in input order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def _compose_chunk(chunk: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+            async with semaphore:
+                return await self._compose_email_chunk(chunk, team_category)
+        
+        chunks = [
+            tenders_with_details[start:start + self.email_batch_size]
+            for start in range(0, len(tenders_with_details), self.email_batch_size)
+        ]
+        chunk_emails = await asyncio.gather(*[_compose_chunk(chunk) for chunk in chunks])
+        emails = [email_content for batch_emails in chunk_emails for email_content in batch_emails]
+        
+        # Only tenders whose email is missing or invalid get their own call
+        missing = [i for i, email_content in enumerate(emails) if email_content is None]
+        if missing:
+            retried = await self.compose_many([
+                (tenders_with_details[i], tenders_with_details[i].get('detailed_info', {}), team_category)
+                for i in missing
+            ])
+            for i, email_content in zip(missing, retried):
+                emails[i] = email_content
+        
+        return emails
+    
+    async def compose_many(self, items: List[Tuple[Dict[str, Any], Dict[str, Any], str]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Compose individual emails concurrently, at most max_concurrency at a time
+        
+        Args:
+            items: (tender_data, detailed_info, team_category) tuples
+            
+        Returns:
+            One email content dict (or None) per item, in input order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def _compose(tender_data: Dict[str, Any], detailed_info: Dict[str, Any],
+                           team_category: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.compose_tender_email(tender_data, detailed_info, team_category)
+        
+        results = await asyncio.gather(*[_compose(*item) for item in items], return_exceptions=True)
+        
+        emails = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Agent 3: Error composing email: {result}")
+                emails.append(None)
+            else:
+                emails.append(result)
+        return emails
+    
+    async def _invoke_llm(self, messages: List[Dict[str, str]],
+                          response_format: Dict[str, Any] = _EMAIL_RESPONSE_FORMAT) -> str:
+        """
+        Call chat completions with a strict structured-output schema and return
+        the message content, retrying rate-limit, timeout, connection and 5xx
+        errors with jittered exponential backoff
+        """
+        for attempt in range(self.llm_max_attempts):
+            try:
+                response = await self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=messages,
+                    response_format=response_format,
+                    temperature=0.1,
+                    timeout=self.llm_timeout
+                )
+                usage = response.usage
+                cached_tokens = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', None)
+                if cached_tokens:
+                    logger.debug(f"Agent 3: {cached_tokens} of {usage.prompt_tokens} prompt tokens served from cache")
+                return response.choices[0].message.content or ""
+            except (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError) as e:
+                if attempt == self.llm_max_attempts - 1:
+                    raise
+                delay = min(2 ** attempt + random.uniform(0, 1), self.llm_max_backoff)
+                logger.warning(f"Agent 3: Transient OpenAI error, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    async def _compose_email_chunk(self, tenders: List[Dict[str, Any]],
+                                   team_category: str) -> List[Optional[Dict[str, Any]]]:
+        """Compose emails for a chunk of tenders in a single LLM call"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tenders)
+        
+        try:
+            logger.info(f"Agent 3: Composing {len(tenders)} emails in one call for {team_category} team")
+            
+            payload = orjson.dumps(
+                {
+                    "team": team_category,
+                    "tenders": [
+                        {"tender_index": i, **self._tender_prompt_payload(tender, tender.get('detailed_info', {}))}
+                        for i, tender in enumerate(tenders, 1)
+                    ]
+                },
+                default=str
+            ).decode()
+            
+            user_message = f"""{payload}
+
+Each entry's "tender" is the basic listing and "details" the detailed information from Agent 2.
+Compose a separate comprehensive, well-formatted email for EACH of the {len(tenders)} tenders
+for the {team_category.upper()} team, using only that tender's own information, and set each
+email's "tender_index" to the tender_index of the tender it is for."""
+            
+            messages = [
+                {"role": "system", "content": self._build_detailed_email_prompt(team_category)},
+                {"role": "user", "content": user_message}
+            ]
+            
+            parsed = self._load_json_response(await self._invoke_llm(messages, _EMAIL_BATCH_RESPONSE_FORMAT))
+            batch_emails = parsed.get('emails') if parsed else None
+            
+            if not isinstance(batch_emails, list):
+                logger.warning(f"Agent 3: Batched email response unusable for {len(tenders)} tenders")
+                return results
+            
+            now_iso = datetime.now(timezone.utc).isoformat()
+            for position, email_content in enumerate(batch_emails, 1):
+                if not self._is_valid_email_content(email_content):
+                    continue
+                index = email_content.pop('tender_index', position)
+                if not isinstance(index, int) or not 1 <= index <= len(tenders):
+                    continue
+                self._add_email_metadata(email_content, tenders[index - 1], team_category, now_iso)
+                results[index - 1] = email_content
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Agent 3: Error composing batched emails for {team_category} team: {e}")
+            return results
+    
+    def _tender_prompt_payload(self, tender_data: Dict[str, Any], detailed_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact basic and detailed tender fields for the composition prompt, empty ones omitted"""
+        return {
+            "tender": {key: value for key in _TENDER_PROMPT_KEYS if (value := tender_data.get(key))},
+            "details": {key: value for key in _DETAIL_PROMPT_KEYS if (value := detailed_info.get(key))}
+        }
+    
+    def _add_email_metadata(self, email_content: Dict[str, Any], tender_data: Dict[str, Any],
+                            team_category: str, now_iso: Optional[str] = None) -> None:
+        """Add composition metadata to an LLM-composed email"""
+        email_content['generated_at'] = now_iso or datetime.now(timezone.utc).isoformat()
+        email_content['team_category'] = team_category
+        email_content['tender_id'] = tender_data.get('id')
+        email_content['agent_version'] = '3.0-enhanced'
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _build_detailed_email_prompt(team_category: str) -> str:
+        """Build a comprehensive email composition prompt (identical per team, so memoized)"""
+        team_name = _TEAM_NAMES.get(team_category, "Credit Rating Team")
+        
+        return f"""You are composing a comprehensive, professional email notification for the {team_name}.
+
+REQUIREMENTS:
+=============
+1. Use ALL available detailed information from Agent 2
+2. Create a visually appealing, well-structured email
+3. Include modern CSS styling for professional appearance
+4. Make it comprehensive but scannable
+5. Use clear sections and proper formatting
+6. Include all contact details, requirements, deadlines
+7. Make it actionable with clear next steps
+
+EMAIL STRUCTURE:
+================
+Compose a detailed email with this structure:
+
+{{
+  "subject": "Clear, informative subject line including key details",
+  "priority": "High|Medium|Low (based on deadline urgency)",
+  "summary": "2-3 sentence executive summary of the opportunity",
+  "tender_details": {{
+    "title": "Full tender title",
+    "organization": "Issuing organization",
+    "deadline": "Deadline with urgency assessment",
+    "value": "Tender value/budget if available",
+    "scope": "What exactly they need",
+    "requirements": "Key requirements and qualifications"
+  }},
+  "contact_info": {{
+    "organization": "Contact organization",
+    "person": "Contact person name",
+    "phone": "Phone number",
+    "email": "Email address",
+    "address": "Address if available"
+  }},
+  "next_steps": "Clear action items for the team",
+  "html_body": "Complete HTML email with modern CSS styling and all details"
+}}
+
+CSS STYLING REQUIREMENTS:
+=========================
+- Modern, professional design
+- Clean typography with good readability
+- Color-coded sections for easy scanning
+- Responsive design that works on mobile
+- Clear visual hierarchy
+- Action buttons with hover effects
+- Professional color scheme (blues, grays, whites)
+
+CONTENT REQUIREMENTS:
+====================
+- Include ALL detailed information from Agent 2
+- Show complete requirements list
+- Display full contact information
+- Include deadline with urgency indicator
+- Show tender value/budget if available
+- Add clear call-to-action buttons
+- Include all relevant dates and timelines
+
+TONE AND STYLE:
+===============
+- Professional but engaging
+- Clear and direct communication
+- Well-organized information hierarchy
+- Emphasis on actionable next steps
+- Include urgency indicators where appropriate
+
+HTML STRUCTURE REQUIREMENTS:
+============================
+- Header section with tender title and category
+- Executive summary section
+- Detailed tender information section
+- Requirements section with bullet points
+- Contact information section
+- Timeline/deadline section with urgency
+- Next steps section with action buttons
+- Footer with system information
+
+Use modern HTML/CSS practices and ensure the email looks professional in all email clients."""
+    
+    def _parse_email_response(self, response_text: str) -> Optional[Dict[str, Any]]:
+        """Parse detailed email JSON response"""
+        email_content = self._load_json_response(response_text)
+        
+        if email_content is None:
+            return None
+        
+        missing = _REQUIRED_FIELDS - email_content.keys()
+        if missing:
+            logger.warning(f"Missing required fields in email response: {', '.join(sorted(missing))}")
+            return None
+        
+        return email_content
+    
+    def _load_json_response(self, response_text: str) -> Optional[Dict[str, Any]]:
+        """Parse the JSON object of a structured-output LLM response"""
+        try:
+            parsed = orjson.loads(response_text)
+            
+            if not isinstance(parsed, dict):
+                logger.warning("Email response is not a dictionary")
+                return None
+            
+            return parsed
+            
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Failed to parse email JSON response: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error parsing email response: {e}")
+            return None
+    
+    def _is_valid_email_content(self, email_content: Any) -> bool:
+        """Check that a composed email has the fields the sender needs"""
+        return type(email_content) is dict and not _REQUIRED_FIELDS - email_content.keys()
+    
+    def compose_tender_email_fast(self, tender_data: Dict[str, Any], 
+                                  detailed_info: Dict[str, Any], 
+                                  team_category: str,
+                                  now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Compose a detailed email from the rich HTML template, without an LLM call
+        
+        Batch callers pass one UTC `now` so the clock is read once per batch.
+        """
+        now = now or datetime.now(timezone.utc)
+        team_name = _TEAM_NAMES.get(team_category, "Credit Rating Team")
+        title = tender_data.get('title', 'New Tender Opportunity')
+        
+        # Extract key details
+        deadline = detailed_info.get('deadline', 'Not specified')
+        contact_info = detailed_info.get('contact_info', {})
+        requirements = detailed_info.get('requirements', 'See tender details')
+        tender_value = detailed_info.get('tender_value', 'Not specified')
+        description = detailed_info.get('detailed_description', tender_data.get('description'))
+        
+        # Parse contact info if it's a JSON string
+        if isinstance(contact_info, str):
+            try:
+                contact_info = orjson.loads(contact_info)
+            except (orjson.JSONDecodeError, TypeError):
+                contact_info = {'organization': contact_info}
+        
+        # Determine urgency
+        urgency = self._assess_deadline_urgency(deadline, now.astimezone().date())
+        priority = "High" if urgency == "URGENT" else "Medium"
+        
+        return {
+            'subject': f"New {team_category.upper()} Tender: {title[:40]}..." + (" [URGENT]" if urgency == "URGENT" else ""),
+            'priority': priority,
+            'summary': f"A new {team_category} tender opportunity has been identified that requires immediate attention from the {team_name}.",
+            'tender_details': {
+                'title': title,
+                'organization': contact_info.get('organization', 'Not specified'),
+                'deadline': deadline,
+                'value': tender_value,
+                'scope': description if description is not None else 'See tender details',
+                'requirements': requirements
+            },
+            'contact_info': contact_info,
+            'next_steps': 'Review tender details, assess our capabilities, and prepare proposal if suitable.',
+            'html_body': self._create_rich_html_template(
+                title, team_name, team_category, tender_data, contact_info, urgency,
+                deadline, requirements, tender_value, description, now
+            ),
+            'generated_at': now.isoformat(),
+            'team_category': team_category,
+            'tender_id': tender_data.get('id'),
+            'agent_version': '3.0-enhanced-template'
+        }
+    
+    def _assess_deadline_urgency(self, deadline_str: str, today: Optional[date] = None) -> str:
+        """Assess deadline urgency"""
+        if not isinstance(deadline_str, str):
+            return "NORMAL"
+        return self._deadline_urgency(deadline_str, today or date.today())
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _deadline_urgency(deadline_str: str, today: date) -> str:
+        """Urgency of a deadline string relative to today; keyed on both so the cache never goes stale"""
+        # Anything shorter than YYYY-MM-DD (incl. '' and 'Not specified') can't be a date
+        if len(deadline_str) < 10:
+            return "NORMAL"
+        
+        try:
+            # Deadlines are normalized to YYYY-MM-DD by Agent 2
+            deadline = date.fromisoformat(deadline_str[:10])
+        except ValueError:
+            return "NORMAL"
+        
+        days_left = (deadline - today).days
+        if days_left <= 3:
+            return "URGENT"
+        elif days_left <= 7:
+            return "HIGH"
+        elif days_left <= 14:
+            return "MEDIUM"
+        else:
+            return "NORMAL"
+    
+    def _create_rich_html_template(self, title: str, team_name: str, team_category: str, 
+                                 tender_data: Dict[str, Any], contact_info: Dict[str, Any], urgency: str,
+                                 deadline: str, requirements: str, tender_value: str,
+                                 description: Optional[str], now: Optional[datetime] = None) -> str:
+        """Render the rich HTML email template from fields the caller already extracted"""
+        description = description or ''
+        if len(description) > 300:
+            description = description[:300] + '...'
+        
+        # Each contact field is read once and passed as a plain template variable
+        return _RICH_EMAIL_TEMPLATE.render({
+            'title': title,
+            'team_name': team_name,
+            'team_category': team_category,
+            'urgency': urgency,
+            'urgency_color': _URGENCY_COLORS.get(urgency, "#6c757d"),
+            'description': description,
+            'deadline': deadline,
+            'requirements': requirements,
+            'tender_value': tender_value,
+            'organization': contact_info.get('organization', 'Not specified'),
+            'person': contact_info.get('contact_person', 'Contact Person Not Specified'),
+            'phone': contact_info.get('phone'),
+            'email': contact_info.get('email'),
+            'address': contact_info.get('address'),
+            'url': tender_data.get('url', '#'),
+            'generated_at': (now or datetime.now(timezone.utc)).astimezone().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    
+    async def compose_multiple_tenders_email(self, tenders_with_details: List[Dict[str, Any]], 
+                                           team_category: str) -> Dict[str, Any]:
+        """
+        Compose a single email with multiple tenders (digest format)
+        """
+        try:
+            logger.info(f"Agent 3: Composing multi-tender email for {team_category} team with {len(tenders_with_details)} tenders")
+            
+            team_name = _TEAM_NAMES.get(team_category, "Credit Rating Team")
+            
+            # Create comprehensive multi-tender email
+            subject = f"New {team_category.upper()} Tenders - {len(tenders_with_details)} Opportunities Found"
+            
+            # Read the clock and assess each deadline once for the whole digest
+            now = datetime.now(timezone.utc)
+            today = now.astimezone().date()
+            
+            # Same tenders for the same team on the same day render the same digest
+            cache_key = self._digest_cache_key(tenders_with_details, team_category, today)
+            if cache_key is not None and cache_key in self._digest_cache:
+                self._digest_cache.move_to_end(cache_key)
+                logger.debug(f"Agent 3: Reusing cached digest for {team_category} team")
+                return dict(self._digest_cache[cache_key])
+            
+            urgencies = [
+                self._assess_deadline_urgency(tender.get('detailed_info', {}).get('deadline', ''), today)
+                for tender in tenders_with_details
+            ]
+            
+            html_body = self._create_multi_tender_html(
+                tenders_with_details, team_name, team_category, urgencies, now, settings.EMAIL_STYLE
+            )
+            text_body = render_multi_tender_text(
+                tenders_with_details, urgencies, team_name, now.astimezone().strftime('%Y-%m-%d %H:%M:%S')
+            )
+            
+            email_content = {
+                'subject': subject,
+                'priority': self._assess_multi_tender_priority(tenders_with_details, urgencies),
+                'summary': f"We found {len(tenders_with_details)} new {team_category} tender opportunities that match your criteria and require immediate review.",
+                'tender_count': len(tenders_with_details),
+                'html_body': html_body,
+                'text_body': text_body,
+                'generated_at': now.isoformat(),
+                'team_category': team_category,
+                'agent_version': '3.0-enhanced-multi'
+            }
+            
+            if cache_key is not None:
+                self._digest_cache[cache_key] = email_content
+                if len(self._digest_cache) > self.digest_cache_size:
+                    self._digest_cache.popitem(last=False)
+            
+            return dict(email_content)
+            
+        except Exception as e:
+            logger.error(f"Agent 3: Error composing multi-tender email: {e}")
+            return self._create_simple_multi_tender_fallback(tenders_with_details, team_category)
+    
+    @staticmethod
+    def _digest_cache_key(tenders: List[Dict[str, Any]], team_category: str, today: date) -> Optional[tuple]:
+        """Hashable digest cache key from tender identifiers only; None if any tender has no id or url"""
+        identifiers = []
+        for tender in tenders:
+            identifier = tender.get('id') or tender.get('url')
+            if not identifier:
+                return None
+            identifiers.append(str(identifier))
+        # Input order, not sorted: card numbering follows it, so a reordered list is a different email
+        return (team_category, today, settings.EMAIL_STYLE, tuple(identifiers))
+    
+    def _assess_multi_tender_priority(self, tenders: List[Dict[str, Any]],
+                                      urgencies: Optional[List[str]] = None) -> str:
+        """Assess priority for multiple tenders based on deadlines"""
+        urgent_count = 0
+        high_count = 0
+        
+        if urgencies is None:
+            today = date.today()
+            urgencies = [
+                self._assess_deadline_urgency(tender.get('detailed_info', {}).get('deadline', ''), today)
+                for tender in tenders
+            ]
+        
+        for urgency in urgencies:
+            if urgency == "URGENT":
+                urgent_count += 1
+            elif urgency == "HIGH":
+                high_count += 1
+        
+        if urgent_count > 0:
+            return "High"
+        elif high_count > 0:
+            return "Medium"
+        else:
+            return "Medium"
+    
+    def _create_multi_tender_html(self, tenders: List[Dict[str, Any]], 
+                                team_name: str, team_category: str,
+                                urgencies: Optional[List[str]] = None,
+                                now: Optional[datetime] = None,
+                                style: str = 'rich') -> str:
+        """Create HTML for multiple tenders email ('rich' or minimal-CSS 'compact' style)"""
+        
+        generated_str = (now or datetime.now(timezone.utc)).astimezone().strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Read today's date once for the whole digest when urgencies aren't supplied
+        if urgencies is None:
+            today = date.today()
+            urgencies = [
+                self._assess_deadline_urgency(tender.get('detailed_info', {}).get('deadline', 'Not specified'), today)
+                for tender in tenders
+            ]
+        
+        return render_multi_tender(tenders, urgencies, team_name, team_category, generated_str, style)
+    
+    def _create_simple_multi_tender_fallback(self, tenders: List[Dict[str, Any]], 
+                                           team_category: str) -> Dict[str, Any]:
+        """Simple fallback for multi-tender emails"""
+        team_name = _TEAM_NAMES.get(team_category, "Credit Rating Team")
+        
+        return {
+            'subject': f"New {team_category.upper()} Tenders - {len(tenders)} Found",
+            'priority': 'Medium',
+            'summary': f"We found {len(tenders)} new tender opportunities for the {team_name}.",
+            'tender_count': len(tenders),
+            'html_body': _DIGEST_FALLBACK_TEMPLATE.render(
+                tenders=tenders, team_name=team_name, team_category=team_category
+            ),
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'team_category': team_category,
+            'agent_version': '3.0-fallback-multi'
+        }
+    
+    async def compose_multiple_emails(self, tenders_with_details: List[Dict[str, Any]], 
+                                    team_category: str,
+                                    digest: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Compose emails for multiple tenders - can be individual or digest format
+        
+        With digest=False (default: settings.EMAIL_DIGEST), multiple tenders get
+        individual emails instead of one digest. These are rendered from the HTML template unless
+        settings.USE_LLM_COMPOSER is enabled, in which case they are composed in
+        batched LLM calls, or through the OpenAI Batch API when
+        settings.USE_BATCH_API is also enabled.
+        """
+        email_compositions = []
+        
+        if digest is None:
+            digest = settings.EMAIL_DIGEST
+        
+        logger.info(f"Agent 3: Composing emails for {len(tenders_with_details)} tenders for {team_category} team")
+        
+        # If multiple tenders, create a digest email instead of individual emails
+        if len(tenders_with_details) > 1 and not digest:
+            if not settings.USE_LLM_COMPOSER:
+                now = datetime.now(timezone.utc)
+                emails = [
+                    self.compose_tender_email_fast(tender_data, tender_data.get('detailed_info', {}), team_category, now)
+                    for tender_data in tenders_with_details
+                ]
+            elif settings.USE_BATCH_API:
+                emails = await self._compose_with_batch_api(tenders_with_details, team_category)
+            else:
+                emails = await self.compose_tender_emails_batch(tenders_with_details, team_category)
+            
+            for tender_data, email_content in zip(tenders_with_details, emails):
+                if email_content:
+                    email_compositions.append({
+                        'tender_data': tender_data,
+                        'email_content': email_content,
+                        'composition_status': 'success',
+                        'email_type': 'individual'
+                    })
+        elif len(tenders_with_details) > 1:
+            logger.info(f"Agent 3: Creating digest email for {len(tenders_with_details)} tenders")
+            
+            digest_email = await self.compose_multiple_tenders_email(tenders_with_details, team_category)
             
             if digest_email:
                 email_compositions.append({
@@ -1046,28 +1638,20 @@ Use modern HTML/CSS practices and ensure the email looks professional in all ema
                     'email_type': 'digest'
                 })
         else:
-            # Single tender - create individual email
-            for tender_data in tenders_with_details:
-                try:
-                    detailed_info = tender_data.get('detailed_info', {})
-                    
-                    email_content = await self.compose_tender_email(
-                        tender_data=tender_data,
-                        detailed_info=detailed_info,
-                        team_category=team_category
-                    )
-                    
-                    if email_content:
-                        email_compositions.append({
-                            'tender_data': tender_data,
-                            'email_content': email_content,
-                            'composition_status': 'success',
-                            'email_type': 'individual'
-                        })
-                        
-                except Exception as e:
-                    logger.error(f"Agent 3: Error composing individual email: {e}")
-                    continue
+            # Single tender - individual email, through the same bounded gather as batches
+            emails = await self.compose_many([
+                (tender_data, tender_data.get('detailed_info', {}), team_category)
+                for tender_data in tenders_with_details
+            ])
+            
+            for tender_data, email_content in zip(tenders_with_details, emails):
+                if email_content:
+                    email_compositions.append({
+                        'tender_data': tender_data,
+                        'email_content': email_content,
+                        'composition_status': 'success',
+                        'email_type': 'individual'
+                    })
         
         logger.info(f"Agent 3: Completed enhanced email composition - {len(email_compositions)} emails created")
         return email_compositions
\ No newline at end of file
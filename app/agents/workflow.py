@@ -3,7 +3,7 @@ Updated Workflow Configuration with Date Filtering Options
 Supports both filtered and unfiltered tender extraction
 """
 import logging
-from typing import Dict, List, Any, TypedDict
+from typing import Dict, List, Any, Optional, TypedDict
 from langgraph.graph import StateGraph, END, START
 from datetime import datetime
 
@@ -26,6 +26,8 @@ class WorkflowState(TypedDict):
     # NEW: Date filtering options
     enable_date_filtering: bool  # Whether to apply date filtering
     include_all_for_db1: bool   # Save all to DB1, filter for Agent 2
+    precomputed_tenders: Optional[List[Dict[str, Any]]]  # Strict Agent 1 result from a batched call
+    precomputed_all_tenders: Optional[List[Dict[str, Any]]]  # Unfiltered Agent 1 result from a batched call
     
     # Agent 1 Output
     extracted_tenders: List[Dict[str, Any]]  # Raw tenders from Agent 1
@@ -98,20 +100,27 @@ class TenderAgent:
             logger.info(f"Date filtering: {'ENABLED' if state.get('enable_date_filtering', True) else 'DISABLED'}")
             
             # Extract all tenders first (for "All Tenders" view)
-            all_tenders = await self.agent1.extract_and_categorize_tenders(
-                page_content=state['page_content'],
-                esg_keywords=state['esg_keywords'],
-                credit_keywords=state['credit_keywords'],
-                include_all_tenders=True  # Get everything first
-            )
+            if state.get('precomputed_all_tenders') is not None:
+                all_tenders = state['precomputed_all_tenders']  # Already extracted in a batch
+            else:
+                all_tenders = await self.agent1.extract_and_categorize_tenders(
+                    page_content=state['page_content'],
+                    esg_keywords=state['esg_keywords'],
+                    credit_keywords=state['credit_keywords'],
+                    include_all_tenders=True,  # Get everything first
+                    page_url=state['page_url']
+                )
             
             # Apply date filtering if enabled
-            if state.get('enable_date_filtering', True):
+            if state.get('enable_date_filtering', True) and state.get('precomputed_tenders') is not None:
+                filtered_tenders = state['precomputed_tenders']  # Already extracted in a batch
+            elif state.get('enable_date_filtering', True):
                 filtered_tenders = await self.agent1.extract_and_categorize_tenders(
                     page_content=state['page_content'],
                     esg_keywords=state['esg_keywords'],
                     credit_keywords=state['credit_keywords'],
-                    include_all_tenders=False  # Apply date filtering
+                    include_all_tenders=False,  # Apply date filtering
+                    page_url=state['page_url']
                 )
             else:
                 filtered_tenders = all_tenders  # No filtering
@@ -391,7 +400,9 @@ class TenderAgent:
                           esg_keywords: List[str], credit_keywords: List[str],
                           tender_repo=None, db=None, 
                           enable_date_filtering: bool = True,
-                          include_all_for_db1: bool = False) -> Dict[str, Any]:
+                          include_all_for_db1: bool = False,
+                          agent1_tenders: Optional[List[Dict[str, Any]]] = None,
+                          agent1_all_tenders: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Process a page through the enhanced pipeline with configurable date filtering
         
@@ -405,6 +416,8 @@ class TenderAgent:
             db: Database session
             enable_date_filtering: Whether to apply date filtering
             include_all_for_db1: Whether to save all tenders to DB1 but filter for Agent 2
+            agent1_tenders: Strict Agent 1 result from extract_many, if already computed
+            agent1_all_tenders: Unfiltered Agent 1 result from extract_many, if already computed
             
         Returns:
             Dict with processing results
@@ -422,6 +435,8 @@ class TenderAgent:
             # Date filtering configuration
             'enable_date_filtering': enable_date_filtering,
             'include_all_for_db1': include_all_for_db1,
+            'precomputed_tenders': agent1_tenders,
+            'precomputed_all_tenders': agent1_all_tenders,
             
             # Initialize empty results
             'extracted_tenders': [],
@@ -23,6 +23,14 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
     OPENAI_MODEL: str = Field(default="gpt-4o-mini", env="OPENAI_MODEL")
+    LLM_CACHE_TTL_HOURS: int = Field(default=24, env="LLM_CACHE_TTL_HOURS")
+    OPENAI_RPM: int = Field(default=500, env="OPENAI_RPM")
+    OPENAI_CONCURRENCY: int = Field(default=20, env="OPENAI_CONCURRENCY")
+    USE_BATCH_API: bool = Field(default=False, env="USE_BATCH_API")
+    BATCH_API_MAX_WAIT_SECONDS: int = Field(default=900, env="BATCH_API_MAX_WAIT_SECONDS")
+    USE_LLM_COMPOSER: bool = Field(default=False, env="USE_LLM_COMPOSER")
+    EMAIL_DIGEST: bool = Field(default=True, env="EMAIL_DIGEST")
+    EMAIL_STYLE: str = Field(default="rich", env="EMAIL_STYLE")  # "rich" or "compact"
     
     # Email Configuration
     SMTP_HOST: str = Field(default="smtp.gmail.com", env="SMTP_HOST")
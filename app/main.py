@@ -11,6 +11,7 @@ from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
 from app.core.database import create_tables
+from app.agents.agent3 import close_http_client
 from app.services.scheduler import TenderScheduler
 from app.api.main import api_router
 
@@ -39,6 +40,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down Tender Monitoring System...")
     if scheduler:
         await scheduler.stop()
+    await close_http_client()
     logger.info("Shutdown complete")
 
 # Create FastAPI app
@@ -5,6 +5,7 @@ from .tender import Tender, DetailedTender
 from .keyword import Keyword
 from .crawl_log import CrawlLog
 from .email_settings import EmailNotificationSettings, EmailNotificationLog
+from .llm_cache import LLMResponseCache
 
 __all__ = [
     'MonitoredPage',
@@ -13,5 +14,6 @@ __all__ = [
     'Keyword',
     'CrawlLog',
     'EmailNotificationSettings',
-    'EmailNotificationLog'
+    'EmailNotificationLog',
+    'LLMResponseCache'
 ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+LLM Response Cache Database Model
+"""
+from sqlalchemy import Column, String, DateTime, Text
+from datetime import datetime
+
+from app.core.database import Base
+
+class LLMResponseCache(Base):
+    """Raw LLM responses keyed by a hash of the model and prompt"""
+    __tablename__ = "llm_response_cache"
+    
+    key = Column(String(64), primary_key=True)  # sha256 hex digest
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<LLMResponseCache(key='{self.key[:12]}...', created_at={self.created_at})>"
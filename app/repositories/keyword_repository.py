@@ -2,7 +2,7 @@
 Keyword Repository
 Database operations for keyword management
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from app.models.keyword import Keyword
@@ -18,6 +18,14 @@ class KeywordRepository:
         ).all()
         return [k.keyword for k in keywords]
     
+    def get_active_keyword_map(self, db: Session) -> Dict[str, Keyword]:
+        """Get active ESG and credit rating keywords keyed by lowercased keyword"""
+        keywords = db.query(Keyword).filter(
+            Keyword.category.in_(["esg", "credit_rating"]),
+            Keyword.is_active == True
+        ).all()
+        return {k.keyword.lower(): k for k in keywords}
+    
     def get_all_keywords(self, db: Session) -> List[Keyword]:
         """Get all keywords"""
         return db.query(Keyword).all()
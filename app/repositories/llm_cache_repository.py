@@ -0,0 +1,26 @@
+"""
+LLM Cache Repository
+Database operations for cached LLM responses
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.models.llm_cache import LLMResponseCache
+
+class LLMCacheRepository:
+    """Repository for cached LLM response operations"""
+    
+    def get_response(self, db: Session, key: str, max_age_hours: int) -> Optional[str]:
+        """Get a cached response that is not older than max_age_hours"""
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        entry = db.query(LLMResponseCache).filter(
+            LLMResponseCache.key == key,
+            LLMResponseCache.created_at >= cutoff
+        ).first()
+        return entry.response if entry else None
+    
+    def save_response(self, db: Session, key: str, response: str) -> None:
+        """Save or refresh a cached response"""
+        db.merge(LLMResponseCache(key=key, response=response, created_at=datetime.utcnow()))
+        db.commit()
@@ -1,11 +1,11 @@
 """
 Enhanced Tender Repository with Keyword Tracking
 """
-import json
+import orjson
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, text
+from sqlalchemy import and_, or_, text, update
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +13,12 @@ logger = logging.getLogger(__name__)
 from app.models.tender import Tender, DetailedTender
 from app.models.keyword import Keyword
 
+
+def _dumps(obj: Any) -> str:
+    """Serialize structured tender data for a JSON text column"""
+    return orjson.dumps(obj, default=str).decode()
+
+
 class TenderRepository:
     """Enhanced repository for tender database operations with keyword tracking"""
     
@@ -48,7 +54,7 @@ class TenderRepository:
                 category=category,
                 description=description,
                 page_id=page_id,
-                matched_keywords_json=json.dumps(matched_keywords or []),
+                matched_keywords_json=_dumps(matched_keywords or []),
                 keyword_count=keyword_count
             )
             
@@ -77,31 +83,45 @@ class TenderRepository:
             all_keywords = db.query(Keyword).filter(Keyword.is_active == True).all()
             keyword_map = {kw.keyword.lower(): kw for kw in all_keywords}
             
+            keyword_ids = []
             for keyword_str in matched_keywords:
-                keyword_lower = keyword_str.lower()
-                if keyword_lower in keyword_map:
-                    keyword_obj = keyword_map[keyword_lower]
-                    
-                    # Create association using raw SQL (more reliable for association tables)
-                    db.execute(text("""
-                        INSERT OR IGNORE INTO tender_keywords (tender_id, keyword_id, created_at)
-                        VALUES (:tender_id, :keyword_id, :created_at)
-                    """), {
-                        'tender_id': tender_id,
-                        'keyword_id': keyword_obj.id,
-                        'created_at': datetime.utcnow()
-                    })
-                    
-                    # Update keyword usage statistics
-                    keyword_obj.increment_usage()
-                    
+                keyword_obj = keyword_map.get(keyword_str.lower())
+                if keyword_obj:
+                    keyword_ids.append(keyword_obj.id)
                     logger.debug(f"Associated tender {tender_id} with keyword '{keyword_str}'")
                 else:
                     logger.warning(f"Keyword '{keyword_str}' not found in database")
             
+            # Insert associations and update keyword usage statistics in bulk
+            self.add_keyword_matches(db, tender_id, keyword_ids)
+            
         except Exception as e:
             logger.error(f"Error saving keyword associations: {e}")
     
+    def add_keyword_matches(self, db: Session, tender_id: int, keyword_ids: List[int]):
+        """Associate a tender with matched keywords and bump their usage in two statements (caller commits)"""
+        keyword_ids = list(dict.fromkeys(keyword_ids))
+        if not keyword_ids:
+            return
+        
+        now = datetime.utcnow()
+        # One executemany for all association rows
+        db.execute(text("""
+            INSERT OR IGNORE INTO tender_keywords (tender_id, keyword_id, created_at)
+            VALUES (:tender_id, :keyword_id, :created_at)
+        """), [
+            {'tender_id': tender_id, 'keyword_id': keyword_id, 'created_at': now}
+            for keyword_id in keyword_ids
+        ])
+        
+        # One UPDATE for the usage statistics (same fields as Keyword.increment_usage)
+        db.execute(
+            update(Keyword)
+            .where(Keyword.id.in_(keyword_ids))
+            .values(usage_count=Keyword.usage_count + 1, last_used=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    
     def save_detailed_tender(self, db: Session, tender_id: int, detailed_info: Dict[str, Any]) -> Optional[DetailedTender]:
         """Save detailed tender information with enhanced data handling"""
         try:
@@ -130,7 +150,7 @@ class TenderRepository:
             # Handle contact_info
             contact_info = detailed_info.get('contact_info')
             if isinstance(contact_info, dict):
-                contact_info_str = json.dumps(contact_info)
+                contact_info_str = _dumps(contact_info)
             elif contact_info:
                 contact_info_str = str(contact_info)
             else:
@@ -139,7 +159,7 @@ class TenderRepository:
             # Handle date validation information
             date_validation = detailed_info.get('date_validation')
             if date_validation:
-                date_validation_str = json.dumps(date_validation)
+                date_validation_str = _dumps(date_validation)
             else:
                 date_validation_str = None
             
@@ -196,7 +216,7 @@ class TenderRepository:
             if detailed_info.get('contact_info'):
                 contact_info = detailed_info['contact_info']
                 if isinstance(contact_info, dict):
-                    existing.contact_info = json.dumps(contact_info)
+                    existing.contact_info = _dumps(contact_info)
                 else:
                     existing.contact_info = str(contact_info)
             
@@ -211,7 +231,7 @@ class TenderRepository:
             
             # Handle date validation
             if detailed_info.get('date_validation'):
-                existing.date_validation = json.dumps(detailed_info['date_validation'])
+                existing.date_validation = _dumps(detailed_info['date_validation'])
             
             existing.updated_at = datetime.utcnow()
             existing.processed_at = datetime.utcnow()
@@ -265,15 +285,16 @@ class TenderRepository:
         """Get tenders that match specific keywords"""
         # Convert to JSON search (for SQLite compatibility)
         tenders = []
+        wanted = {kw.lower() for kw in keywords}
         for tender in db.query(Tender).limit(limit * 2).all():  # Get more to filter
             if tender.matched_keywords_json:
                 try:
-                    tender_keywords = json.loads(tender.matched_keywords_json)
-                    if any(kw.lower() in [tk.lower() for tk in tender_keywords] for kw in keywords):
+                    tender_keywords = orjson.loads(tender.matched_keywords_json)
+                    if any(tk.lower() in wanted for tk in tender_keywords):
                         tenders.append(tender)
                         if len(tenders) >= limit:
                             break
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     continue
         
         return tenders
@@ -156,6 +156,10 @@ class EnhancedEmailService:
                     <!-- Recipient: {recipient_email} -->
                     """
                     
+                    # Plain-text part first so clients that prefer it (or can't render HTML) get it
+                    if email_content.get('text_body'):
+                        msg.attach(MIMEText(email_content['text_body'], 'plain', 'utf-8'))
+                    
                     html_part = MIMEText(html_content, 'html', 'utf-8')
                     msg.attach(html_part)
                     
@@ -91,19 +91,43 @@ class TenderScheduler:
             logger.info(f"Processing {len(pages)} pages")
             logger.info(f"Keywords: {len(esg_keywords)} ESG, {len(credit_keywords)} Credit Rating")
             
-            # Step 3: Process each monitored page through extended pipeline
+            # Step 3: Scrape all main pages concurrently with crawl4ai
+            from app.services.scraper import TenderScraper
+            
+            async with TenderScraper() as scraper:
+                scrape_results = await scraper.scrape_multiple_pages([page.url for page in pages])
+            
+            # Step 4: Agent 1 over all scraped pages, several pages per LLM call,
+            # for both the strict result and the unfiltered "All Tenders" view
+            agent1_pages = [
+                (page.id, page.url, scrape_results[page.url]['markdown'] or '')
+                for page in pages
+                if scrape_results.get(page.url, {}).get('status') == 'success'
+            ]
+            agent1_results, agent1_all_results = await asyncio.gather(
+                self.tender_agent.agent1.extract_many(agent1_pages, esg_keywords, credit_keywords),
+                self.tender_agent.agent1.extract_many(
+                    agent1_pages, esg_keywords, credit_keywords, include_all_tenders=True
+                )
+            )
+            
+            # Step 5: Process each monitored page through extended pipeline
             total_new_tenders = 0
             all_email_compositions = []
             
             for page in pages:
-                page_result = await self._process_page_extended_pipeline(db, page, esg_keywords, credit_keywords)
+                page_result = await self._process_page_extended_pipeline(
+                    db, page, esg_keywords, credit_keywords,
+                    scrape_results.get(page.url), agent1_results.get(page.id),
+                    agent1_all_results.get(page.id)
+                )
                 total_new_tenders += page_result['new_tenders_count']
                 all_email_compositions.extend(page_result['email_compositions'])
             
-            # Step 4: Send intelligent notifications using Agent 3 compositions
+            # Step 6: Send intelligent notifications using Agent 3 compositions
             await self._send_intelligent_notifications(all_email_compositions)
             
-            # Step 5: Fallback notifications for any unnotified tenders (if Agent 3 failed)
+            # Step 7: Fallback notifications for any unnotified tenders (if Agent 3 failed)
             await self._send_fallback_notifications(db)
             
             logger.info(f"Extended extraction cycle completed - {total_new_tenders} new tenders processed with {len(all_email_compositions)} intelligent emails")
@@ -114,13 +138,17 @@ class TenderScheduler:
             db.close()
     
     async def _process_page_extended_pipeline(self, db: Session, page: MonitoredPage, 
-                                            esg_keywords: List, credit_keywords: List) -> Dict[str, Any]:
+                                            esg_keywords: List, credit_keywords: List,
+                                            scrape_result: Optional[Dict[str, Any]],
+                                            agent1_tenders: Optional[List[Dict[str, Any]]],
+                                            agent1_all_tenders: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Process a single monitored page through the extended pipeline with Agent 3
         
         Extended Pipeline Flow:
-        1. Scrape main page content with crawl4ai
-        2. Agent 1: Extract & categorize tenders from main page → Save to DB1
+        1. Main page content, already scraped with crawl4ai (scrape_result)
+        2. Agent 1: Extract & categorize tenders from main page (agent1_tenders
+           and agent1_all_tenders from the batched calls) → Save to DB1
         3. Agent 2: Extract details from individual tender pages → Save to DB2
         4. Agent 3: Compose intelligent email content
         5. Return email compositions for sending
@@ -137,111 +165,107 @@ class TenderScheduler:
         db.commit()
         
         try:
-            # Step 1: Scrape main page content using crawl4ai
-            from app.services.scraper import TenderScraper
-            
-            async with TenderScraper() as scraper:
-                logger.info(f"Scraping main page: {page.url}")
-                scrape_result = await scraper.scrape_page(page.url)
-                
-                if scrape_result['status'] != 'success':
-                    error_msg = scrape_result.get('error', 'Unknown scraping error')
-                    logger.error(f"Failed to scrape main page {page.url}: {error_msg}")
-                    
-                    # Update crawl log with failure
-                    crawl_log.status = "failed"
-                    crawl_log.error_message = error_msg
-                    crawl_log.completed_at = datetime.utcnow()
-                    db.commit()
-                    
-                    # Update page failure count
-                    page.consecutive_failures += 1
-                    page.last_crawled = datetime.utcnow()
-                    db.commit()
-                    return {'new_tenders_count': 0, 'email_compositions': []}
+            # Step 1: Main page content was scraped up front for the whole run
+            if not scrape_result or scrape_result['status'] != 'success':
+                error_msg = (scrape_result or {}).get('error', 'Unknown scraping error')
+                logger.error(f"Failed to scrape main page {page.url}: {error_msg}")
                 
-                logger.info(f"Successfully scraped main page: {len(scrape_result['markdown'])} characters")
+                # Update crawl log with failure
+                crawl_log.status = "failed"
+                crawl_log.error_message = error_msg
+                crawl_log.completed_at = datetime.utcnow()
+                db.commit()
                 
-                # Step 2-4: Run extended agent workflow (including Agent 3)
-                try:
-                    logger.info("Starting extended agent pipeline with Agent 3...")
-                    
-                    result = await self.tender_agent.process_page(
-                        page_content=scrape_result['markdown'],
-                        page_url=page.url,
-                        page_id=page.id,
-                        esg_keywords=esg_keywords,
-                        credit_keywords=credit_keywords,
-                        tender_repo=self.tender_repo,
-                        db=db
-                    )
-                    
-                    logger.info("Extended agent pipeline completed")
-                    
-                except Exception as workflow_error:
-                    logger.error(f"Extended agent pipeline failed for page {page.url}: {workflow_error}")
-                    
-                    # Update crawl log with workflow failure
-                    crawl_log.status = "failed"
-                    crawl_log.error_message = f"Extended agent pipeline error: {str(workflow_error)}"
-                    crawl_log.completed_at = datetime.utcnow()
-                    db.commit()
-                    
-                    # Update page failure count
-                    page.consecutive_failures += 1
-                    page.last_crawled = datetime.utcnow()
-                    db.commit()
-                    return {'new_tenders_count': 0, 'email_compositions': []}
+                # Update page failure count
+                page.consecutive_failures += 1
+                page.last_crawled = datetime.utcnow()
+                db.commit()
+                return {'new_tenders_count': 0, 'email_compositions': []}
+            
+            logger.info(f"Successfully scraped main page: {len(scrape_result['markdown'])} characters")
+            
+            # Step 2-4: Run extended agent workflow (including Agent 3)
+            try:
+                logger.info("Starting extended agent pipeline with Agent 3...")
                 
-                # Step 5: Process results
-                if result.get('workflow_failed'):
-                    error_msg = result.get('error', 'Extended workflow failed')
-                    logger.error(f"Extended workflow failed for page {page.url}: {error_msg}")
-                    
-                    # Update crawl log with workflow failure
-                    crawl_log.status = "failed"
-                    crawl_log.error_message = error_msg
-                    crawl_log.completed_at = datetime.utcnow()
-                    db.commit()
-                    
-                    # Update page failure count
-                    page.consecutive_failures += 1
-                    page.last_crawled = datetime.utcnow()
-                    db.commit()
-                    return {'new_tenders_count': 0, 'email_compositions': []}
+                result = await self.tender_agent.process_page(
+                    page_content=scrape_result['markdown'],
+                    page_url=page.url,
+                    page_id=page.id,
+                    esg_keywords=esg_keywords,
+                    credit_keywords=credit_keywords,
+                    tender_repo=self.tender_repo,
+                    db=db,
+                    agent1_tenders=agent1_tenders,
+                    agent1_all_tenders=agent1_all_tenders
+                )
                 
-                # Step 6: Log success metrics
-                basic_count = result.get('total_saved_basic', 0)
-                detailed_count = result.get('total_saved_detailed', 0)
-                email_count = result.get('total_email_compositions', 0)
-                duplicate_count = result.get('duplicate_count', 0)
+                logger.info("Extended agent pipeline completed")
                 
-                logger.info(f"Extended Pipeline Results for {page.name}:")
-                logger.info(f"   Basic tenders saved to DB1: {basic_count}")
-                logger.info(f"   Detailed tenders saved to DB2: {detailed_count}")
-                logger.info(f"   Email compositions created: {email_count}")
-                logger.info(f"   Duplicates filtered: {duplicate_count}")
+            except Exception as workflow_error:
+                logger.error(f"Extended agent pipeline failed for page {page.url}: {workflow_error}")
                 
-                # Update crawl log with success
-                crawl_log.status = "completed"
-                crawl_log.tenders_found = basic_count
-                crawl_log.tenders_new = basic_count
+                # Update crawl log with workflow failure
+                crawl_log.status = "failed"
+                crawl_log.error_message = f"Extended agent pipeline error: {str(workflow_error)}"
                 crawl_log.completed_at = datetime.utcnow()
                 db.commit()
                 
-                # Update page success status
-                page.consecutive_failures = 0
+                # Update page failure count
+                page.consecutive_failures += 1
                 page.last_crawled = datetime.utcnow()
-                page.last_successful_crawl = datetime.utcnow()
                 db.commit()
+                return {'new_tenders_count': 0, 'email_compositions': []}
+            
+            # Step 5: Process results
+            if result.get('workflow_failed'):
+                error_msg = result.get('error', 'Extended workflow failed')
+                logger.error(f"Extended workflow failed for page {page.url}: {error_msg}")
                 
-                logger.info(f"Successfully processed page {page.url} through extended pipeline")
-                
-                return {
-                    'new_tenders_count': basic_count,
-                    'email_compositions': result.get('email_compositions', [])
-                }
+                # Update crawl log with workflow failure
+                crawl_log.status = "failed"
+                crawl_log.error_message = error_msg
+                crawl_log.completed_at = datetime.utcnow()
+                db.commit()
                 
+                # Update page failure count
+                page.consecutive_failures += 1
+                page.last_crawled = datetime.utcnow()
+                db.commit()
+                return {'new_tenders_count': 0, 'email_compositions': []}
+            
+            # Step 6: Log success metrics
+            basic_count = result.get('total_saved_basic', 0)
+            detailed_count = result.get('total_saved_detailed', 0)
+            email_count = result.get('total_email_compositions', 0)
+            duplicate_count = result.get('duplicate_count', 0)
+            
+            logger.info(f"Extended Pipeline Results for {page.name}:")
+            logger.info(f"   Basic tenders saved to DB1: {basic_count}")
+            logger.info(f"   Detailed tenders saved to DB2: {detailed_count}")
+            logger.info(f"   Email compositions created: {email_count}")
+            logger.info(f"   Duplicates filtered: {duplicate_count}")
+            
+            # Update crawl log with success
+            crawl_log.status = "completed"
+            crawl_log.tenders_found = basic_count
+            crawl_log.tenders_new = basic_count
+            crawl_log.completed_at = datetime.utcnow()
+            db.commit()
+            
+            # Update page success status
+            page.consecutive_failures = 0
+            page.last_crawled = datetime.utcnow()
+            page.last_successful_crawl = datetime.utcnow()
+            db.commit()
+            
+            logger.info(f"Successfully processed page {page.url} through extended pipeline")
+            
+            return {
+                'new_tenders_count': basic_count,
+                'email_compositions': result.get('email_compositions', [])
+            }
+            
         except Exception as e:
             logger.error(f"Error processing page {page.url} through extended pipeline: {e}")
             
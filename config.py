@@ -16,6 +16,19 @@ class Config:
     EMAIL_USER = os.getenv("EMAIL_USER")
     EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
     
+    # Agent 1: pages sent to the LLM in a single batched call
+    AGENT1_BATCH_SIZE = int(os.getenv("AGENT1_BATCH_SIZE", "5"))
+    
+    # Agent 2: maximum tender pages scraped/summarised concurrently
+    DETAIL_CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", "8"))
+    
+    # Scraped tender page content kept out of the agent state
+    CONTENT_CACHE_DIR = os.getenv("CONTENT_CACHE_DIR", "./content_cache")
+    CONTENT_CACHE_TTL_HOURS = int(os.getenv("CONTENT_CACHE_TTL_HOURS", "24"))
+    
+    # LLM response cache
+    LLM_CACHE_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", "24"))
+    
     # Scheduler
     CRAWL_INTERVAL_MINUTES = 10  # Changed to minutes for testing
     
@@ -0,0 +1,56 @@
+import gzip
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ContentStore:
+    """Keeps large scraped page content on disk, addressed by its sha1 hash"""
+    
+    def __init__(self, root: str = Config.CONTENT_CACHE_DIR,
+                 ttl_hours: int = Config.CONTENT_CACHE_TTL_HOURS):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_hours * 3600
+    
+    def _path(self, ref: str) -> Path:
+        return self.root / f"{ref}.md.gz"
+    
+    def put(self, content: str) -> str:
+        """Store content and return its reference"""
+        data = content.encode('utf-8')
+        ref = hashlib.sha1(data).hexdigest()
+        path = self._path(ref)
+        if path.exists():
+            path.touch()  # Still in use: restart its TTL
+        else:
+            path.write_bytes(gzip.compress(data))
+        return ref
+    
+    def get(self, ref: str) -> Optional[str]:
+        """Load content by reference, or None if it is not stored"""
+        try:
+            return gzip.decompress(self._path(ref).read_bytes()).decode('utf-8')
+        except FileNotFoundError:
+            logger.warning(f"Content {ref} not found in store")
+            return None
+    
+    def prune(self) -> int:
+        """Delete entries not written or reused within the TTL; returns how many were removed"""
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for path in self.root.glob("*.md.gz"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info(f"Pruned {removed} expired entries from content store")
+        return removed
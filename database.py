@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
-from models import MonitoredPage, Keyword, Tender, CrawlLog, DetailedTender, get_db, create_tables
+from models import MonitoredPage, Keyword, Tender, CrawlLog, DetailedTender, LLMResponseCache, Agent1Result, get_db, create_tables
 from typing import List, Optional, Dict
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -190,6 +190,49 @@ class DatabaseManager:
             DetailedTender.id.is_(None)
         ).limit(limit).all()
 
+    def get_cached_llm_response(self, db: Session, key: str, max_age_hours: int) -> Optional[str]:
+        """Get a cached LLM response if it is younger than max_age_hours"""
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        entry = db.query(LLMResponseCache).filter(
+            LLMResponseCache.key == key,
+            LLMResponseCache.created_at >= cutoff
+        ).first()
+        return entry.response if entry else None
+    
+    def save_cached_llm_response(self, db: Session, key: str, response: str):
+        """Save or refresh a cached LLM response"""
+        try:
+            db.merge(LLMResponseCache(key=key, response=response, created_at=datetime.utcnow()))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error caching LLM response: {e}")
+            db.rollback()
+
+    def get_agent1_result(self, db: Session, page_hash: str, keyword_hash: str,
+                          max_age_hours: int) -> Optional[str]:
+        """Get stored Agent 1 tenders (JSON) for identical page content and keywords"""
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        entry = db.query(Agent1Result).filter(
+            Agent1Result.page_hash == page_hash,
+            Agent1Result.keyword_hash == keyword_hash,
+            Agent1Result.created_at >= cutoff
+        ).first()
+        return entry.tenders if entry else None
+    
+    def save_agent1_result(self, db: Session, page_hash: str, keyword_hash: str, tenders: str):
+        """Save or refresh Agent 1 tenders (JSON) for a page content hash"""
+        try:
+            db.merge(Agent1Result(
+                page_hash=page_hash,
+                keyword_hash=keyword_hash,
+                tenders=tenders,
+                created_at=datetime.utcnow()
+            ))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error saving Agent 1 result: {e}")
+            db.rollback()
+
     def initialize_default_data(self):
         """Initialize database with default pages and keywords"""
         from config import Config
@@ -78,6 +78,21 @@ class CrawlLog(Base):
     error_message = Column(Text)
     crawl_time = Column(DateTime, default=datetime.utcnow)
 
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+    
+    key = Column(String, primary_key=True)  # sha256 of model + prompt
+    response = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class Agent1Result(Base):
+    __tablename__ = "agent1_cache"
+    
+    page_hash = Column(String, primary_key=True)  # sha256 of page content
+    keyword_hash = Column(String, primary_key=True)  # sha256 of the keyword lists
+    tenders = Column(Text)  # JSON list of categorized tenders
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 # Database setup
 engine = create_engine(Config.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -2,14 +2,14 @@ import asyncio
 import schedule
 import time
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from models import get_db
 from database import DatabaseManager
-from scraper import TenderScraper
-from agents import TenderAgent
+from agents import TenderAgent, get_scraper, close_scraper
 from email_service import EmailService
 from config import Config
+from content_store import ContentStore
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -19,117 +19,148 @@ class TenderScheduler:
     def __init__(self):
         self.db_manager = DatabaseManager()
         self.email_service = EmailService()
+        self.content_store = ContentStore()
         self.agent = TenderAgent()
-        self.workflow = self.agent.create_workflow()
     
     async def run_tender_extraction(self):
         """Main tender extraction process"""
         logger.info("Starting scheduled tender extraction...")
         
-        with next(get_db()) as db:
-            # Get all active monitored pages
-            pages = self.db_manager.get_active_pages(db)
-            logger.info(f"Processing {len(pages)} monitored pages")
+        try:
+            # Content of earlier runs has been saved to the DB by now
+            self.content_store.prune()
             
-            for page in pages:
+            with next(get_db()) as db:
+                # Get all active monitored pages
+                pages = self.db_manager.get_active_pages(db)
+                logger.info(f"Processing {len(pages)} monitored pages")
+                
+                # Get keywords for processing
+                esg_keywords = self.db_manager.get_keywords_by_category(db, "esg")
+                credit_keywords = self.db_manager.get_keywords_by_category(db, "credit_rating")
+                
+                # Scrape every page first so Agent 1 can see several pages per LLM call
+                scraped = []
+                for page in pages:
+                    try:
+                        state = await self.scrape_page(db, page, esg_keywords, credit_keywords)
+                        if state:
+                            scraped.append((page, state))
+                    except Exception as e:
+                        logger.error(f"Error scraping page {page.url}: {e}")
+                        self.db_manager.log_crawl(db, page.id, "failed", 0, str(e))
+                
                 try:
-                    await self.process_page(db, page)
+                    states = await self.agent.extract_tenders_batch([state for _, state in scraped])
                 except Exception as e:
-                    logger.error(f"Error processing page {page.url}: {e}")
-                    self.db_manager.log_crawl(db, page.id, "failed", 0, str(e))
-            
-            # Send notifications for new tenders
-            await self.send_notifications(db)
+                    # One DB/cache or batch error must not cost the whole run: extract page by page
+                    logger.error(f"Batched Agent 1 extraction failed, extracting pages one by one: {e}")
+                    states = []
+                    for _, state in scraped:
+                        states.append(await self.agent.extract_tenders_node(state))
+                
+                for (page, _), state in zip(scraped, states):
+                    try:
+                        await self.process_page(db, page, state)
+                    except Exception as e:
+                        logger.error(f"Error processing page {page.url}: {e}")
+                        self.db_manager.log_crawl(db, page.id, "failed", 0, str(e))
+                
+                # Send notifications for new tenders
+                await self.send_notifications(db)
+        finally:
+            # Each run has its own event loop, so the shared crawler cannot outlive it
+            await close_scraper()
         
         logger.info("Scheduled tender extraction completed")
     
-    async def process_page(self, db: Session, page):
-        """Process a single monitored page"""
+    async def scrape_page(self, db: Session, page, esg_keywords: List[str],
+                          credit_keywords: List[str]) -> Optional[dict]:
+        """Scrape a monitored page and build its initial agent state"""
+        logger.info(f"Scraping page: {page.name} ({page.url})")
+        
+        scraper = await get_scraper()
+        result = await scraper.scrape_page(page.url)
+        
+        if result['status'] != 'success':
+            self.db_manager.log_crawl(db, page.id, "failed", 0, result.get('error'))
+            return None
+        
+        return {
+            'page_url': page.url,
+            'page_content': result['markdown'],
+            'raw_tenders': [],
+            'categorized_tenders': [],
+            'detailed_tenders': [],
+            'keywords_esg': esg_keywords,
+            'keywords_credit': credit_keywords,
+            'error': None
+        }
+    
+    async def process_page(self, db: Session, page, state: dict):
+        """Run Agent 2 on a page already handled by Agent 1 and save the results"""
         logger.info(f"Processing page: {page.name} ({page.url})")
         
         try:
-            # Scrape the page
-            async with TenderScraper() as scraper:
-                result = await scraper.scrape_page(page.url)
-                
-                if result['status'] != 'success':
-                    self.db_manager.log_crawl(db, page.id, "failed", 0, result.get('error'))
-                    return
-                
-                # Get keywords for processing
-                esg_keywords = self.db_manager.get_keywords_by_category(db, "esg")
-                credit_keywords = self.db_manager.get_keywords_by_category(db, "credit_rating")
-                
-                # Run agent workflow
-                initial_state = {
-                    'page_url': page.url,
-                    'page_content': result['markdown'],
-                    'raw_tenders': [],
-                    'categorized_tenders': [],
-                    'detailed_tenders': [],
-                    'keywords_esg': esg_keywords,
-                    'keywords_credit': credit_keywords,
-                    'error': None
-                }
-                
-                workflow_result = await self.workflow.ainvoke(initial_state)
-                
-                if workflow_result.get('error'):
-                    logger.error(f"Agent workflow error: {workflow_result['error']}")
-                    self.db_manager.log_crawl(db, page.id, "failed", 0, workflow_result['error'])
-                    return
+            workflow_result = await self.agent.process_tender_details_node(state)
+            
+            if workflow_result.get('error'):
+                logger.error(f"Agent workflow error: {workflow_result['error']}")
+                self.db_manager.log_crawl(db, page.id, "failed", 0, workflow_result['error'])
+                return
+            
+            # Save tenders to database
+            saved_tenders = []
+            for tender_data in workflow_result.get('categorized_tenders', []):
+                # Agent 1 has filtered tenders - save basic tender info
+                tender = self.db_manager.save_tender(
+                    db, 
+                    page.id, 
+                    tender_data['title'], 
+                    tender_data['url'], 
+                    tender_data.get('date'), 
+                    tender_data['category'], 
+                    tender_data['description']
+                )
+                if tender:
+                    saved_tenders.append(tender)
+                    logger.info(f"Saved basic tender: {tender.title}")
+            
+            # Save detailed tender information from Agent 2
+            detailed_count = 0
+            for detailed_tender_data in workflow_result.get('detailed_tenders', []):
+                # Find the corresponding basic tender
+                basic_tender = None
+                for saved_tender in saved_tenders:
+                    if (saved_tender.title == detailed_tender_data['title'] and 
+                        saved_tender.url == detailed_tender_data['url']):
+                        basic_tender = saved_tender
+                        break
                 
-                # Save tenders to database
-                saved_tenders = []
-                for tender_data in workflow_result.get('categorized_tenders', []):
-                    # Agent 1 has filtered tenders - save basic tender info
-                    tender = self.db_manager.save_tender(
+                if basic_tender and 'detailed_info' in detailed_tender_data:
+                    # Save detailed information
+                    detailed_info = detailed_tender_data['detailed_info']
+                    content_ref = detailed_info.pop('full_content_ref', None) or detailed_tender_data.get('full_content_ref')
+                    detailed_info['full_content'] = (self.content_store.get(content_ref) or '') if content_ref else ''
+                    
+                    detailed_tender = self.db_manager.save_detailed_tender(
                         db, 
-                        page.id, 
-                        tender_data['title'], 
-                        tender_data['url'], 
-                        tender_data.get('date'), 
-                        tender_data['category'], 
-                        tender_data['description']
+                        basic_tender.id, 
+                        detailed_info
                     )
-                    if tender:
-                        saved_tenders.append(tender)
-                        logger.info(f"Saved basic tender: {tender.title}")
-                
-                # Save detailed tender information from Agent 2
-                detailed_count = 0
-                for detailed_tender_data in workflow_result.get('detailed_tenders', []):
-                    # Find the corresponding basic tender
-                    basic_tender = None
-                    for saved_tender in saved_tenders:
-                        if (saved_tender.title == detailed_tender_data['title'] and 
-                            saved_tender.url == detailed_tender_data['url']):
-                            basic_tender = saved_tender
-                            break
-                    
-                    if basic_tender and 'detailed_info' in detailed_tender_data:
-                        # Save detailed information
-                        detailed_info = detailed_tender_data['detailed_info']
-                        detailed_info['full_content'] = detailed_tender_data.get('full_content', '')
-                        
-                        detailed_tender = self.db_manager.save_detailed_tender(
-                            db, 
-                            basic_tender.id, 
-                            detailed_info
-                        )
-                        if detailed_tender:
-                            detailed_count += 1
-                            logger.info(f"Saved detailed tender info for: {basic_tender.title[:50]}...")
-                
-                logger.info(f"Successfully processed {len(saved_tenders)} basic tenders and {detailed_count} detailed tenders from {page.name}")
-                
-                # Log crawl activity
-                self.db_manager.log_crawl(db, page.id, 'success', len(saved_tenders))
-                
-                # Update page last crawled time
-                page.last_crawled = datetime.utcnow()
-                db.commit()
-                
+                    if detailed_tender:
+                        detailed_count += 1
+                        logger.info(f"Saved detailed tender info for: {basic_tender.title[:50]}...")
+            
+            logger.info(f"Successfully processed {len(saved_tenders)} basic tenders and {detailed_count} detailed tenders from {page.name}")
+            
+            # Log crawl activity
+            self.db_manager.log_crawl(db, page.id, 'success', len(saved_tenders))
+            
+            # Update page last crawled time
+            page.last_crawled = datetime.utcnow()
+            db.commit()
+            
         except Exception as e:
             logger.error(f"Error processing page {page.url}: {e}")
             self.db_manager.log_crawl(db, page.id, "failed", 0, str(e))